@@ -0,0 +1,54 @@
+from typing import Union
+
+import pandas as pd
+
+from .credentials import PaymentCredentials
+from .helpers import get_file_suffix, open_payments_directory
+from .payment_types import PaymentTypes
+from .specialtys import PaymentSpecialtys
+
+
+class PaymentCatalogs(PaymentSpecialtys, PaymentCredentials, PaymentTypes):
+    """Builds the specialty, credential and payment type catalogs, with
+    their frequencies, in a single streaming pass over every payment class
+    and year. Only running value counters are kept in memory, so the
+    pass is bounded by the chunk size rather than the size of the datasets."""
+
+    def catalogs(self) -> dict[str, pd.DataFrame]:
+        """Returns a dict of the specialtys, MD_DO_specialtys, credentials
+        and payment_types catalogs."""
+
+        counts = self.count_values(
+            {
+                "specialty": self.specialty_columns,
+                "credential": self.credential_columns,
+                "payment_type": ["payment_type"],
+            }
+        )
+
+        specialtys = self.specialty_catalog(counts["specialty"])
+
+        return {
+            "specialtys": specialtys,
+            "MD_DO_specialtys": self.MD_DO_specialtys(specialtys),
+            "credentials": self.credential_catalog(counts["credential"]),
+            "payment_types": self.payment_type_catalog(counts["payment_type"]),
+        }
+
+    def create_catalogs_excel(self, path: Union[str, None] = None) -> None:
+        """Writes each catalog to a sheet of a single Excel file."""
+
+        path = open_payments_directory() if path is None else path
+
+        catalogs = self.catalogs()
+
+        file_suffix = get_file_suffix(self.years, self.payment_classes)
+
+        with pd.ExcelWriter(
+            f"{path}/catalogs{file_suffix}.xlsx",
+            engine="openpyxl",
+        ) as writer:
+            for sheet_name, catalog in catalogs.items():
+                catalog.to_excel(writer, sheet_name=sheet_name, index=False)
+
+        print("Successfully wrote catalogs to Excel.")
@@ -1,4 +1,7 @@
-from enum import StrEnum
+from enum import IntFlag, StrEnum
+from typing import Iterable
+
+import numpy as np
 
 
 class Credentials(StrEnum):
@@ -23,6 +26,7 @@ class PaymentFilters(StrEnum):
     can be identified from the list of unique OpenPayment IDs."""
 
     LASTNAME = "LASTNAME"
+    LASTNAME_PHONETIC = "LASTNAME_PHONETIC"  # Matches last name within one edit in the same Soundex block
     FIRSTNAME = "FIRSTNAME"
     FIRSTNAME_PARTIAL = "FIRSTNAME_PARTIAL"  # Matches first name with a partial match
     FIRST_MIDDLE_NAME = "FIRST_MIDDLE_NAME"  # Matches first name and middle name
@@ -35,6 +39,83 @@ class PaymentFilters(StrEnum):
     CITY = "CITY"
     STATE = "STATE"
     CITYSTATE = "CITYSTATE"  # Matches city and state
+    NPI = "NPI"  # Matches National Provider Identifier, without the other filters
+
+    @property
+    def flag(self) -> "PaymentFilterFlags":
+        """Returns the PaymentFilterFlags bit of the filter."""
+
+        return PaymentFilterFlags[self.name]
+
+
+class PaymentFilterFlags(IntFlag):
+    """Bit for each of the PaymentFilters, so that the filters that a
+    payment x conflicted row passed are stored as a single int32 and
+    can be combined and superseded with vectorized bit operations."""
+
+    LASTNAME = 1 << 0
+    LASTNAME_PHONETIC = 1 << 1
+    FIRSTNAME = 1 << 2
+    FIRSTNAME_PARTIAL = 1 << 3
+    FIRST_MIDDLE_NAME = 1 << 4
+    CREDENTIAL = 1 << 5
+    SPECIALTY = 1 << 6
+    SUBSPECIALTY = 1 << 7
+    FULLSPECIALTY = 1 << 8
+    MIDDLE_INITIAL = 1 << 9
+    MIDDLENAME = 1 << 10
+    CITY = 1 << 11
+    STATE = 1 << 12
+    CITYSTATE = 1 << 13
+    NPI = 1 << 14
+
+    @classmethod
+    def encode(cls, filters: Iterable[Iterable[PaymentFilters]]) -> np.ndarray:
+        """Returns the int32 masks of lists of PaymentFilters."""
+
+        return np.array(
+            [
+                sum(cls[payment_filter.name] for payment_filter in set(row_filters))
+                for row_filters in filters
+            ],
+            dtype=np.int32,
+        )
+
+    @staticmethod
+    def decode(
+        masks: np.ndarray,
+        order: Iterable[PaymentFilters],
+    ) -> list[list[PaymentFilters]]:
+        """Returns the lists of PaymentFilters of int32 masks, with the
+        filters in the given order."""
+
+        order = list(dict.fromkeys(order))
+
+        distinct, inverse = np.unique(np.asarray(masks, dtype=np.int32), return_inverse=True)
+
+        filters = [
+            [payment_filter for payment_filter in order if mask & payment_filter.flag]
+            for mask in distinct.tolist()
+        ]
+
+        return [list(filters[i]) for i in inverse.ravel()]
+
+    @staticmethod
+    def rank(
+        masks: np.ndarray,
+        priorities: list[PaymentFilters],
+    ) -> np.ndarray:
+        """Returns the rank of each int32 mask by the highest priority
+        filter that it has set: len(priorities) for the first filter
+        down to 1 for the last, or 0 if it has none of them."""
+
+        masks = np.asarray(masks, dtype=np.int32)
+
+        return np.select(
+            [(masks & payment_filter.flag) != 0 for payment_filter in priorities],
+            list(range(len(priorities), 0, -1)),
+            0,
+        )
 
 
 class States(StrEnum):
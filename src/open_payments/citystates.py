@@ -1,11 +1,12 @@
 import re
-from typing import ClassVar, Type, Union
+from typing import Callable, ClassVar, Type, Union
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel, model_validator
 from typing_extensions import Self
 
-from .choices import PaymentFilters, States
+from .choices import PaymentFilterFlags, PaymentFilters, States
 from .helpers import ColumnMixin
 from .read import ReadPayments
 
@@ -131,6 +132,42 @@ class CityStatesMixin(ColumnMixin):
         )
         return cols
 
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a state_codes column of the state abbreviations of the
+        payments' citystates."""
+
+        return self.add_state_codes(super().prepare_payments(payments))
+
+    def prepare_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a state_codes column of the state abbreviations of the
+        conflicteds' citystates."""
+
+        return self.add_state_codes(super().prepare_conflicteds(conflicteds))
+
+    @staticmethod
+    def add_state_codes(citystates: pd.DataFrame) -> pd.DataFrame:
+        """Adds a state_codes column, lists of the distinct state
+        abbreviations in the citystates column, if it doesn't have one."""
+
+        if "citystates" not in citystates.columns or "state_codes" in citystates.columns:
+            return citystates
+
+        return citystates.assign(
+            state_codes=citystates["citystates"].apply(
+                lambda x: sorted({
+                    citystate.state_abbrev for citystate in (
+                        convert_citystates(x) if isinstance(x, str) else x
+                    ) if pd.notna(citystate) and citystate.state_abbrev
+                }) if isinstance(x, (list, str)) else []
+            )
+        )
+
 
 class PaymentCityStates(ReadPayments, CityStatesMixin):
 
@@ -240,6 +277,17 @@ class PaymentIDsCityStates(CityStatesMixin):
         filters.append(PaymentFilters.STATE)
         return filters
 
+    @property
+    def filter_costs(self) -> dict[PaymentFilters, int]:
+        """City / state comparisons go through the CityState models."""
+        costs: dict[PaymentFilters, int] = super().filter_costs
+        costs.update({
+            PaymentFilters.CITYSTATE: 3,
+            PaymentFilters.CITY: 2,
+            PaymentFilters.STATE: 3,
+        })
+        return costs
+
     @classmethod
     def filter_by_city(
         cls,
@@ -373,6 +421,80 @@ class PaymentIDsCityStates(CityStatesMixin):
             )
         )
 
+    @staticmethod
+    def citystates_mask(
+        payments_x_conflicteds: pd.DataFrame,
+        matcher: Callable[..., bool],
+    ) -> np.ndarray:
+        """Returns a boolean array of the matcher applied to the
+        citystates and conflict_citystates of each row. Rows where
+        either is missing are False."""
+
+        return np.array(
+            [
+                isinstance(citystates, list)
+                and isinstance(conflict_citystates, list)
+                and matcher(
+                    payment_citystates=citystates,
+                    conflict_citystates=conflict_citystates,
+                )
+                for citystates, conflict_citystates in zip(
+                    payments_x_conflicteds["citystates"],
+                    payments_x_conflicteds["conflict_citystates"],
+                )
+            ],
+            dtype=bool,
+        )
+
+    @classmethod
+    def mask_by_city(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_city, before city / state matches
+        supersede it."""
+
+        return cls.citystates_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_city_match,
+        )
+
+    @classmethod
+    def mask_by_state(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_state, before city / state matches
+        supersede it."""
+
+        return cls.citystates_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_state_match,
+        )
+
+    @classmethod
+    def mask_by_citystate(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_citystate."""
+
+        return cls.citystates_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_citystate_match,
+        )
+
+    def supersede_filters(self, masks: np.ndarray) -> np.ndarray:
+        """A city / state match supersedes a city or state match."""
+
+        masks = super().supersede_filters(masks)
+
+        return np.where(
+            (masks & PaymentFilterFlags.CITYSTATE) != 0,
+            masks & ~int(PaymentFilterFlags.CITY | PaymentFilterFlags.STATE),
+            masks,
+        ).astype(np.int32)
+
     @staticmethod
     def get_full_citystate_matches(
         payments_x_conflicteds: pd.DataFrame,
@@ -414,6 +536,16 @@ class PaymentIDsCityStates(CityStatesMixin):
 
         return refined_matches
 
+    @staticmethod
+    def citystate_rank(masks: np.ndarray) -> np.ndarray:
+        """Ranks PaymentFilterFlags masks in get_citystate_matches'
+        order of priority."""
+
+        return PaymentFilterFlags.rank(
+            masks,
+            [PaymentFilters.CITYSTATE, PaymentFilters.STATE, PaymentFilters.CITY],
+        )
+
     def convert_merged_dtypes(
         self,
         merged: pd.DataFrame,
@@ -0,0 +1,179 @@
+import json
+import os
+from typing import Literal, Union
+
+import numpy as np
+import pandas as pd
+
+
+class PaymentsColumnStore:
+    """Flat, memory-mapped store of the numeric and coded columns of a
+    payments DataFrame (profile_id, payment_amount, year and the payment
+    class, entity and type codes). Each column is a .npy file that is
+    opened with np.load(mmap_mode="r"), so aggregations such as
+    np.bincount by profile or type run off the page cache without loading
+    the payments DataFrame.
+
+    Nulls are stored as -1 in the integer and code columns and as NaN
+    in payment_amount.
+
+    Args:
+        directory (str): directory written by PaymentsColumnStore.export.
+    """
+
+    # Stored column name: (source column, dtype)
+    numeric_columns: dict[str, tuple[str, type]] = {
+        "profile_id": ("profile_id", np.int32),
+        "payment_amount": ("payment_amount", np.float64),
+        "year": ("payment_year", np.int16),
+    }
+
+    # Stored column name: (source column, dtype)
+    coded_columns: dict[str, tuple[str, type]] = {
+        "class_code": ("payment_class", np.int8),
+        "entity_code": ("payment_entity", np.int32),
+        "type_code": ("payment_type", np.int32),
+    }
+
+    # Column that holds the type of payment of each payment class. General
+    # payments are typed by their nature, research payments, which don't
+    # have one, by their form and ownership payments by their terms.
+    payment_type_columns: dict[str, str] = {
+        "general": "payment_type",
+        "ownership": "terms_of_interest",
+        "research": "payment_type",
+    }
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+        with open(os.path.join(directory, "codes.json"), encoding="utf-8") as codes_file:
+            self.codes: dict[str, list[str]] = json.load(codes_file)
+
+        self._columns: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def export(
+        cls,
+        payments: pd.DataFrame,
+        directory: str,
+        source_columns: Union[dict[str, str], None] = None,
+    ) -> "PaymentsColumnStore":
+        """Writes the hot columns of the payments DataFrame to directory
+        and returns the opened store. source_columns overrides the payments
+        column read for a stored column, e.g. {"year": "Program_Year"}."""
+
+        source_columns = {} if source_columns is None else source_columns
+
+        os.makedirs(directory, exist_ok=True)
+
+        for name, (column, dtype) in cls.numeric_columns.items():
+            values = payments[source_columns.get(name, column)]
+            null = -1 if np.issubdtype(dtype, np.integer) else np.nan
+            np.save(
+                os.path.join(directory, f"{name}.npy"),
+                values.astype("Float64").fillna(null).to_numpy(dtype=dtype),
+            )
+
+        codes = {}
+
+        for name, (column, dtype) in cls.coded_columns.items():
+            values, labels = pd.factorize(
+                payments[source_columns[name]] if name in source_columns
+                else cls.payment_types(payments) if name == "type_code"
+                else payments[column],
+                sort=True,
+            )
+            np.save(os.path.join(directory, f"{name}.npy"), values.astype(dtype))
+            codes[name] = [str(label) for label in labels]
+
+        with open(os.path.join(directory, "codes.json"), "w", encoding="utf-8") as codes_file:
+            json.dump(codes, codes_file)
+
+        return cls(directory)
+
+    @classmethod
+    def payment_types(cls, payments: pd.DataFrame) -> pd.Series:
+        """Returns the type of each payment, read from the
+        payment_type_columns column of its payment_class. Payments
+        without a payment_class are typed by their payment_type."""
+
+        if "payment_class" not in payments.columns:
+            return payments["payment_type"]
+
+        classes = payments["payment_class"].to_numpy(dtype=object)
+        types = np.full(len(payments), None, dtype=object)
+
+        for payment_class, column in cls.payment_type_columns.items():
+            rows = classes == payment_class
+
+            if rows.any() and column in payments.columns:
+                types[rows] = payments[column].to_numpy(dtype=object)[rows]
+
+        return pd.Series(types, index=payments.index)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Returns the memory-mapped array of the stored column."""
+
+        if name not in self._columns:
+            self._columns[name] = np.load(
+                os.path.join(self.directory, f"{name}.npy"),
+                mmap_mode="r",
+            )
+
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return len(self["payment_amount"])
+
+    def bincount(
+        self,
+        by: Literal["profile_id", "year", "class_code", "entity_code", "type_code"],
+        weights: Union[Literal["payment_amount"], None] = None,
+    ) -> np.ndarray:
+        """Returns np.bincount of the stored column, optionally weighted by
+        payment_amount. Null keys and null amounts are skipped."""
+
+        keys = self[by]
+        mask = keys >= 0
+
+        if weights is not None:
+            amounts = self[weights]
+            mask &= ~np.isnan(amounts)
+            return np.bincount(keys[mask], weights=amounts[mask])
+
+        return np.bincount(keys[mask])
+
+    def labels(
+        self,
+        by: Literal["profile_id", "year", "class_code", "entity_code", "type_code"],
+        size: int,
+    ) -> Union[list[str], np.ndarray]:
+        """Returns the labels of the first size bins of the stored column."""
+
+        return self.codes[by][:size] if by in self.codes else np.arange(size)
+
+    def describe_by(
+        self,
+        by: Literal["profile_id", "year", "class_code", "entity_code", "type_code"],
+    ) -> pd.DataFrame:
+        """Returns total_payments, total_amount and mean_amount for each
+        value of the stored column, skipping values without payments."""
+
+        total_payments = self.bincount(by)
+        total_amount = self.bincount(by, weights="payment_amount")
+        total_amount = np.pad(total_amount, (0, len(total_payments) - len(total_amount)))
+
+        stats = pd.DataFrame(
+            {
+                "total_payments": total_payments,
+                "total_amount": total_amount,
+            },
+            index=pd.Index(self.labels(by, len(total_payments)), name=by),
+        )
+
+        stats = stats[stats["total_payments"] > 0]
+
+        stats["mean_amount"] = stats["total_amount"] / stats["total_payments"]
+
+        return stats
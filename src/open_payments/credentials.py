@@ -1,6 +1,8 @@
 import re
+from collections import Counter
 from typing import Type, Union
 
+import numpy as np
 import pandas as pd
 
 from .choices import Credentials, PaymentFilters
@@ -8,9 +10,24 @@ from .helpers import ColumnMixin, get_file_suffix, open_payments_directory
 from .read import ReadPayments
 
 
+# Bit of each of the Credentials in a credentials_mask
+CREDENTIAL_BITS: dict[Credentials, int] = {
+    credential: 1 << bit for bit, credential in enumerate(Credentials)
+}
+
+
 class CredentialsMixin(ColumnMixin):
     """Mixin class for credentials."""
 
+    credential_columns = [
+        "credential_1",
+        "credential_2",
+        "credential_3",
+        "credential_4",
+        "credential_5",
+        "credential_6",
+    ]
+
     @property
     def general_columns(self) -> dict[str, tuple[str, Union[Type[str], str]]]:
 
@@ -44,6 +61,37 @@ class CredentialsMixin(ColumnMixin):
         )
         return cols
 
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a credentials_mask column of the payments' credentials."""
+
+        return self.add_credentials_mask(super().prepare_payments(payments))
+
+    def prepare_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a credentials_mask column of the conflicteds' credentials."""
+
+        return self.add_credentials_mask(super().prepare_conflicteds(conflicteds))
+
+    @staticmethod
+    def add_credentials_mask(credentials: pd.DataFrame) -> pd.DataFrame:
+        """Adds a credentials_mask column, the int32 CREDENTIAL_BITS of the
+        credentials column, if it doesn't have one."""
+
+        if "credentials" not in credentials.columns or "credentials_mask" in credentials.columns:
+            return credentials
+
+        return credentials.assign(
+            credentials_mask=np.array(
+                [credentials_mask(x) for x in credentials["credentials"]],
+                dtype=np.int32,
+            )
+        )
+
 
 class PaymentCredentials(ReadPayments, CredentialsMixin):
 
@@ -61,54 +109,19 @@ class PaymentCredentials(ReadPayments, CredentialsMixin):
             unique_credentials.to_excel(writer, sheet_name="unique_credentials", index=False)
 
     def unique_credentials(self) -> pd.Series:
-        """Returns a Series of unique credentials from OpeyPayments payment datasets."""
+        """Returns a Series of unique credentials from a single streaming
+        pass over the OpeyPayments payment datasets, most frequent first."""
 
-        self.general_payments = self.read_general_payments_csvs(
-            usecols=self.general_columns.keys(),
-            dtype={key: value[1] for key, value in self.general_columns.items()},
-        )
-        self.general_payments = self.update_payments("general")
+        counts = self.count_values({"credential": self.credential_columns})
 
-        self.ownership_payments = self.read_ownership_payments_csvs(
-            usecols=self.ownership_columns.keys(),
-            dtype={key: value[1] for key, value in self.ownership_columns.items()},
-        )
-        self.ownership_payments = self.update_payments("ownership")
-
-        self.research_payments = self.read_research_payments_csvs(
-            usecols=self.research_columns.keys(),
-            dtype={key: value[1] for key, value in self.research_columns.items()},
-        )
-        self.research_payments = self.update_payments("research")
+        return self.credential_catalog(counts["credential"])["credential"]
 
-        all_payments = pd.concat([
-            self.general_payments, self.ownership_payments, self.research_payments
-        ])
-
-        all_credentials = self.get_all_credentials(all_payments)
-
-        all_credentials = all_credentials.drop_duplicates()
-
-        all_credentials = all_credentials.dropna()
-
-        return all_credentials.reset_index(drop=True)
-
-    @staticmethod
-    def get_all_credentials(df: pd.DataFrame) -> pd.Series:
-        """Method that returns all unique credentials from the DataFrame."""
-
-        credentials = pd.concat([
-            df["credential_1"],
-            df["credential_2"],
-            df["credential_3"],
-            df["credential_4"],
-            df["credential_5"],
-            df["credential_6"],
-        ])
-
-        credentials.rename("credential", inplace=True)
+    @classmethod
+    def credential_catalog(cls, counts: Counter) -> pd.DataFrame:
+        """Converts a Counter of (payment_class, credential) frequencies
+        into a DataFrame of credential and frequency columns."""
 
-        return credentials
+        return cls.counts_to_frame(counts, "credential")
 
     @classmethod
     def credentials(cls, payments: pd.DataFrame) -> pd.DataFrame:
@@ -184,10 +197,19 @@ def convert_credentials(credentials: str) -> Union[list[Credentials], None]:
     return converted
 
 
-def unique_credentials() -> None:
-    """Creates an Excel file containing unique credentials."""
+def credentials_mask(credentials: Union[list[Credentials], str, None]) -> int:
+    """Returns the CREDENTIAL_BITS of a list of Credentials, or of its
+    string representation, OR-ed together. Returns 0 for nulls."""
 
-    PaymentCredentials(nrows=None, years=2023).create_unique_credentials_excel()
+    if isinstance(credentials, str):
+        credentials = convert_credentials(credentials)
+
+    mask = 0
+
+    for credential in credentials if isinstance(credentials, list) else []:
+        mask |= CREDENTIAL_BITS.get(credential, 0)
+
+    return mask
 
 
 class PaymentIDsCredentials(CredentialsMixin):
@@ -202,6 +224,14 @@ class PaymentIDsCredentials(CredentialsMixin):
         filters.append(PaymentFilters.CREDENTIAL)
         return filters
 
+    @property
+    def filter_costs(self) -> dict["PaymentFilters", int]:
+        """Credentials are compared as sets of enums."""
+
+        costs: dict[PaymentFilters, int] = super().filter_costs
+        costs[PaymentFilters.CREDENTIAL] = 2
+        return costs
+
     @classmethod
     def filter_by_credential(
         cls,
@@ -218,6 +248,34 @@ class PaymentIDsCredentials(CredentialsMixin):
             )
         )
 
+    @staticmethod
+    def mask_by_credential(
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_credential. Compares the credentials_mask
+        columns, if both have been added, with a bitwise and."""
+
+        if {"credentials_mask", "conflict_credentials_mask"}.issubset(
+            payments_x_conflicteds.columns
+        ):
+            return (
+                payments_x_conflicteds["credentials_mask"].to_numpy(dtype=np.int32)
+                & payments_x_conflicteds["conflict_credentials_mask"].to_numpy(dtype=np.int32)
+            ) != 0
+
+        return np.array(
+            [
+                isinstance(credentials, list)
+                and isinstance(conflict_credentials, list)
+                and not set(credentials).isdisjoint(conflict_credentials)
+                for credentials, conflict_credentials in zip(
+                    payments_x_conflicteds["credentials"],
+                    payments_x_conflicteds["conflict_credentials"],
+                )
+            ],
+            dtype=bool,
+        )
+
     def convert_merged_dtypes(
         self,
         merged: pd.DataFrame,
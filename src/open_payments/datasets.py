@@ -0,0 +1,350 @@
+import os
+from typing import Callable, Literal, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from .choices import Credentials, PaymentFilters
+from .citystates import CityState, convert_citystates
+from .credentials import convert_credentials
+from .specialtys import Specialtys, convert_specialtys
+
+
+# Columns that hold lists of pydantic objects or enums, keyed by column
+# name, which covers the conflict_ prefixed columns as well.
+# Values are the column's arrow type, the class of its elements and the
+# converter for legacy string representations of the lists.
+NESTED_COLUMNS: dict[str, tuple[pa.DataType, type, Union[Callable, None]]] = {
+    "specialtys": (
+        pa.list_(pa.struct([("specialty", pa.string()), ("subspecialty", pa.string())])),
+        Specialtys,
+        convert_specialtys,
+    ),
+    "citystates": (
+        pa.list_(pa.struct([("city", pa.string()), ("state", pa.string())])),
+        CityState,
+        convert_citystates,
+    ),
+    "credentials": (
+        pa.list_(pa.string()),
+        Credentials,
+        convert_credentials,
+    ),
+    "filters": (
+        pa.list_(pa.string()),
+        PaymentFilters,
+        None,
+    ),
+}
+
+# Hive partition columns of the curated payments dataset
+PARTITION_COLUMNS = ["payment_class", "year"]
+
+
+def nested_column(column: str) -> Union[tuple[pa.DataType, type, Union[Callable, None]], None]:
+    """Returns the NESTED_COLUMNS entry for the column, if any."""
+
+    for name, nested in NESTED_COLUMNS.items():
+        if column in (name, f"conflict_{name}"):
+            return nested
+    return None
+
+
+def encode_nested(
+    values: pd.Series,
+    element_class: type,
+    converter: Union[Callable, None],
+) -> list:
+    """Converts a Series of lists of pydantic objects or enums into lists
+    of dicts or strs that pyarrow can store as native nested types."""
+
+    encoded = []
+
+    for value in values:
+        if isinstance(value, str) and converter is not None:
+            value = converter(value)
+        if value is None or (not hasattr(value, "__len__") and pd.isna(value)):
+            encoded.append(None)
+        elif issubclass(element_class, BaseModel):
+            encoded.append([element.model_dump() for element in value])
+        else:
+            encoded.append([str(element) for element in value])
+
+    return encoded
+
+
+def decode_nested(
+    values: pd.Series,
+    element_class: type,
+) -> list:
+    """Converts a Series of lists of dicts or strs read from arrow back
+    into lists of pydantic objects or enums."""
+
+    if issubclass(element_class, BaseModel):
+        return [
+            [element_class(**element) for element in value]
+            if value is not None else None
+            for value in values
+        ]
+    return [
+        [element_class(element) for element in value]
+        if value is not None else None
+        for value in values
+    ]
+
+
+def to_arrow_table(payments: pd.DataFrame) -> pa.Table:
+    """Converts a payments DataFrame into an arrow Table. Lists of Specialtys,
+    CityState, Credentials and PaymentFilters become list<struct> and
+    list<string> columns rather than Python reprs."""
+
+    arrays = []
+
+    for column in payments.columns:
+        nested = nested_column(column)
+
+        if nested is not None and isinstance(payments[column].dtype, pd.ArrowDtype):
+            # Columns kept lazily by from_arrow_table are already encoded
+            array = pa.array(payments[column].array)
+        elif nested is not None:
+            arrow_type, element_class, converter = nested
+            array = pa.array(
+                encode_nested(payments[column], element_class, converter),
+                type=arrow_type,
+            )
+        else:
+            array = pa.Array.from_pandas(payments[column])
+            # Columns with no values are stored as strings so that
+            # the schemas of the dataset's files can be unified
+            if pa.types.is_null(array.type):
+                array = array.cast(pa.string())
+
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, names=[str(column) for column in payments.columns])
+
+
+def from_arrow_table(
+    table: pa.Table,
+    decode: bool = True,
+    lazy: bool = False,
+) -> pd.DataFrame:
+    """Converts an arrow Table into a payments DataFrame. Integer columns
+    are returned as pandas nullable dtypes and, if decode is True, nested
+    columns are converted back into lists of pydantic objects or enums.
+    If lazy is True, the nested columns are kept as arrow-backed
+    (pd.ArrowDtype) columns that reference the table's buffers, without
+    converting them, for decode_lazy_columns to decode the rows in use."""
+
+    lazy_columns = [
+        column for column in table.column_names
+        if nested_column(column) is not None
+    ] if lazy else []
+
+    payments = table.drop_columns(lazy_columns).to_pandas(
+        types_mapper={
+            pa.int8(): pd.Int8Dtype(),
+            pa.int16(): pd.Int16Dtype(),
+            pa.int32(): pd.Int32Dtype(),
+            pa.int64(): pd.Int64Dtype(),
+        }.get,
+    )
+
+    for column in lazy_columns:
+        payments.insert(
+            table.column_names.index(column),
+            column,
+            pd.arrays.ArrowExtensionArray(table[column]),
+        )
+
+    if decode:
+        for column in payments.columns:
+            nested = nested_column(column)
+            if nested is not None and column not in lazy_columns:
+                payments[column] = decode_nested(payments[column], nested[1])
+
+    return payments
+
+
+def decode_lazy_columns(payments: pd.DataFrame) -> pd.DataFrame:
+    """Decodes the nested columns that from_arrow_table kept lazily, as
+    arrow-backed columns, into lists of pydantic objects or enums. Only
+    the rows of the payments are decoded, e.g. the candidates that were
+    taken from a lazily read snapshot."""
+
+    lazy_columns = [
+        column for column in payments.columns
+        if nested_column(column) is not None
+        and isinstance(payments[column].dtype, pd.ArrowDtype)
+    ]
+
+    if not lazy_columns:
+        return payments
+
+    return payments.assign(**{
+        column: decode_nested(
+            pa.array(payments[column].array).to_pylist(),
+            nested_column(column)[1],
+        )
+        for column in lazy_columns
+    })
+
+
+def write_payments_dataset(
+    payments: pd.DataFrame,
+    directory: str,
+    payment_class: Literal["general", "ownership", "research"],
+    year: Union[Literal[2020, 2021, 2022, 2023], int],
+) -> str:
+    """Writes a payment class and year's payments to a Hive-partitioned
+    (payment_class=/year=) Parquet dataset in directory. The partition
+    columns are dropped from the file as they are stored in its path.
+    Returns the path of the written file."""
+
+    partition = os.path.join(
+        directory,
+        f"payment_class={payment_class}",
+        f"year={year}",
+    )
+
+    os.makedirs(partition, exist_ok=True)
+
+    file_path = os.path.join(partition, "part-0.parquet")
+
+    pq.write_table(
+        to_arrow_table(
+            payments.drop(
+                columns=[col for col in PARTITION_COLUMNS if col in payments.columns],
+            )
+        ),
+        file_path,
+    )
+
+    return file_path
+
+
+def payments_dataset_partition_exists(
+    directory: str,
+    payment_class: Literal["general", "ownership", "research"],
+    year: Union[Literal[2020, 2021, 2022, 2023], int],
+) -> bool:
+    """Returns True if the payment class and year have already been
+    written to the dataset."""
+
+    return os.path.exists(
+        os.path.join(
+            directory,
+            f"payment_class={payment_class}",
+            f"year={year}",
+            "part-0.parquet",
+        )
+    )
+
+
+def read_payments_dataset(
+    directory: str,
+    payment_classes: Union[
+        list[Literal["general", "ownership", "research"]],
+        Literal["general", "ownership", "research"],
+        None,
+    ] = None,
+    years: Union[
+        list[Literal[2020, 2021, 2022, 2023]],
+        Literal[2020, 2021, 2022, 2023],
+        None,
+    ] = None,
+    columns: Union[list[str], None] = None,
+    decode: bool = True,
+) -> pd.DataFrame:
+    """Reads a Hive-partitioned payments dataset written by
+    write_payments_dataset. Only the requested columns are read and only
+    the partitions for the requested payment classes and years are opened."""
+
+    if isinstance(payment_classes, str):
+        payment_classes = [payment_classes]
+    if isinstance(years, int):
+        years = [years]
+
+    dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+
+    # The files may differ in which all-null columns were written or in
+    # integer widths, so unify their schemas rather than use the first file's
+    dataset = ds.dataset(
+        directory,
+        format="parquet",
+        partitioning="hive",
+        schema=pa.unify_schemas(
+            [dataset.schema]
+            + [fragment.physical_schema for fragment in dataset.get_fragments()],
+            promote_options="permissive",
+        ),
+    )
+
+    expression = None
+
+    if payment_classes is not None:
+        expression = ds.field("payment_class").isin(payment_classes)
+    if years is not None:
+        year_expression = ds.field("year").isin(years)
+        expression = year_expression if expression is None else expression & year_expression
+
+    return from_arrow_table(
+        dataset.to_table(columns=columns, filter=expression),
+        decode=decode,
+    )
+
+
+def write_payments_snapshot(
+    payments: pd.DataFrame,
+    path: str,
+) -> str:
+    """Writes a processed payments table to an uncompressed Arrow IPC file.
+    Uncompressed IPC files can be memory-mapped by any number of processes,
+    which then share the same physical pages. Returns the path."""
+
+    table = to_arrow_table(payments)
+
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return path
+
+
+def open_payments_snapshot(path: str) -> pa.Table:
+    """Memory-maps an Arrow IPC snapshot written by write_payments_snapshot.
+    The returned Table references the mapped file rather than copying it,
+    so opening a snapshot costs milliseconds regardless of its size. Its
+    rows are only copied when they are converted to pandas."""
+
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def read_payments_snapshot(
+    path: str,
+    columns: Union[list[str], None] = None,
+    rows: Union[np.ndarray, None] = None,
+    decode: bool = True,
+    lazy: bool = False,
+) -> pd.DataFrame:
+    """Reads the columns (default all) of an Arrow IPC snapshot into a
+    payments DataFrame. Reading the whole snapshot converts, and decodes
+    the nested columns of, every row, which takes about as long as any
+    other full read, unless lazy is True, in which case the nested columns
+    reference the mapped file until decode_lazy_columns decodes the rows
+    in use. If rows are given, only the rows at those positions are taken
+    from the mapped table and converted."""
+
+    table = open_payments_snapshot(path)
+
+    if columns is not None:
+        table = table.select(columns)
+
+    if rows is not None:
+        table = table.take(pa.array(rows, type=pa.int64()))
+
+    return from_arrow_table(table, decode=decode, lazy=lazy)
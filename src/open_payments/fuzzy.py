@@ -0,0 +1,188 @@
+from typing import Iterable, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+def deletion_neighborhood(name: str) -> set[str]:
+    """Returns the name and every string made by deleting one of its
+    characters."""
+
+    return {name} | {name[:i] + name[i + 1:] for i in range(len(name))}
+
+
+def within_one_edit(name: str, other: str) -> bool:
+    """Returns True if the names are equal or differ by a single
+    substitution, insertion or deletion."""
+
+    if name == other:
+        return True
+
+    if abs(len(name) - len(other)) > 1:
+        return False
+
+    if len(name) > len(other):
+        name, other = other, name
+
+    i = 0
+    while i < len(name) and name[i] == other[i]:
+        i += 1
+
+    if len(name) == len(other):
+        return name[i + 1:] == other[i + 1:]
+    return name[i:] == other[i + 1:]
+
+
+# Shortest name that matches the names that contain it, so that an
+# initial stored as a first name doesn't match every name with its letter
+MIN_CONTAINED_LENGTH = 2
+
+
+def contains_name(name: str, other: str) -> bool:
+    """Returns True if one name contains the other and the contained
+    name is at least MIN_CONTAINED_LENGTH characters long."""
+
+    shorter, longer = (name, other) if len(name) <= len(other) else (other, name)
+
+    return len(shorter) >= MIN_CONTAINED_LENGTH and shorter in longer
+
+
+def partial_name_match(name: str, other: str) -> bool:
+    """Returns True if one name contains the other, e.g. a nickname
+    that is a prefix of the full name, or if they are within one edit."""
+
+    return contains_name(name, other) or within_one_edit(name, other)
+
+
+# American Soundex digits of the consonants. Vowels, h, w and y are uncoded.
+SOUNDEX_CODES: dict[str, str] = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(name: Union[str, None]) -> Union[str, None]:
+    """Returns the American Soundex code of a normalized name, e.g. R163
+    for both robert and rupert. Characters other than a-z are skipped.
+    Returns None if the name has no letters."""
+
+    letters = [char for char in name if "a" <= char <= "z"] if isinstance(name, str) else []
+
+    if not letters:
+        return None
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate consonants with the same digit
+        if letter not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+def soundex_names(names: pd.Series) -> pd.Series:
+    """Returns the Soundex codes of a Series of normalized names,
+    computed once per distinct name."""
+
+    distinct = names.dropna().unique()
+
+    return names.map(dict(zip(distinct, map(soundex, distinct))))
+
+
+class FuzzyNameIndex:
+    """SymSpell-style deletion-neighborhood index over a set of names.
+    Every name is stored under itself and each of its one-character
+    deletions, so the names within one substitution, insertion or
+    deletion of a query are found with a hash lookup per deletion of the
+    query rather than by comparing the query against every name.
+
+    Names are compared as given, so normalize them before indexing
+    and querying.
+
+    Args:
+        names (Iterable[str]): names to index, e.g. the distinct first
+            names of the payments. Nulls are skipped.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: set[str] = {name for name in names if isinstance(name, str)}
+        self.deletes: dict[str, set[str]] = {}
+
+        for name in self.names:
+            for delete in deletion_neighborhood(name):
+                self.deletes.setdefault(delete, set()).add(name)
+
+        self._neighbors: dict[str, frozenset[str]] = {}
+
+    def neighbors(self, name: str) -> frozenset[str]:
+        """Returns the indexed names within one edit of the name."""
+
+        if name not in self._neighbors:
+            candidates = set().union(
+                *(self.deletes.get(delete, ()) for delete in deletion_neighborhood(name))
+            )
+            # Names that share a deletion may still be two edits apart,
+            # e.g. a transposition, so the candidates are verified
+            self._neighbors[name] = frozenset(
+                candidate for candidate in candidates
+                if within_one_edit(name, candidate)
+            )
+
+        return self._neighbors[name]
+
+    def within_one_edit(self, name: str, other: str) -> bool:
+        """Returns True if the names are within one edit, looking the
+        other name up among the name's neighbors if it is indexed."""
+
+        if other in self.names:
+            return other in self.neighbors(name)
+        return within_one_edit(name, other)
+
+    def partial_match(self, name: str, other: str) -> bool:
+        """Returns True if one name contains the other or if they are
+        within one edit."""
+
+        return contains_name(name, other) or self.within_one_edit(name, other)
+
+    def partial_matches(
+        self,
+        names: Sequence[str],
+        others: Sequence[str],
+    ) -> np.ndarray:
+        """Returns a boolean array of partial_match for each pair of
+        names and others, e.g. the first_name and conflict_first_name
+        columns of the payments x conflicteds candidates. Pairs with
+        a null are False."""
+
+        return np.array(
+            [
+                isinstance(name, str)
+                and isinstance(other, str)
+                and self.partial_match(name, other)
+                for name, other in zip(names, others)
+            ],
+            dtype=bool,
+        )
+
+    @classmethod
+    def from_series(cls, names: pd.Series) -> "FuzzyNameIndex":
+        """Indexes the distinct values of a Series of names."""
+
+        return cls(names.dropna().unique())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
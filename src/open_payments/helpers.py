@@ -1,7 +1,7 @@
 import os
-import re
 from typing import Literal, Type, Union
 
+import numpy as np
 import pandas as pd
 
 from .choices import PaymentFilters
@@ -31,6 +31,49 @@ class ColumnMixin:
 
         return []
 
+    @property
+    def filter_costs(self) -> dict["PaymentFilters", int]:
+        """Overwritten to declare the relative cost per row of
+        each of the mixin's PaymentFilters."""
+
+        return {}
+
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Overwritten to add the derived columns that the filters
+        compare, such as normalized names, to the payments DataFrame."""
+
+        return payments
+
+    def prepare_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Overwritten to add the derived columns that the filters
+        compare to the conflicteds DataFrame."""
+
+        return conflicteds
+
+    def filter_index(
+        self,
+        payment_filter: "PaymentFilters",
+    ) -> Union[object, None]:
+        """Overwritten to return a prebuilt index of the payments
+        that is passed to the filter_by_ method of the PaymentFilter."""
+
+        return None
+
+    def supersede_filters(
+        self,
+        masks: np.ndarray,
+    ) -> np.ndarray:
+        """Overwritten to clear the PaymentFilterFlags bits of filters
+        that are superseded by a stronger match in the same row."""
+
+        return masks
+
     def convert_merged_dtypes(
         self,
         merged: pd.DataFrame,
@@ -76,62 +119,5 @@ def get_file_suffix(
         )
 
 
-def load_all_MD_DO_payments_csvs() -> pd.DataFrame:
-    """Imports all OpenPayments payments for MDs and DOs
-    for the years 2020-2023 for all payment types (general, ownership,
-    and research) into a single dataframe."""
-    path = open_payments_directory()
-
-    all_payments = pd.DataFrame()
-
-    for payment_class in ["general", "ownership", "research"]:
-        for year in [2020, 2021, 2022, 2023]:
-            file_suffix = get_file_suffix(years=year, payment_classes=payment_class)
-            file_name = f"MD_DO_payments{file_suffix}.csv"
-
-            if file_name not in os.listdir(path):
-                print(
-                    f"File {path}/{file_name} does not exist. "
-                    "Please create the file first."
-                )
-                continue
-
-            payments = pd.read_csv(
-                f"{path}/{file_name}",
-                dtype={
-                    "first_name": str,
-                    "middle_name": str,
-                    "last_name": str,
-                },
-            )
-            all_payments = pd.concat([all_payments, payments], ignore_index=True)
-
-    return all_payments
-
-
 def open_payments_directory() -> str:
     return os.path.join(os.path.expanduser('~'), 'open_payments_datasets')
-
-
-def str_in_str(
-    to_match: str,
-    string: str,
-    ignore_case: bool = True,
-) -> bool:
-    flags = [re.IGNORECASE] if ignore_case else []
-    # sub() out parentheses in the search terms
-    to_match = re.sub(r"\(|\)", "", to_match)
-    # sub() out brackets in the search terms
-    to_match = re.sub(r"\[|\]", "", to_match)
-
-    for i, _ in enumerate(to_match):
-        if (
-            # Check for a substitution
-            re.search(f"{to_match[:i]}.{to_match[i+1:]}", string, *flags)
-            # Check for an addition
-            or re.search(f"{to_match[:i]}.{to_match[i:]}", string, *flags)
-            # Check for a deletion
-            or re.search(f"{to_match[:i]}{to_match[i+1:]}", string, *flags)
-        ):
-            return True
-    return False
@@ -1,13 +1,25 @@
-from typing import Literal, Type, Union
-
+import heapq
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, Literal, Type, Union
+
+import numpy as np
 import pandas as pd
 
-from .choices import PaymentFilters, Unmatcheds
+from .choices import PaymentFilterFlags, PaymentFilters, Unmatcheds
 from .citystates import PaymentCityStates, PaymentIDsCityStates
 from .credentials import PaymentCredentials, PaymentIDsCredentials
+from .datasets import decode_lazy_columns, read_payments_snapshot, write_payments_snapshot
 from .helpers import ColumnMixin
-from .names import NamesMixin, PaymentIDsNames
+from .indexes import BlockingIndex, ColumnIndex
+from .journal import MatchJournal
+from .names import NamesMixin, PaymentIDsNames, equal_names
 from .physicians_only import ReadPaymentsPhysicians
+from .profiles import build_profiles
 from .specialtys import PaymentIDsSpecialtys, PaymentSpecialtys
 
 
@@ -18,6 +30,7 @@ class IDsMixin(ColumnMixin):
         cols = super().general_columns
         cols.update({
                 "Covered_Recipient_Profile_ID": ("profile_id", "Int32"),
+                "Covered_Recipient_NPI": ("npi", "Int64"),
             }
         )
         return cols
@@ -36,6 +49,31 @@ class IDsMixin(ColumnMixin):
         cols.update({**self.general_columns})
         return cols
 
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Overwritten to decode the nested columns of payments read lazily
+        from a snapshot if the columns that are derived from them, such as
+        state_codes, have to be added. Snapshots of processed payments
+        already have them, so their nested columns stay lazy."""
+
+        if not {"state_codes", "credentials_mask", "specialty_names"}.issubset(
+            payments.columns
+        ):
+            payments = decode_lazy_columns(payments)
+
+        return super().prepare_payments(payments)
+
+    def convert_merged_dtypes(
+        self,
+        merged: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Overwritten to decode the nested columns of payments read lazily
+        from a snapshot, for only the merged rows."""
+
+        return super().convert_merged_dtypes(decode_lazy_columns(merged))
+
 
 class PaymentIDs(
     PaymentSpecialtys,
@@ -53,6 +91,83 @@ class PaymentIDs(
     ):
         super().__init__(**kwargs)
         self.MD_DO_only = MD_DO_only
+        # Bitmap, indexed by profile_id, of the profile_ids already read,
+        # shared across the chunks of one payment class and year
+        self.seen_profile_ids = np.zeros(0, dtype=bool)
+
+    def read_payments_chunks(
+        self,
+        payment_class: Literal["general", "ownership", "research"],
+        year: Union[Literal[2020, 2021, 2022, 2023], int],
+    ) -> Iterator[pd.DataFrame]:
+        """Overwritten to clear the profile_ids seen in the previous payment
+        class or year, so that each profile_id keeps a payment in every year
+        and class that it was paid in."""
+
+        self.seen_profile_ids = np.zeros(0, dtype=bool)
+
+        yield from super().read_payments_chunks(payment_class=payment_class, year=year)
+
+    def filter_payment_chunk(
+        self,
+        payment_chunk: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Overwritten to drop the payments of profile_ids that have already
+        been read in this or an earlier chunk of the payment class and year,
+        so that the specialtys, credentials and citystates are only processed
+        for the first payment of each profile_id in each year."""
+
+        chunk = super().filter_payment_chunk(payment_chunk)
+
+        column = next(
+            (column for column in self.profile_id_columns if column in chunk.columns),
+            None,
+        )
+
+        return chunk if column is None else self.remove_seen_ids(chunk, column)
+
+    @property
+    def profile_id_columns(self) -> list[str]:
+        """Returns the names of the profile_id column in the unprocessed
+        csv files of each payment class."""
+
+        return list({
+            key for payment_class in self.payment_classes
+            for key, (name, _) in getattr(self, f"{payment_class}_columns").items()
+            if name == "profile_id"
+        })
+
+    def remove_seen_ids(
+        self,
+        df: pd.DataFrame,
+        column: str = "profile_id",
+    ) -> pd.DataFrame:
+        """Removes the rows whose profile_id has already been seen, or is
+        repeated within the DataFrame, and marks the rest as seen. Rows
+        without a profile_id are kept."""
+
+        ids = pd.to_numeric(df[column], errors="coerce")
+        identified = ids.notna().to_numpy()
+        values = ids[identified].to_numpy(dtype=np.int64)
+
+        if len(values) and values.max() >= len(self.seen_profile_ids):
+            seen_profile_ids = np.zeros(
+                max(values.max() + 1, 2 * len(self.seen_profile_ids)),
+                dtype=bool,
+            )
+            seen_profile_ids[:len(self.seen_profile_ids)] = self.seen_profile_ids
+            self.seen_profile_ids = seen_profile_ids
+
+        keep = ~identified
+
+        keep[identified] = (
+            ~self.seen_profile_ids[values]
+            & ~pd.Series(values).duplicated(keep="first").to_numpy()
+        )
+
+        self.seen_profile_ids[values] = True
+
+        return df[keep]
 
     def update_payments(
         self,
@@ -74,6 +189,7 @@ class PaymentIDs(
         payments = self.specialtys(payments)
         payments = self.credentials(payments)
         payments = self.citystates(payments)
+        payments = self.prepare_payments(payments)
         return payments
 
     def update_ownership_payments(self) -> pd.DataFrame:
@@ -81,18 +197,58 @@ class PaymentIDs(
         self.ownership_payments = super().update_ownership_payments()
         return self.ownership_payments
 
+    def all_profiles(self) -> pd.DataFrame:
+        """Reads and processes the payments with all_payments and then
+        consolidates them into one row per profile_id, across all of the
+        payment classes and years, with build_profiles. Searching the
+        profiles rather than the payments means each physician is a
+        single candidate with all of their names, specialtys, citystates
+        and credentials."""
+
+        return self.prepare_payments(build_profiles(self.all_payments()))
+
+    def write_snapshot(
+        self,
+        path: str,
+        payments: Union[pd.DataFrame, None] = None,
+    ) -> str:
+        """Writes the processed payments table, with its encoded specialtys,
+        credentials and citystates, to an Arrow IPC file that can be
+        memory-mapped, so that it isn't read and processed from the csvs
+        again. Reads and processes the payments with all_payments if they
+        aren't passed in. Returns the path."""
+
+        payments = self.all_payments() if payments is None else payments
+
+        return write_payments_snapshot(payments, path)
+
+    @staticmethod
+    def read_snapshot(
+        path: str,
+        columns: Union[list[str], None] = None,
+        rows: Union[np.ndarray, None] = None,
+        lazy: bool = False,
+    ) -> pd.DataFrame:
+        """Reads a processed payments table written by write_snapshot,
+        or only the rows at the positions given, with its nested columns
+        decoded or, if lazy, left in the mapped snapshot until they are."""
+
+        return read_payments_snapshot(path, columns=columns, rows=rows, lazy=lazy)
+
     @staticmethod
     def remove_duplicate_ids(df: pd.DataFrame) -> pd.DataFrame:
         """Method that removes duplicate Covered_Recipient_Profile_IDs
-        from the DataFrame."""
+        from the DataFrame, keeping one payment per year of each."""
 
         df.reset_index(inplace=True, drop=True)
 
+        subset = [column for column in ["profile_id", "payment_year"] if column in df.columns]
+
         df = df[
             df["profile_id"].isnull()
             | ~df[
                 df['profile_id'].notnull()
-            ].duplicated(subset='profile_id', keep='first')
+            ].duplicated(subset=subset, keep='first')
         ]
 
         return df
@@ -122,16 +278,127 @@ class PaymentIDs(
 
 class Conflicted_x_PaymentIDs:
 
+    # Default seconds that the search of a conflicted takes, and those per
+    # candidate payment that it filters, that workloads are estimated with
+    # until they are passed or measured with calibrate
+    seconds_per_conflicted: float = 0.01
+    seconds_per_candidate: float = 0.0005
+
     def __init__(
         self,
         conflicteds: pd.DataFrame,
         payments: Union[pd.DataFrame, None],
+        journal: Union[str, None] = None,
+        resume: bool = False,
+        flush_rows: int = 1000,
+        candidate_cache_size: int = 128,
+        candidate_budget: Union[int, None] = None,
+        seconds_per_conflicted: Union[float, None] = None,
+        seconds_per_candidate: Union[float, None] = None,
     ):
+        self.candidate_cache_size = candidate_cache_size
+        if seconds_per_conflicted is not None:
+            self.seconds_per_conflicted = seconds_per_conflicted
+        if seconds_per_candidate is not None:
+            self.seconds_per_candidate = seconds_per_candidate
+        # Most candidates that a conflicted's payments are filtered in
+        # full, after which they are narrowed by the narrowing_keys
+        self.candidate_budget = candidate_budget
         self.conflicteds = conflicteds
         self.payments = payments
-        self.unmatched = pd.DataFrame()
-        self.unmatched_options: pd.DataFrame = pd.DataFrame()
-        self.unique_ids = pd.DataFrame()
+        # Arrow IPC snapshot that the payments were read from, if any
+        self.snapshot: Union[str, None] = None
+        # Results are buffered and, if a journal directory is given,
+        # appended to it in batches so that a killed run can be resumed
+        self.journal = MatchJournal(
+            directory=journal,
+            flush_rows=flush_rows,
+            resume=resume,
+        )
+        # Rows each filter was evaluated on and matched, over the run
+        self.filter_evaluations: Counter = Counter()
+        self.filter_hits: Counter = Counter()
+
+    @property
+    def payments(self) -> Union[pd.DataFrame, None]:
+        """The payments DataFrame searched for the conflicteds."""
+
+        return self._payments
+
+    @payments.setter
+    def payments(self, payments: Union[pd.DataFrame, None]) -> None:
+        self._payments = payments
+        # Indexes and derived columns are built lazily,
+        # once per payments DataFrame
+        self._indexes: dict[str, ColumnIndex] = {}
+        self._exact_matches: dict[tuple[str, ...], pd.DataFrame] = {}
+        self._npi_matches: Union[pd.DataFrame, None] = None
+        self._token_matches: Union[dict[str, np.ndarray], None] = None
+        # Least recently used candidate payments, by normalized merge key
+        self.candidate_cache: OrderedDict[Union[str, None], pd.DataFrame] = OrderedDict()
+        self._prepared_payments: Union[pd.DataFrame, None] = None
+
+    @property
+    def unique_ids(self) -> pd.DataFrame:
+        """The matched payments of the conflicted providers."""
+
+        return self.journal["unique_ids"].frame
+
+    @unique_ids.setter
+    def unique_ids(self, unique_ids: pd.DataFrame) -> None:
+        self.journal["unique_ids"].reset(unique_ids)
+
+    @property
+    def unmatched(self) -> pd.DataFrame:
+        """The conflicted providers without a unique match."""
+
+        return self.journal["unmatched"].frame
+
+    @unmatched.setter
+    def unmatched(self, unmatched: pd.DataFrame) -> None:
+        self.journal["unmatched"].reset(unmatched)
+
+    @property
+    def unmatched_options(self) -> pd.DataFrame:
+        """The highest matching payments of the unmatched conflicteds."""
+
+        return self.journal["unmatched_options"].frame
+
+    @unmatched_options.setter
+    def unmatched_options(self, unmatched_options: pd.DataFrame) -> None:
+        self.journal["unmatched_options"].reset(unmatched_options)
+
+    @property
+    def overruns(self) -> pd.DataFrame:
+        """The conflicted providers with more candidates than the
+        candidate_budget, and how their candidates were narrowed."""
+
+        return self.journal["overruns"].frame
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        conflicteds: pd.DataFrame,
+        path: str,
+        rows: Union[np.ndarray, None] = None,
+        **kwargs,
+    ) -> "Conflicted_x_PaymentIDs":
+        """Creates the searcher with its payments read from an Arrow IPC
+        snapshot written by PaymentIDs.write_snapshot, rather than from the
+        csvs. All of the payments, or only those at the rows given, are
+        converted to pandas, but their specialtys, credentials and
+        citystates are left in the mapped snapshot and only decoded for the
+        candidates of a search, as they are merged. The snapshot is only
+        kept as the searcher's if all of its payments are read."""
+
+        searcher = cls(
+            conflicteds=conflicteds,
+            payments=PaymentIDs.read_snapshot(path, rows=rows, lazy=True),
+            **kwargs,
+        )
+        searcher.snapshot = path if rows is None else None
+
+        return searcher
 
     @property
     def filters(self) -> list[PaymentFilters]:
@@ -154,9 +421,7 @@ class Conflicted_x_PaymentIDs:
         conflicted.loc[:, "filters"] = [filters]
         conflicted.loc[:, "num_filters"] = num_filters
 
-        self.unmatched = pd.concat(
-            [self.unmatched, pd.DataFrame(conflicted)]
-        )
+        self.journal["unmatched"].append(pd.DataFrame(conflicted))
 
     def convert_merged_dtypes(
         self,
@@ -179,10 +444,7 @@ class Conflicted_x_PaymentIDs:
 
         highest_matches.drop("payment_year", axis=1, inplace=True)
 
-        self.unique_ids = pd.concat(
-            [self.unique_ids, highest_matches],
-            ignore_index=True,
-        )
+        self.journal["unique_ids"].append(highest_matches)
 
     def filter_payment(
         self,
@@ -190,11 +452,14 @@ class Conflicted_x_PaymentIDs:
         payment_filter: PaymentFilters,
     ) -> pd.Series:
 
+        index = self.filter_index(payment_filter)
+
         if not payments_x_conflicted.empty and getattr(
             self,
             f"filter_by_{payment_filter.lower()}",
         )(
             payments_x_conflicted=payments_x_conflicted,
+            **({"index": index} if index is not None else {}),
         ):
             # DO NOT USE .append(), as it invokes the pandas
             # deprectated method, NOT the Python list append method.
@@ -229,6 +494,7 @@ class ConflictedPaymentIDs(
         -credentials: array[Credentials]
         -specialtys: array[Specialtys]
         -citystates: array[CityState]
+        -npi: Int64 (optional)
 
         payments[DataFrame]:
         -profile_id: Int64
@@ -239,6 +505,7 @@ class ConflictedPaymentIDs(
         -credentials: array[Credentials]
         -citystates: array[CityState]
         -payment_year: int
+        -npi: Int64 (optional)
     """
 
     @property
@@ -248,21 +515,104 @@ class ConflictedPaymentIDs(
 
         return "last_name"
 
+    @property
+    def prepared_payments(self) -> Union[pd.DataFrame, None]:
+        """Returns the payments DataFrame with the derived columns, such
+        as normalized names, that the filters compare, building it on
+        first use. The payments DataFrame itself is left as is."""
+
+        if self._prepared_payments is None and self.payments is not None:
+            self._prepared_payments = self.prepare_payments(self.payments)
+
+        return self._prepared_payments
+
+    def payments_index(self, name: str) -> ColumnIndex:
+        """Returns the {name}_index of the payments DataFrame, e.g. the
+        last_name_index, building it on first use."""
+
+        if name not in self._indexes:
+            self._indexes[name] = getattr(
+                self,
+                f"{name}_index",
+            )(self.prepared_payments)
+
+        return self._indexes[name]
+
+    @property
+    def merge_index(self) -> ColumnIndex:
+        """Returns the index of the payments DataFrame on the merge column,
+        building it on first use."""
+
+        return self.payments_index(self.merge_column)
+
+    @property
+    def merge_indexes(self) -> dict:
+        """Returns the indexes passed to the merge_by_ method of the
+        merge column: its exact and its phonetic (Soundex) index and the
+        token_matches of the conflicteds."""
+
+        return {
+            "index": self.merge_index,
+            "phonetic_index": self.payments_index(f"{self.merge_column}_soundex"),
+            "token_matches": self.token_matches,
+        }
+
+    @property
+    def token_matches(self) -> dict[str, np.ndarray]:
+        """Returns the last_name_token_matches of the conflicteds without
+        an exact match in the merge_index, by last name, found for all of
+        them in one scan of the payments' last names on first use rather
+        than in one scan per conflicted."""
+
+        if self._token_matches is None:
+            conflicteds = self.conflicteds.drop_duplicates(subset=self.merge_column)
+
+            keys = self.name_keys(
+                self.prefix_conflicteds(self.prepare_conflicteds(conflicteds)),
+                f"conflict_{self.merge_column}",
+                source=self.merge_column,
+            )
+            unmatched = conflicteds[self.merge_column][
+                np.array([not len(self.merge_index.lookup(key)) for key in keys], dtype=bool)
+            ]
+
+            self._token_matches = dict(zip(
+                unmatched,
+                self.last_name_token_matches(
+                    last_names=unmatched,
+                    index=self.merge_index,
+                ),
+            ))
+
+        return self._token_matches
+
     def search_for_conflicteds_ids(
         self,
+        batch: bool = False,
+        workers: Union[int, None] = None,
     ) -> None:
         """Searches for OpenPayments IDs for the conflicted providers and
         updates the unmatched and unique_ids attributes with search results,
-        or lack thereof."""
+        or lack thereof. If batch is True, all of the conflicteds are joined
+        with the payments at once rather than one at a time. If workers is
+        more than 1, partitions of the conflicteds are searched in that many
+        processes. Provider_pks that have already been searched, e.g. loaded
+        from a resumed journal, are skipped."""
+
+        if workers is not None and workers > 1:
+            self.search_for_conflicteds_ids_parallel(workers=workers, batch=batch)
+            return
 
-        # Add a conflict_ prefix to the columns of the conflicteds DataFrame
-        # to avoid name clashes with the payments DataFrame
-        conflicteds = self.conflicteds.rename(
-            columns={
-                col: f"conflict_{col}" for col in self.conflicteds.columns
-                if (col != self.merge_column and col != "provider_pk")
-            }
-        )
+        conflicteds = self.prefix_conflicteds(self.prepare_conflicteds(self.conflicteds))
+
+        self.search_npi_matches(conflicteds=conflicteds)
+        self.search_exact_matches(conflicteds=conflicteds)
+
+        if batch:
+            self.search_for_conflicteds_ids_batch(conflicteds=conflicteds)
+            self.journal.flush(force=True)
+            self.order_results()
+            return
 
         # Iterate over conflicteds and filter the payments DataFrame
         # for matches
@@ -272,238 +622,1705 @@ class ConflictedPaymentIDs(
             # Don't re-filter provider_pks that have already been filtered.
             # This is to allow looping through the pre-loaded OpenPayments
             # dataframes without having to re-read them.
-            if (
-                (
-                    conflicted["provider_pk"] not in self.unique_ids["provider_pk"].values
-                    if not self.unique_ids.empty else True
-                )
-                and (
-                    conflicted["provider_pk"] not in self.unmatched["provider_pk"].values
-                    if not self.unmatched.empty else True
-                )
-            ):
+            if conflicted["provider_pk"] not in self.journal.searched:
                 self.filter_payments_for_conflicted(
                     conflicted=conflicted,
                 )
+                self.journal.flush()
 
             print(
                 f"Processing conflicted provider: {conflicted['conflict_first_name']}"
                 f" {conflicted['last_name']}"
             )
 
-    def filter_payments_for_conflicted(
-        self,
-        conflicted: pd.Series,
-    ) -> None:
-        """Filters the payments DataFrame for the given conflicted provider."""
+        self.journal.flush(force=True)
+        self.order_results()
 
-        merged = getattr(self, f"merge_by_{self.merge_column}")(
-            payments=self.payments,
-            conflicted=conflicted,
+    def prefix_conflicteds(self, conflicteds: pd.DataFrame) -> pd.DataFrame:
+        """Adds a conflict_ prefix to the columns of the conflicteds DataFrame,
+        other than the merge column and provider_pk, to avoid name clashes
+        with the payments DataFrame."""
+
+        return conflicteds.rename(
+            columns={
+                col: f"conflict_{col}" for col in conflicteds.columns
+                if (col != self.merge_column and col != "provider_pk")
+            }
         )
 
-        if merged.empty:
-            print(f"No payments found for {conflicted[self.merge_column]}.")
-            self.add_unmatched(
-                conflicted=self.conflicteds[
-                    self.conflicteds["provider_pk"] == conflicted[
-                        "provider_pk"
-                    ]
-                ],
-                unmatched=Unmatcheds.NOLASTNAME,
-                filters=[],
-                num_filters=0,
-            )
-            return
+    def npi_matches(self) -> pd.DataFrame:
+        """Returns the index of the payments' NPIs that belong to a single
+        profile_id, with the profile_id and the position of the profile's
+        most recent payment, building it on first use."""
 
-        merged = self.convert_merged_dtypes(merged)
+        if self._npi_matches is not None:
+            return self._npi_matches
 
-        merged = self.fill_middle_names(merged)
-        
-        for payment_filter in self.filters:
-            merged = merged.apply(
-                lambda x: self.filter_payment(
-                    payments_x_conflicted=x,
-                    payment_filter=payment_filter,
-                ),
-                axis=1,
-            )
+        payments = self.prepared_payments
 
-        self.process_filtered_payments_x_conflicteds(
-            payments_x_conflicted=merged,
-        )
+        ids = payments[["npi", "profile_id"]].dropna()
 
-    def process_filtered_payments_x_conflicteds(
+        profiles = ids.groupby("npi", sort=False)["profile_id"].agg(["nunique", "first"])
+        profiles = profiles.loc[profiles["nunique"].eq(1), "first"]
+
+        recent = payments[["profile_id", "payment_year"]].assign(
+            position=np.arange(len(payments)),
+        ).dropna(subset="profile_id").sort_values(
+            by=["profile_id", "payment_year"],
+            ascending=[True, False],
+            kind="stable",
+        ).drop_duplicates(subset="profile_id").set_index("profile_id")["position"]
+
+        self._npi_matches = pd.DataFrame({
+            "npi": profiles.index,
+            "profile_id": profiles.to_numpy(),
+            "position": recent.loc[profiles.to_numpy()].to_numpy(),
+        })
+
+        return self._npi_matches
+
+    def search_npi_matches(
         self,
-        payments_x_conflicted: pd.DataFrame,
+        conflicteds: pd.DataFrame,
     ) -> None:
-        """Processes a filtered payments_x_conflicted DataFrame and
-        adds either the unique row to the unique_ids df or, if unmatched,
-        the conflicted provider  data about which filters were
-        successfully applied to the unmatched df.
+        """Joins the (conflict_ prefixed) conflicteds that have an NPI and
+        haven't been searched to the npi_matches and adds the most recent
+        payment of each matched profile to the unique_ids, with the NPI
+        filter only, as the NPI identifies the provider without the names."""
 
-        Can be overwritten for alternative functionality.
-        """
+        if "conflict_npi" not in conflicteds.columns or "npi" not in self.prepared_payments.columns:
+            return
 
-        # Of the payments, reduce the DataFrame to only
-        # have a single payment from each profile_id
+        remaining = conflicteds[
+            ~conflicteds["provider_pk"].isin(self.journal.searched)
+            & conflicteds["conflict_npi"].notna()
+        ].drop_duplicates(subset="provider_pk")
 
-        payments_x_conflicted = payments_x_conflicted.sort_values(
-            by=["profile_id", "payment_year"],
-            ascending=[True, False],
+        if remaining.empty:
+            return
+
+        joined = pd.DataFrame({
+            "provider_pk": remaining["provider_pk"].to_numpy(),
+            "npi": pd.to_numeric(remaining["conflict_npi"], errors="coerce").astype("Int64").to_numpy(),
+        }).dropna().merge(
+            self.npi_matches(),
+            on="npi",
+            how="inner",
+        )
+
+        if joined.empty:
+            return
+
+        matches = pd.concat(
+            [
+                self.prepared_payments.iloc[
+                    joined["position"].to_numpy()
+                ].reset_index(drop=True),
+                remaining.set_index("provider_pk").loc[
+                    joined["provider_pk"]
+                ].reset_index().drop(columns=self.merge_column),
+            ],
+            axis=1,
         )
 
-        payments_x_conflicted = payments_x_conflicted.drop_duplicates(
-            subset="profile_id", keep="first"
+        matches.insert(0, "filters", [[PaymentFilters.NPI] for _ in range(len(matches))])
+        matches["filters_mask"] = np.int32(PaymentFilterFlags.NPI)
+
+        print(f"Found NPI matches for {len(matches)} conflicted providers.")
+        self.add_unique_id(matches)
+
+    @property
+    def exact_match_keys(self) -> list[list[str]]:
+        """Returns the payments columns of the keys that the conflicteds
+        are hash-joined to the payments on before any filters are applied,
+        in the order that they are tried. A conflicted whose values, in the
+        conflict_ prefixed columns, match a single profile_id on a key is
+        resolved without the filters. Can be overwritten to add keys that
+        narrow the conflicteds that are still ambiguous, e.g.
+        ["last_name_norm", "first_name_norm", "state_codes"], though these
+        skip the middle name filters that would otherwise come first.
+        Columns that hold lists match on any element."""
+
+        return [
+            ["last_name_norm", "first_name_norm"],
+        ]
+
+    def exact_matches(self, key: list[str]) -> pd.DataFrame:
+        """Returns the values of the key that belong to a single profile_id,
+        with the position of that profile's most recent payment among the
+        payments with its last name, building them on first use. Values
+        that the most recent payment doesn't have, or that any payment
+        without a profile_id has, are left out, as the filters could
+        resolve those differently."""
+
+        if tuple(key) in self._exact_matches:
+            return self._exact_matches[tuple(key)]
+
+        payments = self.prepared_payments
+
+        rows = payments[key].assign(
+            profile_id=payments["profile_id"].to_numpy(),
+            payment_year=payments["payment_year"].to_numpy(),
+            position=np.arange(len(payments)),
         )
 
-        first_name_matches = self.get_firstname_matches(
-            payments_x_conflicteds=payments_x_conflicted
+        recent = rows.sort_values(
+            by=["last_name_norm", "profile_id", "payment_year"],
+            ascending=[True, True, False],
+            kind="stable",
+        ).drop_duplicates(subset=["last_name_norm", "profile_id"])["position"]
+
+        for column in key:
+            if rows[column].dtype == object:
+                rows = rows.explode(column)
+
+        rows = rows.dropna(subset=key)
+
+        profiles = rows.assign(
+            unidentified=rows["profile_id"].isna(),
+        ).groupby(key, sort=False).agg(
+            profiles=("profile_id", "nunique"),
+            unidentified=("unidentified", "any"),
         )
 
-        if not first_name_matches.empty and self.extract_single_match(
-            first_name_matches
-        ):
-            return
-        # Preferentially filter for first name matches
-        # Get the rows with the most filters
-        else:
-            middle_name_matches = self.get_middlename_matches(
-                first_name_matches
-            )
-            print(middle_name_matches)
-            if not middle_name_matches.empty and self.extract_single_match(
-                middle_name_matches
+        unique = profiles[
+            profiles["profiles"].eq(1) & ~profiles["unidentified"]
+        ].reset_index()[key]
+
+        self._exact_matches[tuple(key)] = unique.merge(
+            rows[rows["position"].isin(recent)],
+            on=key,
+            how="inner",
+        )[key + ["profile_id", "position"]]
+
+        return self._exact_matches[tuple(key)]
+
+    def search_exact_matches(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> None:
+        """Hash-joins the (conflict_ prefixed) conflicteds that haven't been
+        searched to the exact_matches of each of the exact_match_keys and
+        resolves those that match a single profile_id right away, so that
+        only the ambiguous and unmatched conflicteds are filtered. The
+        matched payments are resolved, and their filters evaluated, like
+        any other candidates."""
+
+        for key in self.exact_match_keys:
+            columns = [f"conflict_{column}" for column in key]
+
+            if not all(column in self.prepared_payments.columns for column in key) or not all(
+                column in conflicteds.columns for column in columns
             ):
+                continue
+
+            remaining = conflicteds[
+                ~conflicteds["provider_pk"].isin(self.journal.searched)
+            ].drop_duplicates(subset="provider_pk")
+
+            if remaining.empty:
                 return
-            else:
-                # If a single ID can't be found with the middle name,
-                # try to find a match with the full City and State
-                citystate_matches = self.get_citystate_matches(
-                    first_name_matches
-                )
-                print(citystate_matches)
-                if not citystate_matches.empty and self.extract_single_match(
-                    citystate_matches
-                ):
-                    return
-
-        highest_matches = self.get_highest_matches(
-            payments_x_conflicteds=(
-                middle_name_matches if not middle_name_matches.empty
-                else citystate_matches if not citystate_matches.empty
-                else first_name_matches if not first_name_matches.empty
-                else payments_x_conflicted
-            )
-        )
 
-        if highest_matches.shape[0] == 1:
-            print(
-                f"Found unique match for {payments_x_conflicted['conflict_first_name'].unique()[0]}"
-                f" {payments_x_conflicted['last_name'].unique()[0]}"
+            values = remaining[["provider_pk"] + columns].set_axis(
+                ["provider_pk"] + key,
+                axis=1,
             )
-            self.add_unique_id(highest_matches)
-        else:
-            print(
-                f"Multiple matches found for {payments_x_conflicted['conflict_first_name'].unique()[0]}"
-                f" {payments_x_conflicted['last_name'].unique()[0]}: {len(highest_matches)}"
+
+            for column in key:
+                if values[column].dtype == object:
+                    values = values.explode(column)
+
+            joined = values.dropna(subset=key).merge(
+                self.exact_matches(key),
+                on=key,
+                how="inner",
+            ).drop_duplicates(subset=["provider_pk", "profile_id"])
+
+            joined = joined[~joined["provider_pk"].duplicated(keep=False)]
+
+            if joined.empty:
+                continue
+
+            matched = remaining.set_index("provider_pk").loc[
+                joined["provider_pk"]
+            ].reset_index()
+
+            candidates = pd.concat(
+                [
+                    self.prepared_payments.iloc[
+                        joined["position"].to_numpy()
+                    ].reset_index(drop=True),
+                    matched.drop(columns=self.merge_column),
+                ],
+                axis=1,
             )
 
-            print(
-                "Attempting to find a single good match..."
+            candidates.insert(
+                0,
+                "filters",
+                [[PaymentFilters.LASTNAME] for _ in range(len(candidates))],
             )
 
-            best_highest_matches = self.get_citystate_matches(
-                highest_matches
+            matches = self.filter_and_resolve_payments_x_conflicteds(candidates)[0]
+
+            if not matches.empty:
+                print(f"Found exact matches for {len(matches)} conflicted providers.")
+                self.add_unique_id(matches)
+
+    def search_for_conflicteds_ids_parallel(
+        self,
+        workers: int,
+        batch: bool = False,
+    ) -> None:
+        """Searches partitions of the conflicteds that haven't been searched
+        in a pool of worker processes. The workers memory-map the payments
+        from an Arrow IPC snapshot rather than receiving a pickled copy:
+        the snapshot that the searcher was created from or, if none, the
+        payments written to a temporary one. Each worker only decodes the
+        partition_rows of its partition, so that the workers share the
+        mapped pages rather than each holding all of the payments. Each
+        partition's results are merged into the journal as it finishes and
+        are then put in the order of the conflicteds."""
+
+        conflicteds = self.conflicteds[
+            ~self.conflicteds["provider_pk"].isin(self.journal.searched)
+        ].drop_duplicates(subset="provider_pk")
+
+        if conflicteds.empty:
+            return
+
+        partitions = self.partition_conflicteds(conflicteds, workers)
+
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = self.snapshot if self.snapshot is not None else write_payments_snapshot(
+                self.payments,
+                os.path.join(directory, "payments.arrow"),
             )
 
-            if best_highest_matches.empty:
-                best_highest_matches = self.get_specialty_matches(
-                    highest_matches
-                )
-            elif best_highest_matches.shape[0] > 1:
-                best_highest_matches = self.get_specialty_matches(
-                    best_highest_matches
-                )
+            print(
+                f"Searching for {len(conflicteds)} conflicteds in "
+                f"{len(partitions)} worker processes..."
+            )
 
-            if (
-                not best_highest_matches.empty
-                and best_highest_matches.shape[0] == 1
-            ):
-                print(
-                    f"Found unique match for {payments_x_conflicted['conflict_first_name'].unique()[0]}"
-                    f" {payments_x_conflicted['last_name'].unique()[0]}"
-                )
-                self.add_unique_id(best_highest_matches)
-            else:
-                print(
-                    f"Could not find match for {payments_x_conflicted['conflict_first_name'].unique()[0]}"
-                    f" {payments_x_conflicted['last_name'].unique()[0]}"
-                )
-                if not best_highest_matches.empty:
-                    self.unmatched_options = pd.concat(
-                        [self.unmatched_options, best_highest_matches]
+            # Workers are spawned rather than forked, as forking a process
+            # that has started arrow's thread pools can deadlock
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        type(self).search_partition,
+                        partition,
+                        snapshot,
+                        batch,
+                        self.search_settings,
+                        self.partition_rows(
+                            self.prefix_conflicteds(self.prepare_conflicteds(partition))
+                        ),
                     )
-                else:
-                    self.unmatched_options = pd.concat(
-                        [self.unmatched_options, highest_matches]
-                    )
-                unmatched_conflict = self.conflicteds[
-                    self.conflicteds["provider_pk"] == payments_x_conflicted.iloc[0]["provider_pk"]
+                    for partition in partitions
                 ]
 
-                self.add_unmatched(
-                    conflicted=unmatched_conflict,
-                    unmatched=Unmatcheds.UNFILTERABLE,
-                    filters=highest_matches.iloc[0]["filters"],
-                    num_filters=len(highest_matches.iloc[0]["filters"])
-                )
+                for future in as_completed(futures):
+                    self.merge_partition_results(*future.result())
 
-    @staticmethod
-    def fill_middle_names(merged: pd.DataFrame) -> pd.DataFrame:
-        """Iterates over middle_name column for each row and
-        looks for na values and then searches the df for other rows
-        for the same profile_id with a middle_name and backfills
-        the na values with the middle_name from the other rows. This
-        is because some payments may have their middle name omitted,
-        but it can be useful when searching."""
-
-        merged["middle_name"] = merged.apply(
-            lambda x: (
-                x["middle_name"] if not pd.isna(x["middle_name"]) else
-                next(iter(
-                    merged[
-                        merged["profile_id"] == x["profile_id"]
-                    ]["middle_name"].unique()), None)
-            ),
-            axis=1,
+        self.journal.flush(force=True)
+        self.order_results()
+
+    def partition_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+        partitions: int,
+    ) -> list[pd.DataFrame]:
+        """Splits the conflicteds into at most partitions DataFrames of about
+        the same estimated search time, rather than the same number of rows.
+        Conflicteds with the same normalized merge column, and so the same
+        candidate payments, are kept in the same partition."""
+
+        workload = self.estimate_workload(
+            self.prefix_conflicteds(self.prepare_conflicteds(conflicteds))
         )
 
-        return merged
+        keys, _ = pd.factorize(
+            workload[f"{self.merge_column}_norm"],
+            use_na_sentinel=False,
+        )
 
-    def extract_single_match(
-        self,
-        matches: pd.DataFrame,
-    ) -> bool:
-        if matches.shape[0] == 1:
-            print(
-                f"Found unique match for {matches['conflict_first_name'].unique()[0]}"
-                f" {matches['last_name'].unique()[0]}"
-            )
-            self.add_unique_id(matches)
-            return True
-        return False
+        assignments = self.balance_partitions(
+            np.bincount(keys, weights=workload["seconds"].to_numpy()),
+            partitions,
+        )[keys]
+
+        return [
+            conflicteds[assignments == partition]
+            for partition in range(partitions)
+            if (assignments == partition).any()
+        ]
 
     @staticmethod
-    def get_highest_matches(
-        payments_x_conflicteds: pd.DataFrame,
-    ) -> pd.DataFrame:
-        """Returns the rows with the most filters applied to them."""
+    def balance_partitions(
+        costs: np.ndarray,
+        partitions: int,
+    ) -> np.ndarray:
+        """Assigns each of the costs to one of the partitions, largest
+        first, to the partition with the least cost so far (longest
+        processing time first). Returns the partition of each cost."""
+
+        loads = [(0.0, partition) for partition in range(partitions)]
+        assignments = np.zeros(len(costs), dtype=np.intp)
+
+        for position in np.argsort(-costs, kind="stable"):
+            load, partition = heapq.heappop(loads)
+            assignments[position] = partition
+            heapq.heappush(loads, (load + costs[position], partition))
+
+        return assignments
+
+    def candidate_positions(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> tuple[list[np.ndarray], np.ndarray]:
+        """Returns the positions of the candidate payments of each of the
+        (conflict_ prefixed) conflicteds, looked up in the payments' last
+        name index without merging, and the block_key that they were
+        looked up by: last_name or, for conflicteds without an exact last
+        name match, last_name_tokens or last_name_soundex, as they are in a
+        search, or None if there are none."""
+
+        keys = self.name_keys(
+            conflicteds,
+            "conflict_last_name",
+            source="last_name",
+        ).to_numpy(dtype=object)
+
+        positions = [self.merge_index.lookup(key) for key in keys]
+        block_keys = np.array(
+            ["last_name" if len(rows) else None for rows in positions],
+            dtype=object,
+        )
+
+        for block_key in ["last_name_tokens", "last_name_soundex"]:
+            missing = np.flatnonzero(pd.isna(block_keys))
+
+            if not len(missing):
+                break
 
-        return payments_x_conflicteds[
-            payments_x_conflicteds["filters"].apply(
-                lambda x: len(x) == max(
-                    payments_x_conflicteds["filters"].apply(len)
+            if block_key == "last_name_tokens":
+                matches = self.last_name_token_matches(
+                    last_names=conflicteds[self.merge_column].iloc[missing],
+                    index=self.merge_index,
+                )
+            else:
+                matches = self.last_name_phonetic_matches(
+                    payments=self.prepared_payments,
+                    last_names=keys[missing].tolist(),
+                    index=self.merge_indexes["phonetic_index"],
+                )
+
+            for position, rows in zip(missing, matches):
+                positions[position] = rows
+
+                if len(rows):
+                    block_keys[position] = block_key
+
+        return positions, block_keys
+
+    def partition_rows(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Returns the positions of the payments that a search of the
+        (conflict_ prefixed) conflicteds can reach: their candidate_positions,
+        the payments with their NPIs and every other payment of those
+        payments' profile_ids, whose middle names and most recent payments
+        are taken from all of them. A searcher of only these payments finds
+        the same matches for the conflicteds as one of all of them."""
+
+        payments = self.prepared_payments
+
+        positions, _ = self.candidate_positions(conflicteds)
+
+        if "conflict_npi" in conflicteds.columns and "npi" in payments.columns:
+            positions.append(
+                np.flatnonzero(
+                    payments["npi"].isin(
+                        pd.to_numeric(conflicteds["conflict_npi"], errors="coerce").dropna()
+                    ).to_numpy(dtype=bool)
                 )
             )
-        ]
\ No newline at end of file
+
+        rows = np.unique(np.concatenate(positions + [np.array([], dtype=np.intp)]))
+
+        return np.union1d(
+            rows,
+            np.flatnonzero(
+                payments["profile_id"].isin(
+                    payments["profile_id"].iloc[rows].dropna().unique()
+                ).to_numpy(dtype=bool)
+            ),
+        ).astype(np.intp)
+
+    def estimate_workload(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Estimates the search of each of the (conflict_ prefixed)
+        conflicteds from the payments' last name index alone, without
+        merging. Returns, by provider_pk, the normalized merge column, the
+        block_key that the candidate payments are looked up by (npi,
+        last_name, last_name_tokens, last_name_soundex or None if there
+        are none), the expected number of candidates, whether they are
+        over the candidate_budget and the expected seconds of the search.
+        Candidates over the budget are narrowed to at most the budget
+        before they are filtered, so their seconds are those of the budget.
+        Conflicteds resolved by their exact names are estimated as if
+        they were filtered, so the estimate is an upper bound."""
+
+        keys = self.name_keys(
+            conflicteds,
+            "conflict_last_name",
+            source="last_name",
+        ).to_numpy(dtype=object)
+
+        positions, block_keys = self.candidate_positions(conflicteds)
+
+        candidates = np.array([len(rows) for rows in positions], dtype=np.int64)
+
+        if "conflict_npi" in conflicteds.columns and "npi" in self.prepared_payments.columns:
+            npis = pd.to_numeric(conflicteds["conflict_npi"], errors="coerce").astype("Int64")
+            matched = npis.isin(self.npi_matches()["npi"]).to_numpy()
+
+            candidates[matched] = 1
+            block_keys[matched] = "npi"
+
+        return pd.DataFrame({
+            "provider_pk": conflicteds["provider_pk"].to_numpy(),
+            f"{self.merge_column}_norm": keys,
+            "block_key": block_keys,
+            "candidates": candidates,
+            "over_budget": (
+                candidates > self.candidate_budget if self.candidate_budget is not None
+                else np.zeros(len(candidates), dtype=bool)
+            ),
+            "seconds": self.seconds_per_conflicted + self.seconds_per_candidate * (
+                np.minimum(candidates, self.candidate_budget)
+                if self.candidate_budget is not None else candidates
+            ),
+        })
+
+    def explain(
+        self,
+        workers: Union[int, None] = None,
+    ) -> pd.DataFrame:
+        """Estimates the workload of search_for_conflicteds_ids without
+        searching. Prints the totals and the projected runtime, in that
+        many worker processes if workers is more than 1, and returns the
+        estimate_workload of each conflicted that hasn't been searched."""
+
+        conflicteds = self.conflicteds[
+            ~self.conflicteds["provider_pk"].isin(self.journal.searched)
+        ].drop_duplicates(subset="provider_pk")
+
+        workload = self.estimate_workload(
+            self.prefix_conflicteds(self.prepare_conflicteds(conflicteds))
+        )
+
+        seconds = workload["seconds"].sum()
+
+        if workers is not None and workers > 1 and not workload.empty:
+            keys, _ = pd.factorize(
+                workload[f"{self.merge_column}_norm"],
+                use_na_sentinel=False,
+            )
+            costs = np.bincount(keys, weights=workload["seconds"].to_numpy())
+
+            seconds = np.bincount(
+                self.balance_partitions(costs, workers),
+                weights=costs,
+            ).max()
+
+        print(
+            f"Estimated {workload['candidates'].sum()} candidate payments for "
+            f"{len(workload)} conflicteds: "
+            f"{workload['block_key'].isna().sum()} without payments, "
+            f"{workload['over_budget'].sum()} over the candidate budget."
+        )
+        print(
+            f"Projected runtime: {seconds:.2f} seconds"
+            + (f" in {workers} worker processes." if workers is not None and workers > 1 else ".")
+        )
+
+        return workload
+
+    def calibrate(
+        self,
+        sample: int = 50,
+    ) -> tuple[float, float]:
+        """Times the filtering of up to sample of the conflicteds that
+        haven't been searched, spread over their estimated candidates, one
+        at a time in a searcher of the same payments that doesn't journal.
+        Sets seconds_per_conflicted and seconds_per_candidate to the least
+        squares fit of the times to the candidates (capped at the budget)
+        and returns them."""
+
+        conflicteds = self.prefix_conflicteds(
+            self.prepare_conflicteds(
+                self.conflicteds[
+                    ~self.conflicteds["provider_pk"].isin(self.journal.searched)
+                ].drop_duplicates(subset="provider_pk")
+            )
+        )
+
+        workload = self.estimate_workload(conflicteds)
+
+        # Conflicteds matched by NPI aren't filtered
+        filtered = np.flatnonzero(workload["block_key"].ne("npi").to_numpy())
+
+        if not len(filtered):
+            return self.seconds_per_conflicted, self.seconds_per_candidate
+
+        candidates = workload["candidates"].to_numpy()
+        if self.candidate_budget is not None:
+            candidates = np.minimum(candidates, self.candidate_budget)
+
+        filtered = filtered[np.argsort(candidates[filtered], kind="stable")]
+        filtered = filtered[
+            np.unique(
+                np.linspace(0, len(filtered) - 1, min(sample, len(filtered))).round()
+            ).astype(np.intp)
+        ]
+
+        searcher = type(self)(
+            conflicteds=self.conflicteds,
+            payments=self.payments,
+            **self.search_settings,
+        )
+        # Indexes are built before the first conflicted is timed
+        searcher.merge_index
+
+        seconds = np.zeros(len(filtered))
+
+        for position, row in enumerate(filtered):
+            start = time.perf_counter()
+            searcher.filter_payments_for_conflicted(conflicted=conflicteds.iloc[row])
+            seconds[position] = time.perf_counter() - start
+
+        seconds_per_candidate = self.seconds_per_candidate
+
+        if len(np.unique(candidates[filtered])) > 1:
+            seconds_per_candidate = np.linalg.lstsq(
+                np.column_stack([np.ones(len(filtered)), candidates[filtered]]),
+                seconds,
+                rcond=None,
+            )[0][1]
+
+        # A rate per candidate can't be measured on candidates of one
+        # size, so it is kept, and one that is negative (noise) is dropped,
+        # before the rate per conflicted is fit to the rest of the times
+        seconds_per_candidate = max(seconds_per_candidate, 0.0)
+        seconds_per_conflicted = max(
+            (seconds - seconds_per_candidate * candidates[filtered]).mean(),
+            0.0,
+        )
+
+        self.seconds_per_conflicted = float(seconds_per_conflicted)
+        self.seconds_per_candidate = float(seconds_per_candidate)
+
+        return self.seconds_per_conflicted, self.seconds_per_candidate
+
+    @classmethod
+    def search_partition(
+        cls,
+        conflicteds: pd.DataFrame,
+        snapshot: str,
+        batch: bool = False,
+        settings: Union[dict, None] = None,
+        rows: Union[np.ndarray, None] = None,
+    ) -> tuple[dict[str, pd.DataFrame], Counter, Counter]:
+        """Searches a partition of the conflicteds, in a worker process,
+        with the payments at the rows (default all) of the snapshot and the
+        searcher created with the settings. Returns the partition's results,
+        e.g. its unique_ids, by journal collector and its filter evaluation
+        and hit counters."""
+
+        searcher = cls.from_snapshot(
+            conflicteds=conflicteds,
+            path=snapshot,
+            rows=rows,
+            **(settings if settings is not None else {}),
+        )
+        searcher.search_for_conflicteds_ids(batch=batch)
+
+        return (
+            {name: searcher.journal[name].frame for name in searcher.journal.collectors},
+            searcher.filter_evaluations,
+            searcher.filter_hits,
+        )
+
+    @property
+    def search_settings(self) -> dict:
+        """Returns the arguments that the searchers of the partitions
+        of a parallel search are created with."""
+
+        return {
+            "candidate_cache_size": self.candidate_cache_size,
+            "candidate_budget": self.candidate_budget,
+        }
+
+    def merge_partition_results(
+        self,
+        results: dict[str, pd.DataFrame],
+        filter_evaluations: Counter,
+        filter_hits: Counter,
+    ) -> None:
+        """Adds the results of a searched partition to the journal."""
+
+        for name in self.journal.collectors:
+            self.journal[name].append(results[name])
+
+        self.filter_evaluations.update(filter_evaluations)
+        self.filter_hits.update(filter_hits)
+        self.journal.flush()
+
+    def order_results(self) -> None:
+        """Sorts the journaled results into the order of the conflicteds,
+        the order that a serial search adds them in."""
+
+        order = pd.Series(
+            np.arange(len(self.conflicteds)),
+            index=self.conflicteds["provider_pk"].to_numpy(),
+        )
+        order = order[~order.index.duplicated()]
+
+        for name in self.journal.collectors:
+            results = self.journal[name].frame
+
+            if results.empty:
+                continue
+
+            results = results.iloc[
+                np.argsort(results["provider_pk"].map(order).to_numpy(), kind="stable")
+            ]
+
+            self.journal[name].reset(
+                results.reset_index(drop=True) if self.journal[name].ignore_index else results
+            )
+
+    def search_for_conflicteds_ids_batch(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> None:
+        """Joins all of the (conflict_ prefixed) conflicteds that haven't
+        already been searched with the payments DataFrame in one merge,
+        applies the filters to every candidate pair at once and then
+        processes the candidates of each provider_pk."""
+
+        conflicteds = conflicteds[
+            ~conflicteds["provider_pk"].isin(self.journal.searched)
+        ].drop_duplicates(subset="provider_pk")
+
+        if conflicteds.empty:
+            return
+
+        print(f"Merging Payments df with {len(conflicteds)} conflicteds...")
+
+        candidates = getattr(self, f"merge_all_by_{self.merge_column}")(
+            payments=self.prepared_payments,
+            conflicteds=conflicteds,
+            **self.merge_indexes,
+        )
+
+        if candidates.empty:
+            matches = options = highest = candidates
+        else:
+            candidates = self.narrow_candidates(self.convert_merged_dtypes(candidates))
+
+            stacked = self.stack_candidate_blocks(candidates, conflicteds)
+
+            matches, options, highest = self.filter_and_resolve_payments_x_conflicteds(
+                stacked,
+                by=["provider_pk", "block"],
+            )
+
+            full_blocks = stacked.groupby("provider_pk")["block"].max()
+
+            # A block's match is only taken if all of the candidates
+            # resolve to it as well
+            full = matches["block"].eq(matches["provider_pk"].map(full_blocks)).to_numpy()
+            full_profiles = matches[full].set_index("provider_pk")["profile_id"]
+
+            matches = matches[
+                full
+                | matches["profile_id"].eq(
+                    matches["provider_pk"].map(full_profiles)
+                ).fillna(False).to_numpy(dtype=bool)
+            ]
+
+            # The first block that resolves to the same match wins, and
+            # unresolved conflicteds report on all of their candidates
+            matches = matches.sort_values(
+                by="block",
+                kind="stable",
+            ).drop_duplicates(subset="provider_pk")
+
+            options, highest = (
+                df[
+                    df["block"].eq(df["provider_pk"].map(full_blocks))
+                    & ~df["provider_pk"].isin(matches["provider_pk"])
+                ]
+                for df in (options, highest)
+            )
+
+            order = pd.Series(
+                np.arange(len(conflicteds)),
+                index=conflicteds["provider_pk"].to_numpy(),
+            )
+
+            matches, options = (
+                df.iloc[
+                    np.argsort(df["provider_pk"].map(order).to_numpy(), kind="stable")
+                ].drop(columns=["block", "candidate"])
+                for df in (matches, options)
+            )
+
+        if not matches.empty:
+            print(f"Found unique matches for {len(matches)} conflicted providers.")
+            self.add_unique_id(matches)
+
+        if not options.empty:
+            self.journal["unmatched_options"].append(options)
+
+        highest_filters = dict(
+            zip(highest["provider_pk"], highest["filters"])
+        ) if not highest.empty else {}
+
+        for _, conflicted in conflicteds.iterrows():
+            if conflicted["provider_pk"] in highest_filters:
+                print(
+                    f"Could not find match for {conflicted['conflict_first_name']}"
+                    f" {conflicted['last_name']}"
+                )
+                self.add_unmatched(
+                    conflicted=self.conflicteds[
+                        self.conflicteds["provider_pk"] == conflicted[
+                            "provider_pk"
+                        ]
+                    ],
+                    unmatched=Unmatcheds.UNFILTERABLE,
+                    filters=highest_filters[conflicted["provider_pk"]],
+                    num_filters=len(highest_filters[conflicted["provider_pk"]]),
+                )
+            elif conflicted["provider_pk"] not in matches["provider_pk"].values:
+                print(f"No payments found for {conflicted[self.merge_column]}.")
+                self.add_unmatched(
+                    conflicted=self.conflicteds[
+                        self.conflicteds["provider_pk"] == conflicted[
+                            "provider_pk"
+                        ]
+                    ],
+                    unmatched=Unmatcheds.NOLASTNAME,
+                    filters=[],
+                    num_filters=0,
+                )
+
+    def stack_candidate_blocks(
+        self,
+        candidates: pd.DataFrame,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Stacks the candidates of each (conflict_ prefixed) conflicted
+        once per candidate block, in the order of the blocking_keys, and
+        then once in full, numbering them in a block column so that all of
+        the blocks of all of the conflicteds can be resolved at once. The
+        candidate column holds each row's position in the candidates."""
+
+        groups = candidates.groupby("provider_pk", sort=False).indices
+
+        positions: list[np.ndarray] = []
+        blocks: list[np.ndarray] = []
+
+        for _, conflicted in conflicteds.iterrows():
+            if conflicted["provider_pk"] not in groups:
+                continue
+
+            group = groups[conflicted["provider_pk"]]
+
+            for number, block in enumerate(
+                self.candidate_blocks(
+                    conflicted,
+                    blocking_index=self.blocking_index(candidates.iloc[group]),
+                    size=len(group),
+                ) + [np.arange(len(group))]
+            ):
+                positions.append(group[block])
+                blocks.append(np.full(len(block), number))
+
+        return candidates.iloc[np.concatenate(positions)].assign(
+            block=np.concatenate(blocks),
+            candidate=np.concatenate(positions),
+        ).reset_index(drop=True)
+
+    def filter_payments_for_conflicted(
+        self,
+        conflicted: pd.Series,
+    ) -> None:
+        """Filters the payments DataFrame for the given conflicted provider.
+        The conflicted's blocks of payments are tried first, in the order
+        of the blocking_keys, and all of the payments with its last name
+        only if none of them resolve to a single match that all of the
+        payments with the last name resolve to as well, which is checked
+        by their first names (firstname_profiles) before their filters."""
+
+        if self.candidate_budget is not None and self.merge_index.size(
+            self.name_key(conflicted, "conflict_last_name", source="last_name")
+        ) > self.candidate_budget:
+            # Candidates over budget are narrowed before they are
+            # blocked, as they are in a batch search
+            candidates = self.narrow_candidates(self.candidates_for_conflicted(conflicted))
+
+            blocks = [
+                candidates.iloc[block] for block in self.candidate_blocks(
+                    conflicted,
+                    blocking_index=self.blocking_index(candidates),
+                    size=len(candidates),
+                )
+            ]
+        else:
+            candidates = None
+
+            blocks = [
+                getattr(self, f"merge_by_{self.merge_column}")(
+                    payments=self.prepared_payments.iloc[block],
+                    conflicted=conflicted,
+                ) for block in self.candidate_blocks(conflicted)
+            ]
+
+        merged = candidates
+        resolved = None
+
+        for block in blocks:
+            matches = self.filter_and_resolve_payments_x_conflicteds(block)[0] if (
+                not block.empty
+            ) else block
+
+            if matches.shape[0] != 1:
+                continue
+
+            # The block's match is only taken if all of the candidates
+            # resolve to it as well: it's their only full first name match
+            # or, if not, their filters resolve to it
+            merged = merged if merged is not None else self.narrow_candidates(
+                self.candidates_for_conflicted(conflicted)
+            )
+
+            profile_id = matches["profile_id"].iloc[0]
+
+            if self.firstname_profiles(merged).get(conflicted["provider_pk"]) != profile_id:
+                if resolved is None:
+                    resolved = self.filter_and_resolve_payments_x_conflicteds(
+                        merged
+                    ) if not merged.empty else (merged, merged, merged)
+
+                if not (
+                    resolved[0].shape[0] == 1
+                    and resolved[0]["profile_id"].iloc[0] == profile_id
+                ):
+                    continue
+
+            if self.extract_single_match(matches):
+                return
+
+        merged = merged if merged is not None else self.narrow_candidates(
+            self.candidates_for_conflicted(conflicted)
+        )
+
+        if merged.empty:
+            print(f"No payments found for {conflicted[self.merge_column]}.")
+            self.add_unmatched(
+                conflicted=self.conflicteds[
+                    self.conflicteds["provider_pk"] == conflicted[
+                        "provider_pk"
+                    ]
+                ],
+                unmatched=Unmatcheds.NOLASTNAME,
+                filters=[],
+                num_filters=0,
+            )
+            return
+
+        # All of the candidates are filtered lazily, as the blocks are,
+        # unless they already were to confirm a block's match
+        self.process_resolved_payments_x_conflicted(
+            *(
+                resolved if resolved is not None
+                else self.filter_and_resolve_payments_x_conflicteds(merged)
+            ),
+        )
+
+    def candidates_for_conflicted(
+        self,
+        conflicted: pd.Series,
+    ) -> pd.DataFrame:
+        """Returns the payments x conflicted candidates of the (conflict_
+        prefixed) conflicted from the merge_by_ method of the merge column,
+        with their dtypes converted. The candidate payments are kept in an
+        LRU cache of candidate_cache_size, keyed by the normalized merge
+        key, so that conflicteds with the same last name only add their
+        own columns to them rather than merging and converting again."""
+
+        key = self.name_key(
+            conflicted,
+            f"conflict_{self.merge_column}",
+            source=self.merge_column,
+        )
+
+        if key in self.candidate_cache:
+            self.candidate_cache.move_to_end(key)
+            payments = self.candidate_cache[key]
+
+            if payments.empty:
+                return payments
+
+            # Lists, e.g. the conflict_credentials, are repeated per row
+            # rather than taken as a column
+            return payments.assign(**{
+                column: [value] * len(payments) if pd.api.types.is_list_like(value) else value
+                for column, value in conflicted.drop(self.merge_column).items()
+            })
+
+        merged = getattr(self, f"merge_by_{self.merge_column}")(
+            payments=self.prepared_payments,
+            conflicted=conflicted,
+            **self.merge_indexes,
+        )
+
+        if not merged.empty:
+            merged = self.convert_merged_dtypes(merged)
+
+        if self.candidate_cache_size > 0:
+            self.candidate_cache[key] = merged.drop(
+                columns=[
+                    column for column in conflicted.index
+                    if column != self.merge_column and column in merged.columns
+                ],
+            )
+
+            if len(self.candidate_cache) > self.candidate_cache_size:
+                self.candidate_cache.popitem(last=False)
+
+        return merged
+
+    @property
+    def narrowing_keys(self) -> list[str]:
+        """Returns the cheap keys, in the order that they are applied, that
+        the candidates of a conflicted over the candidate_budget are
+        narrowed by. Each has a narrow_by_ method."""
+
+        return ["first_initial", "state", "credential"]
+
+    @staticmethod
+    def narrow_by_first_initial(candidates: pd.DataFrame) -> np.ndarray:
+        """Returns a boolean array of the candidates whose first initial
+        is the conflicted's."""
+
+        if not {"first_initial", "conflict_first_initial"}.issubset(candidates.columns):
+            return np.ones(len(candidates), dtype=bool)
+
+        return equal_names(
+            candidates["first_initial"],
+            candidates["conflict_first_initial"],
+        )
+
+    def narrow_by_state(self, candidates: pd.DataFrame) -> np.ndarray:
+        """Returns a boolean array of the candidates that share a state
+        with the conflicted."""
+
+        if not {"citystates", "conflict_citystates"}.issubset(candidates.columns):
+            return np.ones(len(candidates), dtype=bool)
+
+        return self.mask_by_state(candidates)
+
+    def narrow_by_credential(self, candidates: pd.DataFrame) -> np.ndarray:
+        """Returns a boolean array of the candidates that share a credential
+        with the conflicted, by their credentials masks if they have them."""
+
+        if not {"credentials", "conflict_credentials"}.issubset(candidates.columns):
+            return np.ones(len(candidates), dtype=bool)
+
+        return self.mask_by_credential(candidates)
+
+    def narrow_candidates(self, candidates: pd.DataFrame) -> pd.DataFrame:
+        """Narrows the payments x conflicted candidates of each conflicted
+        that has more than the candidate_budget, by each of the
+        narrowing_keys in turn, until they are within budget. Keys that
+        would leave a conflicted without candidates are skipped. The
+        conflicteds that were over budget are recorded in the overruns."""
+
+        if self.candidate_budget is None or candidates.empty:
+            return candidates
+
+        codes, provider_pks = pd.factorize(candidates["provider_pk"])
+
+        sizes = np.bincount(codes, minlength=len(provider_pks))
+        over = sizes > self.candidate_budget
+
+        if not over.any():
+            return candidates
+
+        keep = np.ones(len(candidates), dtype=bool)
+        keys: list[list[str]] = [[] for _ in provider_pks]
+
+        for key in self.narrowing_keys:
+            remaining = np.bincount(codes, weights=keep, minlength=len(provider_pks))
+
+            narrowing = over & (remaining > self.candidate_budget)
+
+            if not narrowing.any():
+                break
+
+            rows = narrowing[codes] & keep
+
+            narrowed = keep.copy()
+            narrowed[rows] = getattr(self, f"narrow_by_{key}")(candidates[rows])
+
+            applied = narrowing & (
+                np.bincount(codes, weights=narrowed, minlength=len(provider_pks)) > 0
+            )
+
+            keep = np.where(applied[codes], narrowed, keep)
+
+            for position in np.flatnonzero(applied):
+                keys[position].append(key)
+
+        narrowed_sizes = np.bincount(codes, weights=keep, minlength=len(provider_pks)).astype(int)
+
+        print(f"Narrowed the candidates of {int(over.sum())} conflicteds over budget.")
+
+        first_rows = candidates.groupby(codes, sort=True)[self.merge_column].first()
+
+        self.journal["overruns"].append(pd.DataFrame({
+            "provider_pk": provider_pks[over],
+            self.merge_column: first_rows.to_numpy()[over],
+            "candidates": sizes[over],
+            "narrowed": narrowed_sizes[over],
+            "narrowing_keys": [keys[position] for position in np.flatnonzero(over)],
+        }))
+
+        return candidates[keep]
+
+    @property
+    def blocking_keys(self) -> list[list[str]]:
+        """Returns the composite keys of the blocks of payments that are
+        tried, in order, before all of the payments with the conflicted's
+        last name. Payments columns that hold lists, such as state_codes,
+        index each row under every value in the list."""
+
+        return [
+            ["last_name_norm", "first_initial"],
+            ["last_name_norm", "state_codes"],
+            ["last_name_norm", "specialty_names"],
+        ]
+
+    def firstname_profiles(self, candidates: pd.DataFrame) -> pd.Series:
+        """Returns, by provider_pk, the profile_id of the only candidate
+        whose most recent payment has the conflicted's first name, for the
+        conflicteds that have exactly one. The filters resolve all of such
+        a conflicted's candidates to that profile_id, as a full first name
+        match outranks the others and isn't superseded."""
+
+        recent = self.most_recent_payments(candidates, ["provider_pk"])
+        recent = recent[self.mask_by_firstname(recent)]
+
+        return recent[
+            recent.groupby("provider_pk")["profile_id"].transform("size").eq(1).to_numpy()
+        ].set_index("provider_pk")["profile_id"]
+
+    def blocking_index(self, payments: pd.DataFrame) -> BlockingIndex:
+        """Returns the BlockingIndex of the payments on the blocking_keys."""
+
+        return BlockingIndex(payments, self.blocking_keys)
+
+    def candidate_blocks(
+        self,
+        conflicted: pd.Series,
+        blocking_index: Union[BlockingIndex, None] = None,
+        size: Union[int, None] = None,
+    ) -> list[np.ndarray]:
+        """Returns the positions of the blocks of payments for the (conflict_
+        prefixed) conflicted, in the order of the blocking_keys, in the
+        payments' blocking index or the one passed. Blocks that are as
+        large as all of the payments with the conflicted's last name (or
+        size), or that repeat an earlier block, are dropped."""
+
+        blocking_index = (
+            blocking_index if blocking_index is not None
+            else self.payments_index("blocking")
+        )
+
+        size = size if size is not None else self.merge_index.size(
+            self.name_key(conflicted, "conflict_last_name", source="last_name")
+        )
+
+        blocks: list[np.ndarray] = []
+
+        for block in blocking_index.blocks(
+            {
+                column: conflicted.get(f"conflict_{column}")
+                for key in blocking_index.keys
+                for column in key
+            }
+        ):
+            if len(block) < size and not any(
+                np.array_equal(block, previous) for previous in blocks
+            ):
+                blocks.append(block)
+
+        return blocks
+
+    @property
+    def filter_hit_rates(self) -> dict[PaymentFilters, float]:
+        """Returns the share of the rows that each filter was evaluated
+        on that it matched, so far in the run."""
+
+        return {
+            payment_filter: self.filter_hits[payment_filter] / evaluations
+            for payment_filter, evaluations in self.filter_evaluations.items()
+            if evaluations
+        }
+
+    @property
+    def superseding_filters(self) -> dict[PaymentFilters, int]:
+        """Returns the PaymentFilterFlags mask of the filters that supersede
+        each filter, found by passing each pair of filters through
+        supersede_filters."""
+
+        pairs = [
+            (payment_filter, other)
+            for payment_filter in self.filters
+            for other in self.filters
+            if other != payment_filter
+        ]
+
+        masks = self.supersede_filters(
+            np.array(
+                [payment_filter.flag | other.flag for payment_filter, other in pairs],
+                dtype=np.int32,
+            )
+        )
+
+        superseding = dict.fromkeys(self.filters, 0)
+
+        for (payment_filter, other), mask in zip(pairs, masks.tolist()):
+            if not mask & payment_filter.flag:
+                superseding[payment_filter] |= int(other.flag)
+
+        return superseding
+
+    def filter_order(
+        self,
+        filters: list[PaymentFilters],
+    ) -> list[PaymentFilters]:
+        """Orders the filters cheapest first, by their filter_costs. Among
+        filters of equal cost, those that supersede others come first and
+        then those with the highest hit rate so far in the run, because a
+        hit on a superseding filter skips the filters it supersedes."""
+
+        hit_rates = self.filter_hit_rates
+        superseding = self.superseding_filters
+
+        return sorted(
+            filters,
+            key=lambda payment_filter: (
+                self.filter_costs.get(payment_filter, 1),
+                -sum(
+                    bool(mask & payment_filter.flag)
+                    for mask in superseding.values()
+                ),
+                -hit_rates.get(payment_filter, 0.0),
+            ),
+        )
+
+    @property
+    def filter_stages(self) -> list[list[PaymentFilters]]:
+        """Splits the filters by the first step of the resolution that
+        ranks them: the first name, middle name and city / state filters,
+        and then the rest, which only count toward the highest matches.
+        Each stage is in filter_order."""
+
+        flags = np.array(
+            [payment_filter.flag for payment_filter in self.filters],
+            dtype=np.int32,
+        )
+
+        stages = [
+            [
+                payment_filter
+                for payment_filter, ranked in zip(self.filters, ranks > 0)
+                if ranked
+            ]
+            for ranks in [
+                self.firstname_rank(flags),
+                self.middlename_rank(flags),
+                self.citystate_rank(flags),
+            ]
+        ]
+
+        stages.append([
+            payment_filter for payment_filter in self.filters
+            if not any(payment_filter in stage for stage in stages)
+        ])
+
+        return [self.filter_order(stage) for stage in stages]
+
+    def evaluate_filters(
+        self,
+        candidates: pd.DataFrame,
+        masks: np.ndarray,
+        evaluated: np.ndarray,
+        rows: np.ndarray,
+        filters: list[PaymentFilters],
+    ) -> np.ndarray:
+        """Evaluates the filters, in order, on the selected rows of the
+        candidates that they haven't been evaluated on yet, OR-ing their
+        PaymentFilterFlags bits into masks and marking them in evaluated.
+        Rows where a superseding filter has already matched are skipped.
+        Returns the masks with superseded filters cleared."""
+
+        superseding = self.superseding_filters
+
+        for payment_filter in filters:
+            flag = int(payment_filter.flag)
+
+            pending = rows & ((evaluated & flag) == 0)
+            evaluated[pending] |= flag
+            pending &= (masks & superseding[payment_filter]) == 0
+
+            if not pending.any():
+                continue
+
+            index = self.filter_index(payment_filter)
+
+            hits = getattr(self, f"mask_by_{payment_filter.lower()}")(
+                candidates[pending],
+                **({"index": index} if index is not None else {}),
+            )
+
+            masks[pending] |= np.where(hits, np.int32(flag), np.int32(0))
+
+            self.filter_evaluations[payment_filter] += int(pending.sum())
+            self.filter_hits[payment_filter] += int(hits.sum())
+
+        return self.supersede_filters(masks)
+
+    def filter_and_resolve_payments_x_conflicteds(
+        self,
+        payments_x_conflicteds: pd.DataFrame,
+        by: Union[str, list[str]] = "provider_pk",
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Filters and resolves unfiltered candidates lazily, returning the
+        same as apply_filters followed by resolve_all_payments_x_conflicteds.
+
+        The filters are evaluated a stage of filter_stages at a time, each
+        stage only on the candidates that its step of the resolution can
+        still use: the first name filters on all of them, the middle name
+        and then the city / state filters on the first name matches of the
+        groups that are still tied, and the rest on the candidates for
+        the highest matches of the groups that are still tied. The rows
+        that are returned then have any remaining filters evaluated, so
+        that their filters are complete.
+
+        Candidates that share a candidate column value, such as the blocks
+        of stack_candidate_blocks, are evaluated once."""
+
+        by = [by] if isinstance(by, str) else list(by)
+
+        payments_x_conflicteds = self.most_recent_payments(
+            self.convert_merged_dtypes(payments_x_conflicteds),
+            by,
+        ).reset_index(drop=True)
+
+        if payments_x_conflicteds.empty:
+            return payments_x_conflicteds, payments_x_conflicteds, payments_x_conflicteds
+
+        codes, _ = pd.factorize(
+            payments_x_conflicteds["candidate"]
+            if "candidate" in payments_x_conflicteds.columns
+            else pd.Series(np.arange(len(payments_x_conflicteds)))
+        )
+        _, first = np.unique(codes, return_index=True)
+
+        candidates = payments_x_conflicteds.iloc[first]
+        masks = PaymentFilterFlags.encode(candidates["filters"])
+        evaluated = np.zeros(len(candidates), dtype=np.int32)
+
+        groups = payments_x_conflicteds.groupby(by, sort=False).ngroup().to_numpy()
+        everyone = np.ones(len(payments_x_conflicteds), dtype=bool)
+
+        firstname_stage, middlename_stage, citystate_stage, final_stage = self.filter_stages
+
+        row_masks = self.evaluate_filters(
+            candidates,
+            masks,
+            evaluated,
+            np.bincount(codes[everyone], minlength=len(candidates)) > 0,
+            firstname_stage,
+        )[codes]
+        firstname = self.top_ranked(self.firstname_rank(row_masks), everyone, groups)
+        tied = firstname & (self.group_counts(firstname, groups) > 1)
+
+        row_masks = self.evaluate_filters(
+            candidates,
+            masks,
+            evaluated,
+            np.bincount(codes[tied], minlength=len(candidates)) > 0,
+            middlename_stage,
+        )[codes]
+        middlename = self.top_ranked(self.middlename_rank(row_masks), firstname, groups)
+        tied &= self.group_counts(middlename, groups) != 1
+
+        row_masks = self.evaluate_filters(
+            candidates,
+            masks,
+            evaluated,
+            np.bincount(codes[tied], minlength=len(candidates)) > 0,
+            citystate_stage,
+        )[codes]
+        citystate = self.top_ranked(self.citystate_rank(row_masks), firstname, groups)
+        tied &= self.group_counts(citystate, groups) != 1
+
+        # Groups without first name matches are resolved on all of their
+        # candidates, the rest on the first of their middle name, city /
+        # state or first name matches that isn't empty
+        no_firstname = self.group_counts(firstname, groups) == 0
+        candidates_for_highest = np.where(
+            self.group_counts(middlename, groups) > 0,
+            middlename,
+            np.where(self.group_counts(citystate, groups) > 0, citystate, firstname),
+        )
+        self.evaluate_filters(
+            candidates,
+            masks,
+            evaluated,
+            np.bincount(
+                codes[no_firstname | (tied & candidates_for_highest)],
+                minlength=len(candidates),
+            ) > 0,
+            middlename_stage + citystate_stage + final_stage,
+        )
+
+        payments_x_conflicteds["filters_mask"] = self.supersede_filters(masks)[codes]
+
+        matches, options, highest = self.resolve_all_payments_x_conflicteds(
+            payments_x_conflicteds,
+            by=by,
+        )
+
+        returned = np.zeros(len(payments_x_conflicteds), dtype=bool)
+        for df in (matches, options, highest):
+            returned[df.index.to_numpy()] = True
+
+        row_masks = self.evaluate_filters(
+            candidates,
+            masks,
+            evaluated,
+            np.bincount(codes[returned], minlength=len(candidates)) > 0,
+            self.filters,
+        )[codes]
+
+        payments_x_conflicteds["filters_mask"] = row_masks
+        payments_x_conflicteds["filters"] = PaymentFilterFlags.decode(
+            row_masks,
+            [PaymentFilters.LASTNAME, PaymentFilters.LASTNAME_PHONETIC] + self.filters,
+        )
+
+        return tuple(
+            payments_x_conflicteds.loc[df.index] for df in (matches, options, highest)
+        )
+
+    def apply_filters(
+        self,
+        merged: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Applies the filters to a payments_x_conflicted DataFrame of
+        candidates column-wise. Each filter's mask_by_ method returns a
+        boolean array for all of the rows, which is OR-ed into an int32
+        filters_mask column of PaymentFilterFlags bits. Superseded
+        filters are then cleared with bit operations and the filters
+        column is decoded from the masks."""
+
+        merged = self.convert_merged_dtypes(merged)
+
+        masks = PaymentFilterFlags.encode(merged["filters"])
+
+        for payment_filter in self.filters:
+            index = self.filter_index(payment_filter)
+
+            masks |= np.where(
+                getattr(self, f"mask_by_{payment_filter.lower()}")(
+                    merged,
+                    **({"index": index} if index is not None else {}),
+                ),
+                np.int32(payment_filter.flag),
+                np.int32(0),
+            )
+
+        masks = self.supersede_filters(masks)
+
+        merged["filters_mask"] = masks
+        merged["filters"] = PaymentFilterFlags.decode(
+            masks,
+            [PaymentFilters.LASTNAME, PaymentFilters.LASTNAME_PHONETIC] + self.filters,
+        )
+
+        return merged
+
+    def process_filtered_payments_x_conflicteds(
+        self,
+        payments_x_conflicted: pd.DataFrame,
+    ) -> None:
+        """Processes a filtered payments_x_conflicted DataFrame and
+        adds either the unique row to the unique_ids df or, if unmatched,
+        the conflicted provider  data about which filters were
+        successfully applied to the unmatched df.
+
+        Can be overwritten for alternative functionality.
+        """
+
+        self.process_resolved_payments_x_conflicted(
+            *self.resolve_all_payments_x_conflicteds(payments_x_conflicted),
+        )
+
+    def process_resolved_payments_x_conflicted(
+        self,
+        matches: pd.DataFrame,
+        options: pd.DataFrame,
+        highest: pd.DataFrame,
+    ) -> None:
+        """Processes the matches, options and highest matches of a single
+        conflicted provider, as returned by resolve_all_payments_x_conflicteds
+        or filter_and_resolve_payments_x_conflicteds, and adds either the
+        unique row to the unique_ids df or, if unmatched, the conflicted
+        provider and the filters of its highest match to the unmatched df."""
+
+        if self.extract_single_match(matches):
+            return
+
+        print(
+            f"Could not find match for {highest['conflict_first_name'].iloc[0]}"
+            f" {highest['last_name'].iloc[0]}"
+        )
+
+        self.journal["unmatched_options"].append(options)
+
+        unmatched_conflict = self.conflicteds[
+            self.conflicteds["provider_pk"] == highest.iloc[0]["provider_pk"]
+        ]
+
+        filters = highest.iloc[0]["filters"]
+
+        self.add_unmatched(
+            conflicted=unmatched_conflict,
+            unmatched=Unmatcheds.UNFILTERABLE,
+            filters=filters,
+            num_filters=len(filters),
+        )
+
+    def resolve_payments_x_conflicted(
+        self,
+        payments_x_conflicted: pd.DataFrame,
+    ) -> tuple[Union[pd.DataFrame, None], pd.DataFrame, list[PaymentFilters]]:
+        """Resolves a filtered payments_x_conflicted DataFrame without
+        recording the result. Returns the single matching row, if one is
+        found, else None, along with the best remaining candidate rows and
+        the filters of the highest matches."""
+
+        matches, options, highest = self.resolve_all_payments_x_conflicteds(
+            payments_x_conflicted,
+        )
+
+        if not matches.empty:
+            return matches, matches, []
+
+        return (
+            None,
+            options,
+            highest.iloc[0]["filters"] if not highest.empty else [],
+        )
+
+    def resolve_all_payments_x_conflicteds(
+        self,
+        payments_x_conflicteds: pd.DataFrame,
+        by: Union[str, list[str]] = "provider_pk",
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Resolves the filtered candidates of every group (by default each
+        provider_pk) at once. Each candidate's PaymentFilterFlags mask is
+        ranked in the order of priority of the get_*_matches methods and
+        the rows that are top ranked in their group are selected with
+        grouped maxima rather than list lookups, in the order:
+        1. First name matches
+        2. Middle name matches of the first name matches
+        3. City / state matches of the first name matches
+        4. The highest matches, i.e. those with the most filters, of the
+        first of 2, 3, 1 or all of the candidates that isn't empty
+        5. City / state, else specialty matches of the highest matches
+
+        A group resolves at the first step that selects a single row.
+        Only each profile_id's most recent payment is kept. Returns the
+        matching row of each resolved group, the best candidates of the
+        unresolved groups (rows of 5, else 4) and the first of the highest
+        matches of each unresolved group, whose filters are reported."""
+
+        by = [by] if isinstance(by, str) else list(by)
+
+        payments_x_conflicteds = self.most_recent_payments(payments_x_conflicteds, by)
+
+        if payments_x_conflicteds.empty:
+            return payments_x_conflicteds, payments_x_conflicteds, payments_x_conflicteds
+
+        masks = (
+            payments_x_conflicteds["filters_mask"].to_numpy(dtype=np.int32)
+            if "filters_mask" in payments_x_conflicteds.columns
+            else PaymentFilterFlags.encode(payments_x_conflicteds["filters"])
+        )
+
+        groups = payments_x_conflicteds.groupby(by, sort=False).ngroup().to_numpy()
+
+        citystate_ranks = self.citystate_rank(masks)
+        specialty_ranks = self.specialty_rank(masks)
+        num_filters = np.bitwise_count(masks)
+
+        firstname = self.top_ranked(
+            self.firstname_rank(masks),
+            np.ones(len(masks), dtype=bool),
+            groups,
+        )
+        middlename = self.top_ranked(self.middlename_rank(masks), firstname, groups)
+        citystate = self.top_ranked(citystate_ranks, firstname, groups)
+
+        candidates = np.where(
+            self.group_counts(middlename, groups) > 0,
+            middlename,
+            np.where(
+                self.group_counts(citystate, groups) > 0,
+                citystate,
+                np.where(self.group_counts(firstname, groups) > 0, firstname, True),
+            ),
+        )
+        highest = candidates & (
+            num_filters == self.group_max(num_filters, candidates, groups)
+        )
+
+        best = self.top_ranked(citystate_ranks, highest, groups)
+        best = np.where(
+            self.group_counts(best, groups) == 0,
+            self.top_ranked(specialty_ranks, highest, groups),
+            np.where(
+                self.group_counts(best, groups) > 1,
+                self.top_ranked(specialty_ranks, best, groups),
+                best,
+            ),
+        )
+
+        matched = np.zeros(len(masks), dtype=bool)
+        resolved = np.zeros(len(masks), dtype=bool)
+
+        for selected in [firstname, middlename, citystate, highest, best]:
+            unique = ~resolved & (self.group_counts(selected, groups) == 1)
+            matched |= unique & selected
+            resolved |= unique
+
+        return (
+            payments_x_conflicteds[matched],
+            payments_x_conflicteds[
+                ~resolved & np.where(self.group_counts(best, groups) > 0, best, highest)
+            ],
+            payments_x_conflicteds[~resolved & highest].drop_duplicates(subset=by),
+        )
+
+    @staticmethod
+    def most_recent_payments(
+        payments_x_conflicteds: pd.DataFrame,
+        by: list[str],
+    ) -> pd.DataFrame:
+        """Sorts the candidates by group and profile_id and keeps only each
+        profile_id's most recent payment in each group. Candidates from a
+        build_profiles table, which have a last_year column, already have
+        a single row per profile_id and are only sorted."""
+
+        payments_x_conflicteds = payments_x_conflicteds.sort_values(
+            by=by + ["profile_id", "payment_year"],
+            ascending=[True] * len(by) + [True, False],
+        )
+
+        if "last_year" in payments_x_conflicteds.columns:
+            return payments_x_conflicteds
+
+        return payments_x_conflicteds.drop_duplicates(
+            subset=by + ["profile_id"],
+            keep="first",
+        )
+
+    @staticmethod
+    def group_counts(
+        selected: np.ndarray,
+        groups: np.ndarray,
+    ) -> np.ndarray:
+        """Returns, for each row, the number of selected rows in its group."""
+
+        return np.bincount(groups, weights=selected)[groups]
+
+    @staticmethod
+    def group_max(
+        values: np.ndarray,
+        selected: np.ndarray,
+        groups: np.ndarray,
+    ) -> np.ndarray:
+        """Returns, for each row, the maximum of the values of the selected
+        rows in its group, or -1 if none of them are selected."""
+
+        maxima = np.full(groups.max() + 1, -1, dtype=np.int64)
+        np.maximum.at(
+            maxima,
+            groups,
+            np.where(selected, np.asarray(values, dtype=np.int64), -1),
+        )
+
+        return maxima[groups]
+
+    @classmethod
+    def top_ranked(
+        cls,
+        ranks: np.ndarray,
+        selected: np.ndarray,
+        groups: np.ndarray,
+    ) -> np.ndarray:
+        """Returns the selected rows whose non-zero rank is the highest
+        among the selected rows of their group."""
+
+        return selected & (ranks > 0) & (
+            ranks == cls.group_max(ranks, selected, groups)
+        )
+
+    def extract_single_match(
+        self,
+        matches: Union[pd.DataFrame, None],
+    ) -> bool:
+        if matches is not None and matches.shape[0] == 1:
+            print(
+                f"Found unique match for {matches['conflict_first_name'].unique()[0]}"
+                f" {matches['last_name'].unique()[0]}"
+            )
+            self.add_unique_id(matches)
+            return True
+        return False
+
+    @staticmethod
+    def get_highest_matches(
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Returns the rows with the most filters applied to them."""
+
+        num_filters = payments_x_conflicteds["filters"].apply(len)
+
+        return payments_x_conflicteds[num_filters == num_filters.max()]
\ No newline at end of file
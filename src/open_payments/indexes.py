@@ -0,0 +1,236 @@
+from collections import deque
+from itertools import product
+from typing import Callable, Hashable, Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnIndex:
+    """Hash index from the values of one or more columns of a DataFrame
+    to the positions of the rows that hold them. Built once per DataFrame,
+    so that a lookup is a dict access plus an iloc gather rather than a
+    comparison against the whole column.
+
+    Args:
+        frame (pd.DataFrame): DataFrame to index.
+        columns (str | list[str]): column(s) whose values are the keys.
+            Keys of multi-column indexes are tuples.
+        normalize (Callable): optional function applied to each key
+            column (a Series) before indexing, e.g. lower-casing.
+
+    Columns that hold lists index each row under every value in its list.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        columns: Union[str, list[str]],
+        normalize: Union[Callable[[pd.Series], pd.Series], None] = None,
+    ):
+        self.columns = [columns] if isinstance(columns, str) else list(columns)
+        self.normalize = normalize
+
+        keys = pd.DataFrame({
+            column: (
+                normalize(frame[column]) if normalize is not None else frame[column]
+            ).to_numpy()
+            for column in self.columns
+        })
+
+        # Rows are indexed under each value of columns that hold lists
+        multi_valued = [
+            column for column in self.columns
+            if keys[column].dtype == object and isinstance(
+                next(iter(keys[column].dropna()), None),
+                (list, tuple, set, np.ndarray),
+            )
+        ]
+
+        self.positions: dict[Hashable, np.ndarray] = {}
+
+        if len(frame) == 0:
+            return
+
+        if not multi_valued:
+            self.positions = pd.Series(np.arange(len(frame))).groupby(
+                [keys[column].to_numpy() for column in self.columns]
+                if len(self.columns) > 1 else keys[self.columns[0]].to_numpy(),
+                dropna=True,
+                sort=False,
+            ).indices
+            return
+
+        keys["position"] = np.arange(len(frame))
+
+        for column in multi_valued:
+            keys = keys.explode(column)
+
+        positions = keys["position"].to_numpy(dtype=np.intp)
+
+        self.positions = {
+            key: np.unique(positions[indices])
+            for key, indices in keys.reset_index(drop=True).groupby(
+                self.columns if len(self.columns) > 1 else self.columns[0],
+                dropna=True,
+                sort=False,
+            ).indices.items()
+        }
+
+    def lookup(self, key: Hashable) -> np.ndarray:
+        """Returns the row positions for the key, or an empty array."""
+
+        return self.positions.get(key, np.array([], dtype=np.intp))
+
+    def take(self, frame: pd.DataFrame, key: Hashable) -> pd.DataFrame:
+        """Returns the rows of the indexed frame for the key."""
+
+        return frame.iloc[self.lookup(key)]
+
+    def size(self, key: Hashable) -> int:
+        """Returns the number of rows for the key."""
+
+        return len(self.lookup(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over a set of patterns. Finds every pattern
+    that occurs as a substring of a text in a single pass over the text,
+    however many patterns there are, rather than one regex scan per pattern.
+
+    Args:
+        patterns (Iterable[str]): patterns to search for. Empty patterns
+            are ignored.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[set[str]] = [set()]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+                self.goto[state][char] = next_state
+            state = next_state
+
+        self.output[state].add(pattern)
+
+    def _build(self) -> None:
+        """Sets the failure links breadth first, so each state's output
+        includes the patterns that end at its longest proper suffix."""
+
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def search(self, text: str) -> set[str]:
+        """Returns the patterns that occur in the text."""
+
+        state = 0
+        found: set[str] = set()
+
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            found |= self.output[state]
+
+        return found
+
+    def matches(self, texts: Iterable[str]) -> dict[str, list[int]]:
+        """Scans the texts once and returns, for each pattern found, the
+        positions of the texts that contain it."""
+
+        matches: dict[str, list[int]] = {}
+
+        for position, text in enumerate(texts):
+            for pattern in self.search(text):
+                matches.setdefault(pattern, []).append(position)
+
+        return matches
+
+
+class BlockingIndex:
+    """Candidate blocks of a DataFrame under several composite keys, e.g.
+    (last name, first initial) and (last name, state). Keeps a ColumnIndex
+    per key so that the rows sharing a record's values on any of the keys
+    are looked up rather than searched for.
+
+    Args:
+        frame (pd.DataFrame): DataFrame to block.
+        keys (list[list[str]]): columns of each composite key. Keys with
+            a column that isn't in the frame are skipped.
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        keys: list[list[str]],
+    ):
+        self.keys = [
+            list(key) for key in keys
+            if all(column in frame.columns for column in key)
+        ]
+        self.indexes = [ColumnIndex(frame, key) for key in self.keys]
+
+    def blocks(self, values: dict[str, Hashable]) -> list[np.ndarray]:
+        """Returns the row positions of the non-empty blocks for the values
+        of the key columns, in the order of the keys. Values that are lists
+        match a row on any of their elements. Keys with a missing value are
+        skipped."""
+
+        blocks = []
+
+        for key, index in zip(self.keys, self.indexes):
+            options = [
+                [
+                    value for value in (
+                        values.get(column) if isinstance(
+                            values.get(column), (list, tuple, set, np.ndarray)
+                        ) else [values.get(column)]
+                    ) if pd.notna(value)
+                ] for column in key
+            ]
+
+            if not all(options):
+                continue
+
+            positions = [
+                index.lookup(combination if len(combination) > 1 else combination[0])
+                for combination in product(*options)
+            ]
+
+            block = np.unique(np.concatenate(positions))
+
+            if len(block):
+                blocks.append(block)
+
+        return blocks
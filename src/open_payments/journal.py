@@ -0,0 +1,205 @@
+import os
+import re
+from typing import Hashable, Union
+
+import pandas as pd
+import pyarrow as pa
+
+from .datasets import from_arrow_table, to_arrow_table
+
+
+class ResultCollector:
+    """Collects the result rows of a search, e.g. the unique_ids, as a list
+    of DataFrames that is concatenated once, when the result is read,
+    rather than on every append. The provider_pks of the rows are kept in
+    a set for constant time lookups.
+
+    Args:
+        ignore_index (bool): whether the concatenated DataFrame gets a
+            new RangeIndex rather than keeping the rows' indexes.
+    """
+
+    def __init__(self, ignore_index: bool = False):
+        self.ignore_index = ignore_index
+        self.frames: list[pd.DataFrame] = []
+        # Frames that haven't been written to the journal yet
+        self.pending: list[pd.DataFrame] = []
+        self.provider_pks: set[Hashable] = set()
+
+    def append(
+        self,
+        frame: pd.DataFrame,
+        journal: bool = True,
+    ) -> None:
+        """Adds the rows of the frame. They are only written to the journal
+        if journal is True, i.e. they weren't read from it."""
+
+        if frame.empty:
+            return
+
+        self.frames.append(frame)
+
+        if journal:
+            self.pending.append(frame)
+
+        if "provider_pk" in frame.columns:
+            self.provider_pks.update(frame["provider_pk"].tolist())
+
+    def reset(self, frame: Union[pd.DataFrame, None] = None) -> None:
+        """Replaces the collected rows with the frame, if any, without
+        journaling them."""
+
+        self.frames = []
+        self.pending = []
+        self.provider_pks = set()
+
+        if frame is not None:
+            self.append(frame, journal=False)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Returns all of the collected rows as one DataFrame."""
+
+        if not self.frames:
+            return pd.DataFrame()
+
+        if len(self.frames) > 1:
+            self.frames = [pd.concat(self.frames, ignore_index=self.ignore_index)]
+
+        return self.frames[0]
+
+    @property
+    def pending_rows(self) -> int:
+        """Returns the number of rows that haven't been journaled."""
+
+        return sum(len(frame) for frame in self.pending)
+
+    def take_pending(self) -> pd.DataFrame:
+        """Returns the rows that haven't been journaled and clears them."""
+
+        pending = pd.concat(self.pending, ignore_index=True) if self.pending else pd.DataFrame()
+        self.pending = []
+        return pending
+
+
+class MatchJournal:
+    """Result collectors of a conflicteds search, appended in batches to a
+    journal directory of Arrow IPC segments so that a killed run can be
+    resumed. Each flush writes one numbered segment per collector with
+    pending rows. Segments are written to a temporary file and renamed,
+    so a crash never leaves a partial segment behind.
+
+    Args:
+        directory (str): journal directory. Results are only kept in
+            memory if None.
+        flush_rows (int): number of pending rows after which the
+            collectors are written to the journal.
+        resume (bool): whether to load the results already in the journal.
+    """
+
+    # Order in which the collectors are flushed. Overruns and options are
+    # written before the results that they belong to, so that a crash
+    # mid-flush can only leave those of providers that are searched again.
+    collectors: list[str] = ["overruns", "unmatched_options", "unique_ids", "unmatched"]
+
+    # Collectors of rows that belong to the results of other collectors
+    dependents: list[str] = ["overruns", "unmatched_options"]
+
+    segment_pattern = re.compile(r"^(\d+)-([a-z_]+)\.arrow$")
+
+    def __init__(
+        self,
+        directory: Union[str, None] = None,
+        flush_rows: int = 1000,
+        resume: bool = False,
+    ):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.results: dict[str, ResultCollector] = {
+            name: ResultCollector(ignore_index=name in ("overruns", "unique_ids"))
+            for name in self.collectors
+        }
+        self.segments = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+            if resume:
+                self.load()
+
+    def __getitem__(self, name: str) -> ResultCollector:
+        return self.results[name]
+
+    @property
+    def searched(self) -> set[Hashable]:
+        """Returns the provider_pks that have been matched or unmatched."""
+
+        return self.results["unique_ids"].provider_pks | self.results["unmatched"].provider_pks
+
+    def segment_path(self, number: int, name: str) -> str:
+        """Returns the path of a collector's numbered segment."""
+
+        return os.path.join(self.directory, f"{number:06d}-{name}.arrow")
+
+    def flush(self, force: bool = False) -> None:
+        """Writes the pending rows of every collector to a new segment if
+        there are at least flush_rows of them, or any if force is True."""
+
+        pending = sum(collector.pending_rows for collector in self.results.values())
+
+        if pending == 0 or (not force and pending < self.flush_rows):
+            return
+
+        for name in self.collectors:
+            frame = self.results[name].take_pending()
+
+            if self.directory is None or frame.empty:
+                continue
+
+            self.write_segment(frame, self.segment_path(self.segments, name))
+
+        self.segments += 1
+
+    @staticmethod
+    def write_segment(frame: pd.DataFrame, path: str) -> str:
+        """Writes the frame to an Arrow IPC file at path, atomically."""
+
+        table = to_arrow_table(frame.reset_index(drop=True))
+
+        with pa.OSFile(f"{path}.tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        os.replace(f"{path}.tmp", path)
+
+        return path
+
+    def load(self) -> None:
+        """Loads the segments in the journal directory into the collectors,
+        in the order they were written."""
+
+        segments = sorted(
+            (int(match.group(1)), match.group(2), file_name)
+            for file_name in os.listdir(self.directory)
+            if (match := self.segment_pattern.match(file_name))
+            and match.group(2) in self.results
+        )
+
+        for number, name, file_name in segments:
+            self.results[name].append(
+                from_arrow_table(
+                    pa.ipc.open_file(
+                        pa.memory_map(os.path.join(self.directory, file_name), "r")
+                    ).read_all()
+                ),
+                journal=False,
+            )
+            self.segments = max(self.segments, number + 1)
+
+        # Overruns and options of providers whose result wasn't written
+        # are dropped, as those providers are searched again
+        for name in self.dependents:
+            dependent = self.results[name]
+
+            if dependent.frames and "provider_pk" in dependent.frame.columns:
+                dependent.reset(dependent.frame[dependent.frame["provider_pk"].isin(self.searched)])
@@ -2,46 +2,49 @@ import os
 import pandas as pd
 from typing import Union, Literal, Type
 
-from .helpers import get_file_suffix, open_payments_directory
+from .catalogs import PaymentCatalogs
+from .datasets import (
+    payments_dataset_partition_exists,
+    read_payments_dataset,
+    write_payments_dataset,
+)
+from .helpers import open_payments_directory
 from .ids import PaymentIDs
-from .payment_types import PaymentTypes
 from .payments import PaymentsSearch
 
 
-def create_MD_DO_payments_csv(
+def MD_DO_payments_dataset_directory(
+    method: Union[Type[PaymentIDs], Type[PaymentsSearch]],
+) -> str:
+    """Returns the directory of the method's curated Parquet dataset."""
+
+    return os.path.join(
+        open_payments_directory(),
+        f"{method.__name__}_dataset",
+    )
+
+
+def create_MD_DO_payments_dataset(
     method: Union[Type[PaymentIDs], Type[PaymentsSearch]],
     payment_class: Literal["general", "ownership", "research"],
     year: Literal[2020, 2021, 2022, 2023]
 ) -> None:
 
-    """Creates an csv file containing the year's OpenPayments payments for the
-    payment type for MDs and DOs."""
+    """Adds the year's OpenPayments payments for the payment type for MDs
+    and DOs to the method's Hive-partitioned (payment_class=/year=)
+    Parquet dataset."""
 
     print(
-        f"Creating csv file for {payment_class} payments for {year}..."
-    )
-    path = open_payments_directory()
-
-    directory = os.path.join(
-        path,
-        f"{method.__name__}_csvs",
+        f"Creating dataset partition for {payment_class} payments for {year}..."
     )
 
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"Directory {directory} created.")
-
-    file_suffix = get_file_suffix([year], [payment_class])
-
-    file_name = f"MD_DO_payments{file_suffix}.csv"
+    directory = MD_DO_payments_dataset_directory(method)
 
-    # Check if the file exists
-    if file_name in os.listdir(
-        directory
-    ):
+    # Check if the partition exists
+    if payments_dataset_partition_exists(directory, payment_class, year):
         print(
-            f"File {directory}/{file_name} already exists. "
-            "Please delete the file if you want to overwrite it."
+            f"Partition payment_class={payment_class}/year={year} already exists "
+            f"in {directory}. Please delete it if you want to overwrite it."
         )
         return
 
@@ -58,90 +61,84 @@ def create_MD_DO_payments_csv(
         f"physician {payment_class} payments found for {year}."
     )
 
-    payments.to_csv(
-        f"{directory}/{file_name}",
-        index=False,
+    write_payments_dataset(
+        payments,
+        directory=directory,
+        payment_class=payment_class,
+        year=year,
     )
 
 
-def create_id_MD_DO_payments_csvs() -> None:
-    """Creates csv files for all OpenPayments payments for MDs and DOs
-    for the years 2020-2023 for all payment types (general, ownership,
-    and research)."""
+def create_id_MD_DO_payments_dataset() -> None:
+    """Creates the Parquet dataset of all OpenPayments payments for MDs
+    and DOs for the years 2020-2023 for all payment types (general,
+    ownership, and research)."""
 
     for payment_class in ["general", "ownership", "research"]:
         for year in [2020, 2021, 2022, 2023]:
-            create_MD_DO_payments_csv(PaymentIDs, payment_class, year)
+            create_MD_DO_payments_dataset(PaymentIDs, payment_class, year)
 
 
-def create_search_general_MD_DO_payments_csvs() -> None:
-    """Creates csv files for all OpenPayments payments for MDs and DOs
-    for the years 2020-2023 for all payment types (general, ownership,
-    and research)."""
+def create_search_general_MD_DO_payments_dataset() -> None:
+    """Creates the Parquet dataset of all OpenPayments general payments
+    for MDs and DOs for the years 2020-2023."""
 
     for payment_class in ["general"]:
         for year in [2020, 2021, 2022, 2023]:
-            create_MD_DO_payments_csv(PaymentsSearch, payment_class, year)
-
-
-def create_payment_types_excel() -> None:
-    PaymentTypes(
-        payment_classes=["general", "ownership", "research"]
-    ).create_payment_types_excel()
-
+            create_MD_DO_payments_dataset(PaymentsSearch, payment_class, year)
 
-def load_MD_DO_id_search_payments() -> pd.DataFrame:
-    """Method that loads all OpenPayments payments for MDs and DOs
-    for the years 2020-2023 for all payment types (general, ownership,
-    and research). The method will return a dataframe with all the
-    payments."""
 
-    path = open_payments_directory()
+def create_catalogs_excel() -> None:
+    """Creates an Excel file of the unique specialties, credentials and
+    payment types, with their frequencies, for all OpenPayments payment
+    classes and years."""
 
-    path = f"{path}/PaymentIDs_csvs"
-
-    # Get the list of files in the directory
-    files = os.listdir(path)
-
-    # Filter the files to only include the ones that start with "MD_DO_payments"
-    files = [f for f in files if f.startswith("MD_DO_payments")]
-
-    # Load the files into a dataframe
-    payments = pd.concat(
-        [pd.read_csv(
-            os.path.join(path, f),
-            dtype={
-                "first_name": str,
-                "middle_name": str,
-                "last_name": str,
-            }) for f in files],
-        ignore_index=True,
+    PaymentCatalogs(
+        nrows=None,
+        payment_classes=["general", "ownership", "research"],
+    ).create_catalogs_excel()
+
+
+def load_MD_DO_id_search_payments(
+    payment_classes: Union[
+        list[Literal["general", "ownership", "research"]],
+        Literal["general", "ownership", "research"],
+        None,
+    ] = None,
+    years: Union[
+        list[Literal[2020, 2021, 2022, 2023]],
+        Literal[2020, 2021, 2022, 2023],
+        None,
+    ] = None,
+    columns: Union[list[str], None] = None,
+) -> pd.DataFrame:
+    """Method that loads OpenPayments payments for MDs and DOs from the
+    PaymentIDs dataset. Only the partitions for the payment classes and
+    years (default all) and the requested columns (default all) are read.
+    The method will return a dataframe with the payments."""
+
+    return read_payments_dataset(
+        MD_DO_payments_dataset_directory(PaymentIDs),
+        payment_classes=payment_classes,
+        years=years,
+        columns=columns,
     )
 
-    return payments
-
 
-def MD_DO_general_search_df() -> pd.DataFrame:
-    """Loads MD/DO general payments from saved csvs
+def MD_DO_general_search_df(
+    years: Union[
+        list[Literal[2020, 2021, 2022, 2023]],
+        Literal[2020, 2021, 2022, 2023],
+        None,
+    ] = None,
+    columns: Union[list[str], None] = None,
+) -> pd.DataFrame:
+    """Loads MD/DO general payments from the PaymentsSearch dataset
     and returns a dataframe with the payments."""
 
-    path = open_payments_directory()
-
-    directory = os.path.join(
-        path,
-        f"{PaymentsSearch.__name__}_csvs",
+    return read_payments_dataset(
+        MD_DO_payments_dataset_directory(PaymentsSearch),
+        payment_classes="general",
+        years=years,
+        columns=columns,
     )
-
-    # Get the list of files in the directory
-    files = os.listdir(directory)
-
-    # Filter the files to only include the ones that start with "MD_DO_payments"
-    files = [f for f in files if f.startswith("MD_DO_payments")]
-
-    # Load the files into a dataframe
-    payments = pd.concat(
-        [pd.read_csv(os.path.join(directory, f)) for f in files],
-        ignore_index=True,
-    )
-
-    return payments
@@ -1,10 +1,87 @@
 import re
+import unicodedata
 from typing import Type, Union
 
+import numpy as np
 import pandas as pd
 
-from .choices import PaymentFilters
-from .helpers import ColumnMixin, str_in_str
+from .choices import PaymentFilterFlags, PaymentFilters
+from .fuzzy import FuzzyNameIndex, partial_name_match, soundex, soundex_names, within_one_edit
+from .helpers import ColumnMixin
+from .indexes import AhoCorasick, ColumnIndex
+
+
+# Generational suffixes dropped from the end of names
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+
+def normalize_name(name: Union[str, None]) -> Union[str, None]:
+    """Returns the key that a name is matched on: casefolded, with accents
+    stripped, dashes normalized to hyphens, other punctuation removed and
+    generational suffixes such as Jr dropped. Returns None for nulls and
+    for names with nothing left."""
+
+    if not isinstance(name, str):
+        return None
+
+    name = "".join(
+        char for char in unicodedata.normalize("NFKD", name)
+        if not unicodedata.combining(char)
+    ).casefold()
+    name = re.sub(r"[\u2010-\u2015_]", "-", name)
+    name = re.sub(r"[^\w\s-]", "", name)
+    name = re.sub(r"\s*-\s*", "-", name).strip("- ")
+
+    tokens = name.split()
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+
+    return " ".join(tokens) or None
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Normalizes a Series of names, once per distinct name."""
+
+    distinct = names.dropna().unique()
+
+    return names.map(dict(zip(distinct, map(normalize_name, distinct))))
+
+
+def equal_names(names: pd.Series, others: pd.Series) -> np.ndarray:
+    """Returns a boolean array of whether each name equals the other.
+    Rows with a null name are False."""
+
+    return names.notna().to_numpy() & (
+        names.to_numpy(dtype=object) == others.to_numpy(dtype=object)
+    )
+
+
+def equal_name_variants(variants: pd.Series, others: pd.Series) -> np.ndarray:
+    """Returns a boolean array of whether each list of name variants, e.g.
+    the first_names of a build_profiles table, holds the other name."""
+
+    lengths = np.fromiter(map(len, variants), dtype=np.intp, count=len(variants))
+    rows = np.repeat(np.arange(len(variants)), lengths)
+
+    matches = np.zeros(len(variants), dtype=bool)
+
+    if len(rows):
+        matches[rows[equal_names(
+            pd.Series([name for names in variants for name in names], dtype=object),
+            pd.Series(others.to_numpy(dtype=object)[rows], dtype=object),
+        )]] = True
+
+    return matches
+
+
+def name_initials(names: pd.Series) -> pd.Series:
+    """Returns the first character of each name, or None for nulls."""
+
+    return pd.Series(
+        [name[0] if isinstance(name, str) and name else None for name in names],
+        index=names.index,
+        dtype=object,
+    )
 
 
 class NamesMixin(ColumnMixin):
@@ -44,6 +121,97 @@ class NamesMixin(ColumnMixin):
         )
         return cols
 
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds normalized first, middle and last name columns and a
+        first initial column to the payments DataFrame and backfills
+        missing middle names from the profile_id's other payments."""
+
+        payments = super().prepare_payments(payments)
+
+        return self.fill_middle_names(
+            self.add_phonetic_keys(
+                self.add_normalized_names(
+                    payments,
+                    ["first_name", "middle_name", "last_name"],
+                )
+            )
+        )
+
+    def prepare_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds normalized name and middle initial columns and a first
+        initial column to the conflicteds DataFrame."""
+
+        conflicteds = super().prepare_conflicteds(conflicteds)
+
+        return self.add_phonetic_keys(
+            self.add_normalized_names(
+                conflicteds,
+                [
+                    "first_name",
+                    "last_name",
+                    "middle_initial_1",
+                    "middle_initial_2",
+                    "middle_name_1",
+                    "middle_name_2",
+                ],
+            )
+        )
+
+    @staticmethod
+    def add_normalized_names(
+        names: pd.DataFrame,
+        columns: list[str],
+    ) -> pd.DataFrame:
+        """Adds a {column}_norm column of normalize_name keys for each of
+        the columns that doesn't have one yet, plus a first_initial column."""
+
+        names = names.assign(**{
+            f"{column}_norm": normalize_names(names[column])
+            for column in columns
+            if column in names.columns and f"{column}_norm" not in names.columns
+        })
+
+        if "first_name_norm" in names.columns and "first_initial" not in names.columns:
+            names["first_initial"] = names["first_name_norm"].map(
+                lambda x: x[0] if isinstance(x, str) else None
+            )
+
+        return names
+
+    @staticmethod
+    def fill_middle_names(payments: pd.DataFrame) -> pd.DataFrame:
+        """Backfills missing middle names with the first middle name of
+        the same profile_id in the DataFrame, because some payments omit
+        the middle name but it can be useful when searching. Done once
+        per payments table, with a groupby, rather than per candidate."""
+
+        if "profile_id" not in payments.columns:
+            return payments
+
+        for column in ["middle_name", "middle_name_norm"]:
+            if column in payments.columns:
+                payments[column] = payments[column].fillna(
+                    payments.groupby("profile_id")[column].transform("first")
+                )
+
+        return payments
+
+    @staticmethod
+    def add_phonetic_keys(names: pd.DataFrame) -> pd.DataFrame:
+        """Adds a last_name_soundex column of the Soundex codes of the
+        normalized last names, if it doesn't have one yet."""
+
+        if "last_name_norm" in names.columns and "last_name_soundex" not in names.columns:
+            names = names.assign(last_name_soundex=soundex_names(names["last_name_norm"]))
+
+        return names
+
 
 class PaymentIDsNames(NamesMixin):
     """Filters OpenPayments data by first, middle, and last names."""
@@ -59,54 +227,249 @@ class PaymentIDsNames(NamesMixin):
         filters.append(PaymentFilters.MIDDLENAME)
         return filters
 
+    @property
+    def filter_costs(self) -> dict[PaymentFilters, int]:
+        """Exact name comparisons are cheap, partial first name
+        matches need an edit distance."""
+        costs: dict[PaymentFilters, int] = super().filter_costs
+        costs.update({
+            PaymentFilters.FIRSTNAME: 1,
+            PaymentFilters.FIRSTNAME_PARTIAL: 3,
+            PaymentFilters.FIRST_MIDDLE_NAME: 1,
+            PaymentFilters.MIDDLE_INITIAL: 1,
+            PaymentFilters.MIDDLENAME: 1,
+        })
+        return costs
+
+    @staticmethod
+    def name_key(
+        payments_x_conflicted: pd.Series,
+        column: str,
+        source: Union[str, None] = None,
+    ) -> Union[str, None]:
+        """Returns the normalized name from the column's _norm column or,
+        if it wasn't precomputed, normalizes the source (default column)."""
+
+        if f"{column}_norm" in payments_x_conflicted.index:
+            value = payments_x_conflicted[f"{column}_norm"]
+            return value if isinstance(value, str) else None
+        return normalize_name(payments_x_conflicted[source or column])
+
+    @staticmethod
+    def name_keys(
+        names: pd.DataFrame,
+        column: str,
+        source: Union[str, None] = None,
+    ) -> pd.Series:
+        """Returns the column's _norm column or, if it wasn't precomputed,
+        normalizes the source (default column)."""
+
+        if f"{column}_norm" in names.columns:
+            return names[f"{column}_norm"]
+        return normalize_names(names[source or column])
+
+    @classmethod
+    def last_name_index(cls, payments: pd.DataFrame) -> ColumnIndex:
+        """Returns an index from normalized last name to the positions
+        of the payments with it. Build it once per payments DataFrame
+        and pass it to merge_by_last_name. The profiles of a build_profiles
+        table are indexed under each of their last_names."""
+
+        if "last_names" in payments.columns:
+            return ColumnIndex(payments, "last_names")
+
+        if "last_name_norm" in payments.columns:
+            return ColumnIndex(payments, "last_name_norm")
+
+        return ColumnIndex(
+            payments,
+            "last_name",
+            normalize=normalize_names,
+        )
+
+    @classmethod
+    def last_name_soundex_index(cls, payments: pd.DataFrame) -> ColumnIndex:
+        """Returns an index from the Soundex code of the normalized last
+        name to the positions of the payments with it. Pass it to
+        merge_by_last_name as the phonetic_index."""
+
+        if "last_name_soundex" in payments.columns:
+            return ColumnIndex(payments, "last_name_soundex")
+
+        return ColumnIndex(
+            payments,
+            "last_name",
+            normalize=lambda last_names: soundex_names(cls.name_keys(
+                last_names.to_frame(),
+                "last_name",
+            )),
+        )
+
+    @classmethod
+    def last_name_phonetic_matches(
+        cls,
+        payments: pd.DataFrame,
+        last_names: list[Union[str, None]],
+        index: ColumnIndex,
+    ) -> list[np.ndarray]:
+        """Searches the payments for misspellings of each of the normalized
+        last_names. Only the payments in the last name's Soundex block,
+        looked up in the payments' last_name_soundex_index, are compared,
+        and their last name must be within one edit of it.
+
+        Returns, for each last name, the positions of the matching payments."""
+
+        payment_last_names = cls.name_keys(payments, "last_name").to_numpy(dtype=object)
+
+        matches = []
+
+        for last_name in last_names:
+            positions = index.lookup(soundex(last_name)) if last_name is not None else (
+                np.array([], dtype=np.intp)
+            )
+
+            if len(positions):
+                block_last_names, inverse = np.unique(
+                    payment_last_names[positions].astype(str),
+                    return_inverse=True,
+                )
+                positions = positions[
+                    np.array([
+                        within_one_edit(last_name, block_last_name)
+                        for block_last_name in block_last_names
+                    ], dtype=bool)[inverse]
+                ]
+
+            matches.append(positions)
+
+        return matches
+
+    @staticmethod
+    def split_last_name(last_name: str) -> list[str]:
+        """Splits a last name into its tokens by hyphen and whitespace."""
+
+        last_name = normalize_name(last_name)
+
+        return [
+            token for token in re.split(r"-|\s+", last_name)
+            if token
+        ] if last_name is not None else []
+
+    @classmethod
+    def last_name_token_matches(
+        cls,
+        last_names: pd.Series,
+        index: ColumnIndex,
+    ) -> list[np.ndarray]:
+        """Searches the payments for last names that contain the tokens
+        of each of the last_names, e.g. for a compound or hyphenated last
+        name. The tokens of all of the last_names are collected into one
+        Aho-Corasick automaton, which scans each distinct payments last
+        name (the keys of the payments' last_name_index) once.
+
+        Returns, for each last name, the positions of the payments whose
+        last name contains all of its tokens, or, if there are none,
+        any of its tokens."""
+
+        tokens = [cls.split_last_name(last_name) for last_name in last_names]
+
+        if not any(tokens):
+            return [np.array([], dtype=np.intp) for _ in tokens]
+
+        payment_last_names = [
+            last_name for last_name in index.positions
+            if isinstance(last_name, str)
+        ]
+
+        token_matches = {
+            token: set(positions) for token, positions in AhoCorasick(
+                {token for last_name_tokens in tokens for token in last_name_tokens}
+            ).matches(payment_last_names).items()
+        }
+
+        matches = []
+
+        for last_name_tokens in tokens:
+            token_sets = [token_matches.get(token, set()) for token in last_name_tokens]
+
+            # If there are multiple last names, select payments
+            # that match all the last names to avoid false positives
+            matched = (
+                set.intersection(*token_sets) or set.union(*token_sets)
+            ) if token_sets else set()
+
+            matches.append(
+                np.sort(np.concatenate([
+                    index.lookup(payment_last_names[position])
+                    for position in matched
+                ])) if matched else np.array([], dtype=np.intp)
+            )
+
+        return matches
+
     @classmethod
     def merge_by_last_name(
         cls,
         payments: pd.DataFrame,
         conflicted: pd.Series,
+        index: Union[ColumnIndex, None] = None,
+        phonetic_index: Union[ColumnIndex, None] = None,
+        token_matches: Union[dict[str, np.ndarray], None] = None,
     ) -> pd.DataFrame:
         """Merges the payments DataFrame with the conflicted provider
         Series by last name. Returns a DataFrame of payments
-        that match the conflicted provider's last name."""
+        that match the conflicted provider's last name. If the payments'
+        last_name_index is passed, exact matches are looked up in it
+        rather than by comparing against every payment. If there are
+        no exact or multiple last name matches, misspellings are searched
+        for in the conflicted's Soundex block of the phonetic_index.
+        The last_name_token_matches of last names that were searched for
+        ahead of time, e.g. of all of the conflicteds in one scan, can be
+        passed as token_matches, by last name, rather than scanned for."""
 
         print(f"Merging Payments df with Conflicted df for {conflicted['last_name']}...")
 
-        merged_payments = payments[
-            payments["last_name"].str.lower()
-            == conflicted["last_name"].lower()
+        conflicted_last_name = cls.name_key(
+            conflicted,
+            "conflict_last_name",
+            source="last_name",
+        )
+
+        merged_payments = index.take(
+            payments,
+            conflicted_last_name,
+        ) if index is not None else payments[
+            cls.name_keys(payments, "last_name")
+            == conflicted_last_name
         ]
 
         # If no last name matches are found, some last names contain
         # multiple last names, so we can check if the conflicted last
         # name is in the payments last name
         if merged_payments.empty:
-            # Split the last name by hyphen and whitespace
-            conflicted_last_names = re.split(
-                r"-|\s+",
-                conflicted["last_name"].lower()
-            )
+            merged_payments = payments.iloc[
+                token_matches[conflicted["last_name"]]
+                if token_matches is not None and conflicted["last_name"] in token_matches
+                else cls.last_name_token_matches(
+                    last_names=pd.Series([conflicted["last_name"]]),
+                    index=index if index is not None else cls.last_name_index(payments),
+                )[0]
+            ]
 
-            # Check if any of potentially multiple last names
-            # are in the payments last name
-            merged_payments = payments[
-                payments["last_name"].str.contains(
-                    '|'.join(conflicted_last_names),
-                    na=False,
-                    case=False,
-                )
+        last_name_filter = PaymentFilters.LASTNAME
+
+        if merged_payments.empty:
+            merged_payments = payments.iloc[
+                cls.last_name_phonetic_matches(
+                    payments=payments,
+                    last_names=[conflicted_last_name],
+                    index=(
+                        phonetic_index if phonetic_index is not None
+                        else cls.last_name_soundex_index(payments)
+                    ),
+                )[0]
             ]
-            if not merged_payments.empty:
-                # If there are multiple last names, select payments
-                # that match all the last names to avoid false positives
-                double_matches = merged_payments[
-                    merged_payments["last_name"].str.contains(
-                        '&'.join(conflicted_last_names),
-                        na=False,
-                        case=False,
-                    )
-                ]
-                if not double_matches.empty:
-                    merged_payments = double_matches
+            last_name_filter = PaymentFilters.LASTNAME_PHONETIC
 
         if merged_payments.empty:
             return merged_payments
@@ -124,7 +487,106 @@ class PaymentIDsNames(NamesMixin):
             axis=1,
         )
 
-        merged.insert(0, "filters", [[PaymentFilters.LASTNAME]] * len(merged))
+        merged.insert(0, "filters", [[last_name_filter]] * len(merged))
+
+        return merged
+
+    @classmethod
+    def merge_all_by_last_name(
+        cls,
+        payments: pd.DataFrame,
+        conflicteds: pd.DataFrame,
+        index: Union[ColumnIndex, None] = None,
+        phonetic_index: Union[ColumnIndex, None] = None,
+        token_matches: Union[dict[str, np.ndarray], None] = None,
+    ) -> pd.DataFrame:
+        """Joins the payments DataFrame with every conflicted provider
+        in the conflicteds DataFrame by last name in a single merge.
+        Conflicteds without an exact last name match are searched for
+        by the tokens of their last names in one pass, other than those
+        in the token_matches (as in merge_by_last_name), and those without
+        either by misspellings in their Soundex block. Returns
+        a DataFrame of payment x conflicted candidate pairs, with the
+        dtypes of both DataFrames preserved. The profiles of a build_profiles
+        table are joined on each of their last_names."""
+
+        key = "last_name_key"
+
+        merged = (
+            payments.assign(**{key: payments["last_names"]}).explode(key)
+            if "last_names" in payments.columns
+            else payments.assign(**{key: cls.name_keys(payments, "last_name")})
+        ).merge(
+            conflicteds.drop(columns="last_name").assign(
+                **{key: cls.name_keys(conflicteds, "conflict_last_name", source="last_name")}
+            ),
+            on=key,
+            how="inner",
+            sort=False,
+        ).drop(columns=key)
+
+        # Each row gets its own list, as the filters are added row by row
+        merged.insert(
+            0,
+            "filters",
+            [[PaymentFilters.LASTNAME] for _ in range(len(merged))],
+        )
+
+        # Conflicteds without an exact match are searched for by the
+        # tokens of their last names, all at once, and the rest by
+        # misspellings of their last names
+        for last_name_filter in [PaymentFilters.LASTNAME, PaymentFilters.LASTNAME_PHONETIC]:
+            unmatched = conflicteds[~conflicteds["provider_pk"].isin(merged["provider_pk"])]
+
+            if unmatched.empty:
+                break
+
+            if last_name_filter == PaymentFilters.LASTNAME:
+                token_matches = token_matches if token_matches is not None else {}
+                known = [last_name in token_matches for last_name in unmatched["last_name"]]
+
+                scanned = iter(cls.last_name_token_matches(
+                    last_names=unmatched["last_name"][~np.array(known, dtype=bool)],
+                    index=index if index is not None else cls.last_name_index(payments),
+                ))
+
+                matches = [
+                    token_matches[last_name] if is_known else next(scanned)
+                    for last_name, is_known in zip(unmatched["last_name"], known)
+                ]
+            else:
+                matches = cls.last_name_phonetic_matches(
+                    payments=payments,
+                    last_names=cls.name_keys(
+                        unmatched,
+                        "conflict_last_name",
+                        source="last_name",
+                    ).tolist(),
+                    index=(
+                        phonetic_index if phonetic_index is not None
+                        else cls.last_name_soundex_index(payments)
+                    ),
+                )
+
+            fallback = pd.concat(
+                [
+                    payments.iloc[
+                        np.concatenate(matches)
+                    ].reset_index(drop=True),
+                    unmatched.drop(columns="last_name").iloc[
+                        np.repeat(np.arange(len(unmatched)), [len(match) for match in matches])
+                    ].reset_index(drop=True),
+                ],
+                axis=1,
+            )
+
+            if not fallback.empty:
+                fallback.insert(
+                    0,
+                    "filters",
+                    [[last_name_filter] for _ in range(len(fallback))],
+                )
+                merged = pd.concat([merged, fallback], ignore_index=True)
 
         return merged
 
@@ -182,6 +644,30 @@ class PaymentIDsNames(NamesMixin):
 
         return refined_matches
 
+    @staticmethod
+    def firstname_rank(masks: np.ndarray) -> np.ndarray:
+        """Ranks PaymentFilterFlags masks in get_firstname_matches'
+        order of priority."""
+
+        return PaymentFilterFlags.rank(
+            masks,
+            [
+                PaymentFilters.FIRSTNAME,
+                PaymentFilters.FIRSTNAME_PARTIAL,
+                PaymentFilters.FIRST_MIDDLE_NAME,
+            ],
+        )
+
+    @staticmethod
+    def middlename_rank(masks: np.ndarray) -> np.ndarray:
+        """Ranks PaymentFilterFlags masks in get_middlename_matches'
+        order of priority."""
+
+        return PaymentFilterFlags.rank(
+            masks,
+            [PaymentFilters.MIDDLENAME, PaymentFilters.MIDDLE_INITIAL],
+        )
+
     @classmethod
     def filter_by_firstname(
         cls,
@@ -192,12 +678,14 @@ class PaymentIDsNames(NamesMixin):
         filter to the filters column to indicate as such if so."""
 
         value = (
-            pd.notna(payments_x_conflicted["first_name"])
-            and pd.notna(payments_x_conflicted["conflict_first_name"])
+            cls.name_key(payments_x_conflicted, "first_name") is not None
             and (
-                payments_x_conflicted["first_name"].lower()
-                == payments_x_conflicted["conflict_first_name"].lower()
+                cls.name_key(payments_x_conflicted, "first_name")
+                == cls.name_key(payments_x_conflicted, "conflict_first_name")
             )
+        ) or (
+            cls.name_key(payments_x_conflicted, "conflict_first_name")
+            in payments_x_conflicted.get("first_names", [])
         )
         # Full match should supercede a partial match or first/middle name match
         if value:
@@ -212,29 +700,81 @@ class PaymentIDsNames(NamesMixin):
 
         return value
 
+    @classmethod
+    def first_name_fuzzy_index(cls, payments: pd.DataFrame) -> FuzzyNameIndex:
+        """Returns a deletion-neighborhood index of the distinct
+        normalized first names of the payments DataFrame."""
+
+        return FuzzyNameIndex.from_series(
+            cls.name_keys(payments, "first_name")
+        )
+
+    def filter_index(
+        self,
+        payment_filter: PaymentFilters,
+    ) -> Union[FuzzyNameIndex, None]:
+        """Returns the first name index of the payments for the
+        FIRSTNAME_PARTIAL filter, building it on first use."""
+
+        if payment_filter != PaymentFilters.FIRSTNAME_PARTIAL or self.prepared_payments is None:
+            return super().filter_index(payment_filter)
+
+        if "first_name_fuzzy" not in self._indexes:
+            self._indexes["first_name_fuzzy"] = self.first_name_fuzzy_index(self.prepared_payments)
+
+        return self._indexes["first_name_fuzzy"]
+
+    @classmethod
+    def firstname_partial_matches(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+        index: Union[FuzzyNameIndex, None] = None,
+    ) -> pd.Series:
+        """Returns a boolean Series of whether each row's first_name and
+        conflict_first_name partially match, i.e. one contains the other
+        or they are within one edit, for a whole DataFrame of candidates."""
+
+        first_names = cls.name_keys(payments_x_conflicteds, "first_name")
+
+        return pd.Series(
+            (
+                index if index is not None else FuzzyNameIndex.from_series(first_names)
+            ).partial_matches(
+                first_names.tolist(),
+                cls.name_keys(payments_x_conflicteds, "conflict_first_name").tolist(),
+            ),
+            index=payments_x_conflicteds.index,
+        )
+
     @classmethod
     def filter_by_firstname_partial(
         cls,
         payments_x_conflicted: pd.Series,
+        index: Union[FuzzyNameIndex, None] = None,
     ) -> bool:
         """Checks if a payment_x_conflicted series has a match
         in its first_name and conflict_first_name columns and adds a
-        filter to the filters column to indicate as such if so."""
+        filter to the filters column to indicate as such if so. Names
+        match if one contains the other or they are within one edit.
+        If the payments' first_name_fuzzy_index is passed, the edit
+        distance is answered from it."""
+
+        first_name = cls.name_key(payments_x_conflicted, "first_name")
+        conflict_first_name = cls.name_key(payments_x_conflicted, "conflict_first_name")
 
         value = (
-            pd.notna(payments_x_conflicted["first_name"])
-            and pd.notna(payments_x_conflicted["conflict_first_name"])
+            first_name is not None
+            and conflict_first_name is not None
             and PaymentFilters.FIRSTNAME not in payments_x_conflicted[
                 "filters"
             ]
-            and (
-                str_in_str(
-                        payments_x_conflicted["first_name"],
-                        payments_x_conflicted["conflict_first_name"]
-                    )
-                or str_in_str(
-                    payments_x_conflicted["conflict_first_name"],
-                    payments_x_conflicted["first_name"]
+            and bool(
+                (
+                    index.partial_match if index is not None
+                    else partial_name_match
+                )(
+                    first_name,
+                    conflict_first_name,
                 )
             )
         )
@@ -266,29 +806,18 @@ class PaymentIDsNames(NamesMixin):
         ) and (
             # Conflict first_name and OpenPayments middle_name
             (
-                pd.notna(payments_x_conflicted["middle_name"])
-                and pd.notna(payments_x_conflicted["conflict_first_name"])
+                cls.name_key(payments_x_conflicted, "middle_name") is not None
                 and (
-                    payments_x_conflicted["middle_name"].lower()
-                    == payments_x_conflicted["conflict_first_name"].lower()
+                    cls.name_key(payments_x_conflicted, "middle_name")
+                    == cls.name_key(payments_x_conflicted, "conflict_first_name")
                 )
             )
             # Conflict middle_names and OpenPayments first_name
             or (
-                (
-                    pd.notna(payments_x_conflicted["conflict_middle_name_1"])
-                    and pd.notna(payments_x_conflicted["first_name"])
-                    and (
-                        payments_x_conflicted["first_name"].lower()
-                        == payments_x_conflicted["conflict_middle_name_1"].lower()
-                    )
-                ) or (
-                    pd.notna(payments_x_conflicted["conflict_middle_name_2"])
-                    and pd.notna(payments_x_conflicted["first_name"])
-                    and (
-                        payments_x_conflicted["first_name"].lower()
-                        == payments_x_conflicted["conflict_middle_name_2"].lower()
-                    )
+                cls.name_key(payments_x_conflicted, "first_name") is not None
+                and cls.name_key(payments_x_conflicted, "first_name") in (
+                    cls.name_key(payments_x_conflicted, "conflict_middle_name_1"),
+                    cls.name_key(payments_x_conflicted, "conflict_middle_name_2"),
                 )
             )
         )
@@ -302,19 +831,26 @@ class PaymentIDsNames(NamesMixin):
 
         return (
             cls.middle_initial_match(
-                conflicted_middle_initial_1=payments_x_conflicted[
-                    "conflict_middle_initial_1"
-                    ],
-                conflicted_middle_initial_2=payments_x_conflicted[
-                    "conflict_middle_initial_2"
-                ],
-                conflicted_middle_name_1=payments_x_conflicted[
-                    "conflict_middle_name_1"
-                ],
-                conflicted_middle_name_2=payments_x_conflicted[
-                    "conflict_middle_name_2"
-                ],
-                payment_middle_name=payments_x_conflicted["middle_name"],
+                conflicted_middle_initial_1=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_initial_1",
+                ),
+                conflicted_middle_initial_2=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_initial_2",
+                ),
+                conflicted_middle_name_1=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_name_1",
+                ),
+                conflicted_middle_name_2=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_name_2",
+                ),
+                payment_middle_name=cls.name_key(
+                    payments_x_conflicted,
+                    "middle_name",
+                ),
             )
         )
 
@@ -326,35 +862,36 @@ class PaymentIDsNames(NamesMixin):
         conflicted_middle_name_2: Union[str, None],
         payment_middle_name: Union[str, None],
     ) -> bool:
-        """Checks if the middle initial matches."""
+        """Checks if the middle initial matches. Compares the names as
+        given, so pass normalized names."""
 
         return pd.notna(payment_middle_name) and (
             (
                 pd.notna(conflicted_middle_initial_1)
                 and (
-                    payment_middle_name[0].lower()
-                    == conflicted_middle_initial_1.lower()
+                    payment_middle_name[0]
+                    == conflicted_middle_initial_1
                 )
             )
             or (
                 pd.notna(conflicted_middle_initial_2)
                 and (
-                    payment_middle_name[0].lower()
-                    == conflicted_middle_initial_2.lower()
+                    payment_middle_name[0]
+                    == conflicted_middle_initial_2
                 )
             )
             or (
                 pd.notna(conflicted_middle_name_1)
                 and (
-                    payment_middle_name.lower()
-                    == conflicted_middle_name_1[0].lower()
+                    payment_middle_name
+                    == conflicted_middle_name_1[0]
                 )
             )
             or (
                 pd.notna(conflicted_middle_name_2)
                 and (
-                    payment_middle_name.lower()
-                    == conflicted_middle_name_2[0].lower()
+                    payment_middle_name
+                    == conflicted_middle_name_2[0]
                 )
             )
         )
@@ -364,18 +901,25 @@ class PaymentIDsNames(NamesMixin):
         cls,
         payments_x_conflicted: pd.Series,
     ) -> bool:
-        """Filters by middle name."""
+        """Filters by middle name, or by any of the middle_names of a
+        build_profiles table."""
 
-        return (
+        return any(
             cls.middlename_match(
-                conflicted_middle_name_1=payments_x_conflicted[
-                    "conflict_middle_name_1"
-                    ],
-                conflicted_middle_name_2=payments_x_conflicted[
-                    "conflict_middle_name_2"
-                ],
-                payment_middle_name=payments_x_conflicted["middle_name"],
+                conflicted_middle_name_1=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_name_1",
+                ),
+                conflicted_middle_name_2=cls.name_key(
+                    payments_x_conflicted,
+                    "conflict_middle_name_2",
+                ),
+                payment_middle_name=middle_name,
             )
+            for middle_name in [
+                cls.name_key(payments_x_conflicted, "middle_name"),
+                *payments_x_conflicted.get("middle_names", []),
+            ]
         )
 
     @staticmethod
@@ -384,21 +928,158 @@ class PaymentIDsNames(NamesMixin):
         conflicted_middle_name_2: Union[str, None],
         payment_middle_name: Union[str, None],
     ) -> bool:
-        """Checks if the middle name matches."""
+        """Checks if the middle name matches. Compares the names as
+        given, so pass normalized names."""
 
         return pd.notna(payment_middle_name) and (
             (
                 pd.notna(conflicted_middle_name_1)
                 and (
-                    payment_middle_name.lower()
-                    == conflicted_middle_name_1.lower()
+                    payment_middle_name
+                    == conflicted_middle_name_1
                 )
             )
             or (
                 pd.notna(conflicted_middle_name_2)
                 and (
-                    payment_middle_name.lower()
-                    == conflicted_middle_name_2.lower()
+                    payment_middle_name
+                    == conflicted_middle_name_2
                 )
             )
         )
+
+    @classmethod
+    def mask_by_firstname(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_firstname: returns a boolean array of
+        the rows whose first_name, or any of the first_names of a
+        build_profiles table, matches the conflict_first_name."""
+
+        conflict_first_names = cls.name_keys(payments_x_conflicteds, "conflict_first_name")
+
+        matches = equal_names(
+            cls.name_keys(payments_x_conflicteds, "first_name"),
+            conflict_first_names,
+        )
+
+        if "first_names" in payments_x_conflicteds.columns:
+            matches |= equal_name_variants(
+                payments_x_conflicteds["first_names"],
+                conflict_first_names,
+            )
+
+        return matches
+
+    @classmethod
+    def mask_by_firstname_partial(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+        index: Union[FuzzyNameIndex, None] = None,
+    ) -> np.ndarray:
+        """Column-wise filter_by_firstname_partial, before full first
+        name matches supersede it."""
+
+        return cls.firstname_partial_matches(
+            payments_x_conflicteds,
+            index=index,
+        ).to_numpy(dtype=bool)
+
+    @classmethod
+    def mask_by_first_middle_name(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_first_middle_name, before first name
+        matches supersede it."""
+
+        first_names = cls.name_keys(payments_x_conflicteds, "first_name")
+
+        return (
+            equal_names(
+                cls.name_keys(payments_x_conflicteds, "middle_name"),
+                cls.name_keys(payments_x_conflicteds, "conflict_first_name"),
+            )
+            | equal_names(
+                first_names,
+                cls.name_keys(payments_x_conflicteds, "conflict_middle_name_1"),
+            )
+            | equal_names(
+                first_names,
+                cls.name_keys(payments_x_conflicteds, "conflict_middle_name_2"),
+            )
+        )
+
+    @classmethod
+    def mask_by_middle_initial(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_middle_initial."""
+
+        middle_names = cls.name_keys(payments_x_conflicteds, "middle_name")
+        middle_initials = name_initials(middle_names)
+
+        return (
+            equal_names(
+                cls.name_keys(payments_x_conflicteds, "conflict_middle_initial_1"),
+                middle_initials,
+            )
+            | equal_names(
+                cls.name_keys(payments_x_conflicteds, "conflict_middle_initial_2"),
+                middle_initials,
+            )
+            | equal_names(
+                name_initials(cls.name_keys(payments_x_conflicteds, "conflict_middle_name_1")),
+                middle_names,
+            )
+            | equal_names(
+                name_initials(cls.name_keys(payments_x_conflicteds, "conflict_middle_name_2")),
+                middle_names,
+            )
+        )
+
+    @classmethod
+    def mask_by_middlename(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_middlename."""
+
+        middle_names = cls.name_keys(payments_x_conflicteds, "middle_name")
+
+        matches = np.zeros(len(payments_x_conflicteds), dtype=bool)
+
+        for column in ["conflict_middle_name_1", "conflict_middle_name_2"]:
+            conflict_middle_names = cls.name_keys(payments_x_conflicteds, column)
+
+            matches |= equal_names(middle_names, conflict_middle_names)
+
+            if "middle_names" in payments_x_conflicteds.columns:
+                matches |= equal_name_variants(
+                    payments_x_conflicteds["middle_names"],
+                    conflict_middle_names,
+                )
+
+        return matches
+
+    def supersede_filters(self, masks: np.ndarray) -> np.ndarray:
+        """A full first name match supersedes a partial or first /
+        middle name match, and a partial match supersedes a first /
+        middle name match."""
+
+        masks = super().supersede_filters(masks)
+
+        first_name = (masks & PaymentFilterFlags.FIRSTNAME) != 0
+        masks = np.where(
+            first_name,
+            masks & ~int(PaymentFilterFlags.FIRSTNAME_PARTIAL | PaymentFilterFlags.FIRST_MIDDLE_NAME),
+            masks,
+        )
+
+        return np.where(
+            (masks & PaymentFilterFlags.FIRSTNAME_PARTIAL) != 0,
+            masks & ~int(PaymentFilterFlags.FIRST_MIDDLE_NAME),
+            masks,
+        ).astype(np.int32)
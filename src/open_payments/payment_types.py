@@ -1,3 +1,4 @@
+from collections import Counter
 from typing import Union, Type
 
 import pandas as pd
@@ -10,9 +11,11 @@ class PaymentTypes(ReadPayments):
 
     def __init__(
         self,
+        nrows: Union[int, None] = None,
         **kwargs
     ):
         super().__init__(
+            nrows=nrows,
             **kwargs
         )
 
@@ -22,7 +25,7 @@ class PaymentTypes(ReadPayments):
         cols = super().general_columns
         cols.update({
             "Form_of_Payment_or_Transfer_of_Value": ("form", str),
-            "Nature_of_Payment_or_Transfer_of_Value": ("nature", str),
+            "Nature_of_Payment_or_Transfer_of_Value": ("payment_type", str),
         })
         return cols
 
@@ -43,6 +46,12 @@ class PaymentTypes(ReadPayments):
         cols.update(
             self.general_columns
         )
+        # Research payments don't have a nature of payment, so the
+        # form of payment is their type
+        cols.pop("Nature_of_Payment_or_Transfer_of_Value", None)
+        cols.update({
+            "Form_of_Payment_or_Transfer_of_Value": ("payment_type", str),
+        })
         return cols
 
     def create_payment_types_excel(self) -> None:
@@ -58,81 +67,26 @@ class PaymentTypes(ReadPayments):
             f"{data_directory}/{file_name}",
             engine="openpyxl",
         ) as writer:
-            df.to_excel(writer, sheet_name="payment_types")
+            df.to_excel(writer, sheet_name="payment_types", index=False)
 
             print("Successfully wrote types of payments to Excel.")
 
     def payment_types(self) -> pd.DataFrame:
-        """Returns a DataFrame of unique types of payments from the OpenPayments datasets."""
-
-        df = pd.DataFrame()
-
-        for payment_class in self.payment_classes:
-            types = getattr(self, f"get_types_of_{payment_class}_payments")()
-            types.insert(1, "payment_class", payment_class, allow_duplicates=True)
-            df = pd.concat([df, types])
-
-        return df
-
-    def get_types_of_general_payments(self) -> pd.DataFrame:
-        if self.general_payments.empty:
-            self.general_payments = self.read_payments_csvs(
-                payment_class="general",
-            )
-
-        unique_nature_of_payments = self.general_payments["Nature_of_Payment_or_Transfer_of_Value"].unique()
-
-        unique_nature_of_payments = pd.DataFrame(unique_nature_of_payments, columns=["Nature_of_Payment_or_Transfer_of_Value"])
-
-        unique_nature_of_payments.rename(
-            columns={"Nature_of_Payment_or_Transfer_of_Value": "payment_type"},
-            inplace=True,
-        )
-
-        unique_nature_of_payments.dropna(inplace=True)
-
-        unique_nature_of_payments.reset_index(drop=True, inplace=True)
+        """Returns a DataFrame of unique types of payments, and their
+        frequencies, for each payment class from a single streaming pass
+        over the OpenPayments datasets."""
 
-        return unique_nature_of_payments
+        counts = self.count_values({"payment_type": ["payment_type"]})
 
-    def get_types_of_ownership_payments(self) -> pd.DataFrame:
-        if self.ownership_payments.empty:
-            self.ownership_payments = self.read_payments_csvs(
-                payment_class="ownership",
-            )
+        return self.payment_type_catalog(counts["payment_type"])
 
-        unique_terms_of_interest = self.ownership_payments["Terms_of_Interest"].unique()
+    @classmethod
+    def payment_type_catalog(cls, counts: Counter) -> pd.DataFrame:
+        """Converts a Counter of (payment_class, payment_type) frequencies
+        into a DataFrame of payment_class, payment_type and frequency columns."""
 
-        unique_terms_of_interest = pd.DataFrame(unique_terms_of_interest, columns=["Terms_of_Interest"])
-
-        unique_terms_of_interest.rename(
-            columns={"Terms_of_Interest": "payment_type"},
-            inplace=True,
-        )
-
-        unique_terms_of_interest.dropna(inplace=True)
-
-        unique_terms_of_interest.reset_index(drop=True, inplace=True)
-
-        return unique_terms_of_interest
-
-    def get_types_of_research_payments(self) -> pd.DataFrame:
-        if self.research_payments.empty:
-            self.research_payments = self.read_payments_csvs(
-                payment_class="research",
-            )
-
-        unique_forms_of_payment = self.research_payments["Form_of_Payment_or_Transfer_of_Value"].unique()
-
-        unique_forms_of_payment = pd.DataFrame(unique_forms_of_payment, columns=["Form_of_Payment_or_Transfer_of_Value"])
-
-        unique_forms_of_payment.rename(
-            columns={"Form_of_Payment_or_Transfer_of_Value": "payment_type"},
-            inplace=True,
+        return cls.counts_to_frame(
+            counts,
+            "payment_type",
+            by_payment_class=True,
         )
-
-        unique_forms_of_payment.dropna(inplace=True)
-
-        unique_forms_of_payment.reset_index(drop=True, inplace=True)
-
-        return unique_forms_of_payment
@@ -45,12 +45,13 @@ class Payments(ReadPayments):
         cols.update(
             {
                 "Covered_Recipient_Profile_ID": ("profile_id", "Int64"),
-                "Form_of_Payment_or_Transfer_of_Value": ("payment_type", str),
+                "Form_of_Payment_or_Transfer_of_Value": ("payment_form", str),
                 "Submitting_Applicable_Manufacturer_or_Applicable_GPO_Name": ("submitting_entity", str),
                 "Total_Amount_of_Payment_USDollars": ("payment_amount", "Float64"),
                 "Applicable_Manufacturer_or_Applicable_GPO_Making_Payment_Name": ("payment_entity", str),
                 "Nature_of_Payment_or_Transfer_of_Value": ("payment_type", str),
                 "Record_ID": ("payment_id", "Int64"),
+                "Program_Year": ("payment_year", "Int16"),
             }
         )
 
@@ -68,6 +69,7 @@ class Payments(ReadPayments):
             "Terms_of_Interest": ("terms_of_interest", str),
             "Submitting_Applicable_Manufacturer_or_Applicable_GPO_Name": ("submitting_entity", str),
             "Applicable_Manufacturer_or_Applicable_GPO_Making_Payment_Name": ("payment_entity", str),
+            "Program_Year": ("payment_year", "Int16"),
         }
 
     @property
@@ -82,6 +84,7 @@ class Payments(ReadPayments):
             "Total_Amount_of_Payment_USDollars": ("payment_amount", "Float64"),
             "Applicable_Manufacturer_or_Applicable_GPO_Making_Payment_Name": ("payment_entity", str),
             "Record_ID": ("payment_id", "Int64"),
+            "Program_Year": ("payment_year", "Int16"),
         }
 
     def update_ownership_payments(self) -> pd.DataFrame:
@@ -0,0 +1,115 @@
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from .credentials import credentials_mask
+from .names import normalize_names
+
+
+# Name columns that are kept from each profile's most recent payment and
+# whose distinct normalized values are collected into {column}s lists,
+# which the last name index and the first and middle name filters match
+PROFILE_NAME_COLUMNS = ["first_name", "middle_name", "last_name"]
+
+# Columns of lists whose distinct elements are collected across payments,
+# with the key that makes their elements comparable
+PROFILE_LIST_COLUMNS: dict[str, Callable[[object], Hashable]] = {
+    "specialtys": lambda specialty: (specialty.specialty, specialty.subspecialty),
+    "citystates": lambda citystate: (citystate.city, citystate.state),
+    "credentials": lambda credential: str(credential),
+}
+
+
+def distinct_names(
+    payments: pd.DataFrame,
+    column: str,
+) -> pd.Series:
+    """Returns a Series, indexed by profile_id, of the sorted distinct
+    non-null normalized values of the column, from its _norm column if
+    it has one."""
+
+    values = pd.DataFrame({
+        "profile_id": payments["profile_id"],
+        column: payments[f"{column}_norm"] if f"{column}_norm" in payments.columns
+        else normalize_names(payments[column]),
+    }).dropna().drop_duplicates()
+
+    return values.sort_values(column).groupby("profile_id")[column].agg(list)
+
+
+def distinct_elements(
+    payments: pd.DataFrame,
+    column: str,
+    key: Callable[[object], Hashable],
+) -> pd.Series:
+    """Returns a Series, indexed by profile_id, of the distinct elements
+    of a column of lists across each profile's payments, in the order
+    they are first seen. Elements are compared by key."""
+
+    elements = payments[["profile_id", column]].explode(column).dropna()
+
+    elements = elements[
+        ~pd.Series(
+            list(zip(elements["profile_id"], map(key, elements[column]))),
+            index=elements.index,
+        ).duplicated().to_numpy()
+    ]
+
+    return elements.groupby("profile_id", sort=False)[column].agg(list)
+
+
+def build_profiles(payments: pd.DataFrame) -> pd.DataFrame:
+    """Consolidates the payments of all classes and years into one row per
+    profile_id, to be matched against instead of the payments.
+
+    Each row holds the names of the profile's most recent payment, the
+    distinct normalized variants of each name in first_names, middle_names
+    and last_names, the union of its specialtys, citystates and credentials,
+    the credentials_mask of those credentials, its npi and the first_year and
+    last_year that it was paid. payment_year is the last_year. Payments
+    without a profile_id can't be identified and are dropped."""
+
+    payments = payments[payments["profile_id"].notna()].sort_values(
+        by=["profile_id", "payment_year"],
+        ascending=[True, False],
+        kind="stable",
+    )
+
+    years = payments.groupby("profile_id")["payment_year"]
+
+    profiles = payments.groupby("profile_id")[
+        [column for column in PROFILE_NAME_COLUMNS if column in payments.columns]
+    ].first()
+
+    for column in PROFILE_NAME_COLUMNS:
+        if column in payments.columns:
+            profiles[f"{column}s"] = distinct_names(payments, column)
+            profiles[f"{column}s"] = [
+                names if isinstance(names, list) else []
+                for names in profiles[f"{column}s"]
+            ]
+
+    for column, key in PROFILE_LIST_COLUMNS.items():
+        if column in payments.columns:
+            profiles[column] = distinct_elements(payments, column, key)
+            # Profiles without any elements get an empty list
+            profiles[column] = [
+                elements if isinstance(elements, list) else []
+                for elements in profiles[column]
+            ]
+
+    if "npi" in payments.columns:
+        profiles["npi"] = payments.groupby("profile_id")["npi"].first()
+
+    if "credentials" in profiles.columns:
+        profiles["credentials_mask"] = np.array(
+            [credentials_mask(credentials) for credentials in profiles["credentials"]],
+            dtype=np.int32,
+        )
+
+    profiles["first_year"] = years.min()
+    profiles["last_year"] = years.max()
+    profiles["payment_year"] = profiles["last_year"]
+
+    return profiles.reset_index()
@@ -1,4 +1,5 @@
-from typing import Literal, Type, Union
+from collections import Counter
+from typing import Iterator, Literal, Type, Union
 
 import pandas as pd
 
@@ -87,37 +88,12 @@ class ReadPayments(ColumnMixin):
 
         print(f"Reading {payment_class} payments...")
 
-        csv_kwargs = self.update_or_create_csv_kwargs(payment_class)
-
         for year in self.years:
 
-            csv_path = (
-                f"{self.payments_folder}/{self.get_payment_csv_path(
-                    payment_class=payment_class, year=year
-                )}"
-            )
-
             payments = pd.concat(
-                (
-                    self.filter_payment_chunk(
-                        x,
-                    )
-                ) for x in pd.read_csv(
-                    csv_path,
-                    header=0,
-                    engine="c",
-                    low_memory=False,
-                    **csv_kwargs,
-                )
-            ) if self.nrows is None else (
-                self.filter_payment_chunk(
-                    pd.read_csv(
-                        csv_path,
-                        header=0,
-                        engine="c",
-                        low_memory=False,
-                        **csv_kwargs,
-                    ),
+                self.read_payments_chunks(
+                    payment_class=payment_class,
+                    year=year,
                 )
             )
 
@@ -132,6 +108,103 @@ class ReadPayments(ColumnMixin):
 
         return getattr(self, f"{payment_class}_payments")
 
+    def read_payments_chunks(
+        self,
+        payment_class: Literal["general", "ownership", "research"],
+        year: Union[Literal[2020, 2021, 2022, 2023], int],
+    ) -> Iterator[pd.DataFrame]:
+        """Yields filtered chunks of the OpenPayments csv file for the payment
+        class and year, so that callers can process a file without holding
+        all of it in memory. Yields a single chunk if nrows is set."""
+
+        csv_kwargs = self.update_or_create_csv_kwargs(payment_class)
+
+        csv_path = (
+            f"{self.payments_folder}/"
+            f"{self.get_payment_csv_path(payment_class=payment_class, year=year)}"
+        )
+
+        chunks = pd.read_csv(
+            csv_path,
+            header=0,
+            engine="c",
+            low_memory=False,
+            **csv_kwargs,
+        )
+
+        if self.nrows is not None:
+            chunks = [chunks]
+
+        for chunk in chunks:
+            yield self.filter_payment_chunk(chunk)
+
+    def count_values(
+        self,
+        fields: dict[str, list[str]],
+    ) -> dict[str, Counter]:
+        """Streams every payment class and year once and returns, for each
+        field, a Counter of (payment_class, value) frequencies across the
+        field's (renamed) columns. Only the running counters are kept in
+        memory, never the payments themselves."""
+
+        counts = {field: Counter() for field in fields}
+
+        for payment_class in self.payment_classes:
+            renames = {
+                key: val[0] for key, val in getattr(self, f"{payment_class}_columns").items()
+            }
+
+            for year in self.years:
+                print(f"Counting {payment_class} payments for {year}...")
+
+                for chunk in self.read_payments_chunks(
+                    payment_class=payment_class,
+                    year=year,
+                ):
+                    chunk = chunk.rename(columns=renames)
+
+                    for field, columns in fields.items():
+                        columns = [column for column in columns if column in chunk.columns]
+
+                        if not columns:
+                            continue
+
+                        values = chunk[columns].stack().value_counts()
+
+                        counts[field].update(
+                            {(payment_class, value): count for value, count in values.items()}
+                        )
+
+        return counts
+
+    @staticmethod
+    def counts_to_frame(
+        counts: Counter,
+        value_name: str,
+        by_payment_class: bool = False,
+    ) -> pd.DataFrame:
+        """Converts a Counter of (payment_class, value) frequencies from
+        count_values into a DataFrame sorted by descending frequency. The
+        frequencies are summed across payment classes unless by_payment_class
+        is True."""
+
+        frame = pd.DataFrame(
+            [
+                (payment_class, value, count)
+                for (payment_class, value), count in counts.items()
+            ],
+            columns=["payment_class", value_name, "frequency"],
+        )
+
+        if not by_payment_class:
+            frame = frame.groupby(value_name, as_index=False)["frequency"].sum()
+
+        return frame.sort_values(
+            by="frequency",
+            ascending=False,
+            kind="stable",
+        ).reset_index(drop=True)
+
     def filter_payment_chunk(
         self,
         payment_chunk: pd.DataFrame,
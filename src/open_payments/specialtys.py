@@ -1,11 +1,13 @@
 import re
-from typing import Type, Union
+from collections import Counter
+from typing import Callable, Type, Union
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel, model_validator
 from typing_extensions import Self
 
-from .choices import PaymentFilters
+from .choices import PaymentFilterFlags, PaymentFilters
 from .helpers import ColumnMixin, get_file_suffix, open_payments_directory
 from .read import ReadPayments
 
@@ -28,6 +30,15 @@ class Specialtys(BaseModel):
 
 class SpecialtysMixin(ColumnMixin):
 
+    specialty_columns = [
+        "specialty_1",
+        "specialty_2",
+        "specialty_3",
+        "specialty_4",
+        "specialty_5",
+        "specialty_6",
+    ]
+
     @property
     def general_columns(self) -> dict[str, tuple[str, Union[Type[str], str]]]:
 
@@ -61,6 +72,42 @@ class SpecialtysMixin(ColumnMixin):
         )
         return cols
 
+    def prepare_payments(
+        self,
+        payments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a specialty_names column of the lower case specialtys
+        of the payments' specialtys."""
+
+        return self.add_specialty_names(super().prepare_payments(payments))
+
+    def prepare_conflicteds(
+        self,
+        conflicteds: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Adds a specialty_names column of the lower case specialtys
+        of the conflicteds' specialtys."""
+
+        return self.add_specialty_names(super().prepare_conflicteds(conflicteds))
+
+    @staticmethod
+    def add_specialty_names(specialtys: pd.DataFrame) -> pd.DataFrame:
+        """Adds a specialty_names column, lists of the distinct lower case
+        specialtys in the specialtys column, if it doesn't have one."""
+
+        if "specialtys" not in specialtys.columns or "specialty_names" in specialtys.columns:
+            return specialtys
+
+        return specialtys.assign(
+            specialty_names=specialtys["specialtys"].apply(
+                lambda x: sorted({
+                    specialty.specialty.lower() for specialty in (
+                        convert_specialtys(x) if isinstance(x, str) else x
+                    ) if pd.notna(specialty) and specialty.specialty
+                }) if isinstance(x, (list, str)) else []
+            )
+        )
+
 
 class PaymentSpecialtys(ReadPayments, SpecialtysMixin):
 
@@ -69,13 +116,7 @@ class PaymentSpecialtys(ReadPayments, SpecialtysMixin):
 
         unique_specialtys = self.unique_specialtys()
 
-        MD_DO = unique_specialtys[unique_specialtys["provider_type"].str.contains(
-            "Allopathic & Osteopathic Physicians",
-            case=False,
-            na=False
-        )]
-
-        MD_DO.drop("provider_type", axis=1, inplace=True)
+        MD_DO = self.MD_DO_specialtys(unique_specialtys)
 
         file_suffix = get_file_suffix(self.years, self.payment_classes)
 
@@ -86,60 +127,48 @@ class PaymentSpecialtys(ReadPayments, SpecialtysMixin):
             unique_specialtys.to_excel(writer, sheet_name="unique_specialtys", index=False)
             MD_DO.to_excel(writer, sheet_name="MD_DO", index=False)
 
-    def unique_specialtys(self) -> pd.Series:
-        """Returns a Series of unique specialties from OpeyPayments payment datasets."""
+    def unique_specialtys(self) -> pd.DataFrame:
+        """Returns a DataFrame of unique specialties, and their frequencies,
+        from a single streaming pass over the OpenPayments payment datasets."""
 
-        self.general_payments = self.read_general_payments_csvs(
-            usecols=self.general_columns.keys(),
-            dtype={key: value[1] for key, value in self.general_columns.items()},
-        )
-        self.general_payments = self.update_payments("general")
+        counts = self.count_values({"specialty": self.specialty_columns})
 
-        self.ownership_payments = self.read_ownership_payments_csvs(
-            usecols=self.ownership_columns.keys(),
-            dtype={key: value[1] for key, value in self.ownership_columns.items()},
-        )
-        self.ownership_payments = self.update_payments("ownership")
+        return self.specialty_catalog(counts["specialty"])
 
-        self.research_payments = self.read_research_payments_csvs(
-            usecols=self.research_columns.keys(),
-            dtype={key: value[1] for key, value in self.research_columns.items()},
-        )
-        self.research_payments = self.update_payments("research")
+    @classmethod
+    def specialty_catalog(cls, counts: Counter) -> pd.DataFrame:
+        """Converts a Counter of (payment_class, specialty string) frequencies
+        into a DataFrame of provider_type, specialty, subspecialty and
+        frequency columns."""
 
-        all_payments = pd.concat([
-            self.general_payments, self.ownership_payments, self.research_payments
-        ])
+        catalog = cls.counts_to_frame(counts, "specialty_str")
 
-        unique_specialty_1_6 = all_payments.drop_duplicates(
-            subset=[
-                "specialty_1",
-                "specialty_2",
-                "specialty_3",
-                "specialty_4",
-                "specialty_5",
-                "specialty_6",
-            ]
+        parts = pd.DataFrame(
+            [
+                (specialty.split("|") + [None, None])[:3]
+                for specialty in catalog["specialty_str"]
+            ],
+            columns=["provider_type", "specialty", "subspecialty"],
+            index=catalog.index,
         )
 
-        all_specialtys = self.get_all_specialtys(unique_specialty_1_6)
-
-        all_specialtys = all_specialtys.dropna()
-
-        return all_specialtys.reset_index(drop=True)
+        return pd.concat(
+            [parts, catalog["frequency"]],
+            axis=1,
+        )
 
-    @classmethod
-    def get_all_specialtys(cls, df: pd.DataFrame) -> pd.Series:
-        """Returns a Series of all Specialtys from the DataFrame."""
+    @staticmethod
+    def MD_DO_specialtys(catalog: pd.DataFrame) -> pd.DataFrame:
+        """Returns the Allopathic & Osteopathic Physicians rows of a
+        specialty catalog, without the provider_type column."""
 
-        df.insert(
-            1,
-            "specialty",
-            df.apply(cls.specialtys_strs, axis=1),
-        )
-        df = cls.drop_individual_specialtys(df)
+        MD_DO = catalog[catalog["provider_type"].str.contains(
+            "Allopathic & Osteopathic Physicians",
+            case=False,
+            na=False
+        )]
 
-        return df["specialty"]
+        return MD_DO.drop("provider_type", axis=1)
 
     @classmethod
     def specialtys(cls, payments: pd.DataFrame) -> pd.DataFrame:
@@ -285,12 +314,6 @@ def convert_specialtys(specialtys: str) -> list[Specialtys]:
     return converted
 
 
-def unique_specialties() -> None:
-    """Creates an Excel file containing unique specialties."""
-
-    PaymentSpecialtys(nrows=None, years=2023).create_unique_specialtys_excel()
-
-
 class PaymentIDsSpecialtys(SpecialtysMixin):
     """Filters OpenPayments payments by specialty."""
 
@@ -302,6 +325,17 @@ class PaymentIDsSpecialtys(SpecialtysMixin):
         filters.append(PaymentFilters.FULLSPECIALTY)
         return filters
 
+    @property
+    def filter_costs(self) -> dict[PaymentFilters, int]:
+        """Specialtys are compared word by word."""
+        costs: dict[PaymentFilters, int] = super().filter_costs
+        costs.update({
+            PaymentFilters.SPECIALTY: 4,
+            PaymentFilters.SUBSPECIALTY: 4,
+            PaymentFilters.FULLSPECIALTY: 4,
+        })
+        return costs
+
     @classmethod
     def filter_by_specialty(
         cls,
@@ -465,6 +499,81 @@ class PaymentIDsSpecialtys(SpecialtysMixin):
             )
         )
 
+    @staticmethod
+    def specialtys_mask(
+        payments_x_conflicteds: pd.DataFrame,
+        matcher: Callable[..., bool],
+    ) -> np.ndarray:
+        """Returns a boolean array of the matcher applied to the
+        specialtys and conflict_specialtys of each row. Rows where
+        either is missing are False."""
+
+        return np.array(
+            [
+                isinstance(specialtys, list)
+                and isinstance(conflict_specialtys, list)
+                and matcher(
+                    payment_specialtys=specialtys,
+                    conflict_specialtys=conflict_specialtys,
+                )
+                for specialtys, conflict_specialtys in zip(
+                    payments_x_conflicteds["specialtys"],
+                    payments_x_conflicteds["conflict_specialtys"],
+                )
+            ],
+            dtype=bool,
+        )
+
+    @classmethod
+    def mask_by_specialty(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_specialty, before full specialty
+        matches supersede it."""
+
+        return cls.specialtys_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_specialty_match,
+        )
+
+    @classmethod
+    def mask_by_subspecialty(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_subspecialty, before full specialty
+        matches supersede it."""
+
+        return cls.specialtys_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_subspecialty_match,
+        )
+
+    @classmethod
+    def mask_by_fullspecialty(
+        cls,
+        payments_x_conflicteds: pd.DataFrame,
+    ) -> np.ndarray:
+        """Column-wise filter_by_fullspecialty."""
+
+        return cls.specialtys_mask(
+            payments_x_conflicteds,
+            cls.payment_conflict_full_specialty_match,
+        )
+
+    def supersede_filters(self, masks: np.ndarray) -> np.ndarray:
+        """A full specialty match supersedes a specialty or
+        subspecialty match."""
+
+        masks = super().supersede_filters(masks)
+
+        return np.where(
+            (masks & PaymentFilterFlags.FULLSPECIALTY) != 0,
+            masks & ~int(PaymentFilterFlags.SPECIALTY | PaymentFilterFlags.SUBSPECIALTY),
+            masks,
+        ).astype(np.int32)
+
     def convert_merged_dtypes(
         self,
         merged: pd.DataFrame,
@@ -515,3 +624,17 @@ class PaymentIDsSpecialtys(SpecialtysMixin):
             ]
 
         return refined_matches
+
+    @staticmethod
+    def specialty_rank(masks: np.ndarray) -> np.ndarray:
+        """Ranks PaymentFilterFlags masks in get_specialty_matches'
+        order of priority."""
+
+        return PaymentFilterFlags.rank(
+            masks,
+            [
+                PaymentFilters.FULLSPECIALTY,
+                PaymentFilters.SPECIALTY,
+                PaymentFilters.SUBSPECIALTY,
+            ],
+        )
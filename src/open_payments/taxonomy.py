@@ -0,0 +1,250 @@
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+
+class SpecialtyNode:
+    """Node of a SpecialtyTrie. Each node is one level of an OpenPayments
+    specialty string (provider_type|specialty|subspecialty) and holds the
+    profile_ids of every provider whose specialty passes through it.
+
+    profile_ids are kept per payment year as sorted, de-duplicated int32
+    arrays, which are a fraction of the size of Python sets and can be
+    combined with numpy's set routines."""
+
+    def __init__(self, label: Union[str, None] = None):
+        self.label = label
+        self.children: dict[str, "SpecialtyNode"] = {}
+        self.profile_ids: dict[Union[int, None], np.ndarray] = {}
+
+    def ids(
+        self,
+        years: Union[list[int], int, None] = None,
+    ) -> np.ndarray:
+        """Returns the profile_ids of the node for the given years, or
+        for all years if years is None."""
+
+        if isinstance(years, int):
+            years = [years]
+
+        arrays = [
+            ids for year, ids in self.profile_ids.items()
+            if years is None or year in years
+        ]
+
+        if not arrays:
+            return np.array([], dtype=np.int32)
+        elif len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def __repr__(self) -> str:
+        return f"SpecialtyNode(label={self.label!r}, children={len(self.children)})"
+
+
+class SpecialtyTrie:
+    """Trie of the OpenPayments specialty taxonomy. Built once from the
+    specialty columns of a payments DataFrame so that queries such as
+    "all Cardiovascular Disease subspecialists in 2022" are answered from
+    the index rather than by re-splitting every payment's specialtys."""
+
+    def __init__(self):
+        self.root = SpecialtyNode()
+
+    @staticmethod
+    def split_path(path: Union[str, list[str], tuple[str, ...]]) -> list[str]:
+        """Splits a specialty string into its normalized trie keys."""
+
+        parts = path.split("|") if isinstance(path, str) else path
+
+        return [part.strip().lower() for part in parts if part and part.strip()]
+
+    @staticmethod
+    def specialty_path(specialty) -> Union[str, None]:
+        """Returns the specialty string of a processed specialtys element,
+        a Specialtys (specialty|subspecialty, without the provider type),
+        its dict or a string, or None if it's empty."""
+
+        if isinstance(specialty, str):
+            return specialty or None
+
+        if not isinstance(specialty, dict):
+            specialty = vars(specialty)
+
+        levels = [
+            level for level in (
+                specialty.get("specialty"),
+                specialty.get("subspecialty"),
+            ) if level
+        ]
+
+        return "|".join(levels) if levels else None
+
+    @classmethod
+    def from_payments(
+        cls,
+        payments: pd.DataFrame,
+        year_column: Union[str, None] = "payment_year",
+    ) -> "SpecialtyTrie":
+        """Builds a SpecialtyTrie from a payments DataFrame with profile_id
+        and either the specialty_1-6 columns of the raw payments or the
+        specialtys column of the processed ones, whose specialtys don't
+        have the provider type, so that their trie starts at the specialty.
+        If the year_column is present the profile_ids are also indexed by
+        year. Raises a ValueError if there are no specialty columns."""
+
+        specialty_columns = [
+            column for column in [
+                "specialty_1",
+                "specialty_2",
+                "specialty_3",
+                "specialty_4",
+                "specialty_5",
+                "specialty_6",
+            ] if column in payments.columns
+        ]
+
+        if not specialty_columns and "specialtys" not in payments.columns:
+            raise ValueError(
+                "payments need specialty_1-6 or specialtys columns to build a SpecialtyTrie."
+            )
+
+        id_columns = ["profile_id"]
+        if year_column is not None and year_column in payments.columns:
+            id_columns.append(year_column)
+        else:
+            year_column = None
+
+        if specialty_columns:
+            specialtys = payments[id_columns + specialty_columns].melt(
+                id_vars=id_columns,
+                value_vars=specialty_columns,
+                value_name="specialty",
+            )
+        else:
+            specialtys = payments[id_columns + ["specialtys"]].explode("specialtys")
+            specialtys = specialtys[id_columns].assign(
+                specialty=specialtys["specialtys"].map(
+                    cls.specialty_path,
+                    na_action="ignore",
+                ),
+            )
+
+        specialtys = specialtys.dropna(subset=["profile_id", "specialty"])
+
+        specialtys = specialtys.drop_duplicates(
+            subset=id_columns + ["specialty"]
+        )
+
+        trie = cls()
+
+        # Collects each node's profile_id arrays before they are merged
+        pending: dict[int, tuple[SpecialtyNode, dict]] = {}
+
+        for keys, profile_ids in specialtys.groupby(
+            ["specialty"] + ([year_column] if year_column else []),
+        )["profile_id"]:
+            specialty = keys[0]
+            year = int(keys[1]) if year_column else None
+            profile_ids = profile_ids.to_numpy(dtype=np.int32)
+
+            for node in trie._insert(specialty):
+                pending.setdefault(id(node), (node, {}))[1].setdefault(
+                    year, []
+                ).append(profile_ids)
+
+        for node, years in pending.values():
+            node.profile_ids = {
+                year: np.unique(np.concatenate(arrays))
+                for year, arrays in years.items()
+            }
+
+        return trie
+
+    def _insert(self, path: str) -> list[SpecialtyNode]:
+        """Inserts the specialty path into the trie and returns the
+        nodes along it, excluding the root."""
+
+        labels = [part.strip() for part in path.split("|") if part and part.strip()]
+
+        node = self.root
+        nodes = []
+
+        for label in labels:
+            key = label.lower()
+            if key not in node.children:
+                node.children[key] = SpecialtyNode(label=label)
+            node = node.children[key]
+            nodes.append(node)
+
+        return nodes
+
+    def node(
+        self,
+        path: Union[str, list[str], tuple[str, ...]],
+    ) -> Union[SpecialtyNode, None]:
+        """Returns the node for the specialty path (or path prefix),
+        or None if it isn't in the trie."""
+
+        node = self.root
+
+        for key in self.split_path(path):
+            node = node.children.get(key)
+            if node is None:
+                return None
+
+        return node
+
+    def profile_ids(
+        self,
+        path: Union[str, list[str], tuple[str, ...]],
+        years: Union[list[int], int, None] = None,
+    ) -> np.ndarray:
+        """Returns the profile_ids of every provider whose specialty
+        starts with the path, e.g. "Allopathic & Osteopathic Physicians|
+        Internal Medicine" returns all internists and their subspecialists."""
+
+        node = self.node(path)
+
+        return node.ids(years) if node is not None else np.array([], dtype=np.int32)
+
+    def find(self, label: str) -> list[tuple[str, SpecialtyNode]]:
+        """Returns the (path, node) pairs of every node with the label at
+        any depth of the trie, for when the parent levels aren't known."""
+
+        key = label.strip().lower()
+
+        return [
+            (path, node) for path, node in self.walk()
+            if node.label is not None and node.label.lower() == key
+        ]
+
+    def profile_ids_for_label(
+        self,
+        label: str,
+        years: Union[list[int], int, None] = None,
+    ) -> np.ndarray:
+        """Returns the profile_ids of every node with the label, at any
+        depth of the trie."""
+
+        arrays = [node.ids(years) for _, node in self.find(label)]
+
+        return np.unique(np.concatenate(arrays)) if arrays else np.array([], dtype=np.int32)
+
+    def walk(self) -> Iterator[tuple[str, SpecialtyNode]]:
+        """Iterates over the (path, node) pairs of the trie, depth first."""
+
+        stack = [("", self.root)]
+
+        while stack:
+            path, node = stack.pop()
+            if node is not self.root:
+                yield path, node
+            for child in reversed(list(node.children.values())):
+                stack.append(
+                    (f"{path}|{child.label}" if path else child.label, child)
+                )
+
+    def __contains__(self, path: Union[str, list[str], tuple[str, ...]]) -> bool:
+        return self.node(path) is not None
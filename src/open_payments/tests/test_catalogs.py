@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ..catalogs import PaymentCatalogs
+
+
+def write_fake_payments_csv(
+    reader: PaymentCatalogs,
+    payment_class: str,
+    year: int,
+    rows: dict[str, list],
+) -> None:
+    """Writes a fake OpenPayments csv with every column the reader uses,
+    filling the columns missing from rows with nulls."""
+
+    columns = getattr(reader, f"{payment_class}_columns").keys()
+    num_rows = len(next(iter(rows.values())))
+
+    payments = pd.DataFrame({
+        column: rows.get(column, [None] * num_rows) for column in columns
+    })
+
+    csv_path = f"{reader.payments_folder}/{reader.get_payment_csv_path(payment_class, year)}"
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    payments.to_csv(csv_path, index=False)
+
+
+class TestPaymentCatalogs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.reader = PaymentCatalogs(
+            payments_folder=self.directory.name,
+            payment_classes=["general", "ownership", "research"],
+            years=2023,
+        )
+
+        write_fake_payments_csv(self.reader, "general", 2023, {
+            "Covered_Recipient_Specialty_1": [
+                "Allopathic & Osteopathic Physicians|Internal Medicine|Rheumatology",
+                "Allopathic & Osteopathic Physicians|Pediatrics",
+                "Physician Assistants & Advanced Practice Nursing Providers|Nurse Practitioner",
+            ],
+            "Covered_Recipient_Specialty_2": [
+                "Allopathic & Osteopathic Physicians|Pediatrics", None, None,
+            ],
+            "Covered_Recipient_Primary_Type_1": [
+                "Medical Doctor", "Doctor of Osteopathy", "Nurse Practitioner",
+            ],
+            "Nature_of_Payment_or_Transfer_of_Value": [
+                "Food and Beverage", "Food and Beverage", "Travel and Lodging",
+            ],
+            "Form_of_Payment_or_Transfer_of_Value": [
+                "In-kind items and services", "Cash or cash equivalent", "Cash or cash equivalent",
+            ],
+        })
+        write_fake_payments_csv(self.reader, "ownership", 2023, {
+            "Physician_Specialty": ["Allopathic & Osteopathic Physicians|Pediatrics"],
+            "Physician_Primary_Type": ["Medical Doctor"],
+            "Terms_of_Interest": ["Stock"],
+        })
+        write_fake_payments_csv(self.reader, "research", 2023, {
+            "Covered_Recipient_Specialty_1": ["Allopathic & Osteopathic Physicians|Pediatrics"],
+            "Covered_Recipient_Primary_Type_1": ["Medical Doctor"],
+            "Form_of_Payment_or_Transfer_of_Value": ["Cash or cash equivalent"],
+        })
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test__research_columns(self):
+        self.assertNotIn(
+            "Nature_of_Payment_or_Transfer_of_Value",
+            self.reader.research_columns,
+        )
+        self.assertEqual(
+            self.reader.research_columns["Form_of_Payment_or_Transfer_of_Value"][0],
+            "payment_type",
+        )
+
+    def test__catalogs(self):
+        catalogs = self.reader.catalogs()
+
+        specialtys = catalogs["specialtys"]
+        self.assertEqual(
+            specialtys.columns.tolist(),
+            ["provider_type", "specialty", "subspecialty", "frequency"],
+        )
+        self.assertEqual(len(specialtys), 3)
+        pediatrics = specialtys.iloc[0]
+        self.assertEqual(pediatrics["specialty"], "Pediatrics")
+        self.assertIsNone(pediatrics["subspecialty"])
+        self.assertEqual(pediatrics["frequency"], 4)
+        self.assertIn("Rheumatology", specialtys["subspecialty"].values)
+
+        MD_DO = catalogs["MD_DO_specialtys"]
+        self.assertEqual(len(MD_DO), 2)
+        self.assertNotIn("provider_type", MD_DO.columns)
+
+        credentials = catalogs["credentials"]
+        self.assertEqual(credentials.iloc[0]["credential"], "Medical Doctor")
+        self.assertEqual(credentials.iloc[0]["frequency"], 3)
+        self.assertEqual(len(credentials), 3)
+
+        payment_types = catalogs["payment_types"]
+        self.assertEqual(
+            payment_types.columns.tolist(),
+            ["payment_class", "payment_type", "frequency"],
+        )
+        general_types = payment_types[payment_types["payment_class"] == "general"]
+        self.assertEqual(
+            dict(zip(general_types["payment_type"], general_types["frequency"])),
+            {"Food and Beverage": 2, "Travel and Lodging": 1},
+        )
+        self.assertIn("Stock", payment_types["payment_type"].values)
+        self.assertEqual(
+            payment_types[payment_types["payment_class"] == "research"]["payment_type"].tolist(),
+            ["Cash or cash equivalent"],
+        )
+
+    def test__unique_credentials(self):
+        unique_credentials = self.reader.unique_credentials().values.tolist()
+
+        self.assertEqual(
+            unique_credentials,
+            ["Medical Doctor", "Doctor of Osteopathy", "Nurse Practitioner"],
+        )
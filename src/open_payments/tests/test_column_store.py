@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ..column_store import PaymentsColumnStore
+from ..payments import Payments
+
+
+class TestPaymentsColumnStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fake_payments = pd.DataFrame({
+            "profile_id": pd.array([3, 1, 3, None], dtype="Int64"),
+            "payment_amount": pd.array([10.0, 20.0, 5.0, None], dtype="Float64"),
+            "payment_year": pd.array([2022, 2023, 2023, 2023], dtype="Int16"),
+            "payment_class": ["general", "general", "ownership", "general"],
+            "payment_entity": ["Pfizer", "Merck", "Pfizer", None],
+            "payment_type": ["Food and Beverage", "Consulting Fee", None, "Food and Beverage"],
+            "terms_of_interest": [None, None, "Stock", None],
+        })
+        self.store = PaymentsColumnStore.export(self.fake_payments, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test__export(self):
+        self.assertEqual(len(self.store), 4)
+        self.assertIsInstance(self.store["profile_id"], np.memmap)
+        self.assertEqual(self.store["profile_id"].tolist(), [3, 1, 3, -1])
+        self.assertEqual(self.store["year"].dtype, np.int16)
+        self.assertEqual(self.store.codes["class_code"], ["general", "ownership"])
+        self.assertEqual(self.store["entity_code"].tolist(), [1, 0, 1, -1])
+
+        reopened = PaymentsColumnStore(self.directory.name)
+        self.assertEqual(reopened.codes, self.store.codes)
+
+    def test__bincount(self):
+        self.assertEqual(self.store.bincount("profile_id").tolist(), [0, 1, 0, 2])
+        self.assertEqual(
+            self.store.bincount("profile_id", weights="payment_amount").tolist(),
+            [0.0, 20.0, 0.0, 15.0],
+        )
+
+    def test__describe_by(self):
+        stats = self.store.describe_by("type_code")
+
+        self.assertEqual(
+            stats.index.tolist(),
+            ["Consulting Fee", "Food and Beverage", "Stock"],
+        )
+        self.assertEqual(stats["total_payments"].tolist(), [1, 2, 1])
+        self.assertEqual(stats["total_amount"].tolist(), [20.0, 10.0, 5.0])
+
+        by_year = self.store.describe_by("year")
+        self.assertEqual(by_year.index.tolist(), [2022, 2023])
+        self.assertEqual(by_year.loc[2023, "total_amount"], 25.0)
+
+    def test__export_payments(self):
+        reader = Payments(
+            years=2023,
+            payments_folder=self.directory.name,
+            nrows=None,
+        )
+
+        values = {
+            "profile_id": [1, 2],
+            "payment_amount": [10.0, 20.0],
+            "value_of_interest": [5.0, 5.0],
+            "payment_year": [2023, 2023],
+            "payment_form": ["Cash or cash equivalent", "In-kind items and services"],
+            "payment_type": ["Food and Beverage", "Consulting Fee"],
+            "terms_of_interest": ["Stock", "Stock option"],
+        }
+
+        # Research payments are typed by their form of payment
+        class_values = {
+            "general": values,
+            "ownership": values,
+            "research": {**values, "payment_type": values["payment_form"]},
+        }
+
+        os.makedirs(os.path.join(self.directory.name, "2023"))
+
+        for payment_class in ["general", "ownership", "research"]:
+            columns = getattr(reader, f"{payment_class}_columns")
+
+            pd.DataFrame({
+                source: class_values[payment_class].get(name, ["x", "y"])
+                if name != "payment_id" else [1, 2]
+                for source, (name, _) in columns.items()
+            }).to_csv(
+                os.path.join(
+                    self.directory.name,
+                    reader.get_payment_csv_path(payment_class=payment_class, year=2023),
+                ),
+                index=False,
+            )
+
+        payments = reader.all_payments()
+
+        self.assertFalse(payments.columns.duplicated().any())
+
+        store = PaymentsColumnStore.export(payments, os.path.join(self.directory.name, "store"))
+
+        self.assertEqual(
+            [store.codes["type_code"][code] for code in store["type_code"]],
+            [
+                "Food and Beverage", "Consulting Fee",
+                "Stock", "Stock option",
+                "Cash or cash equivalent", "In-kind items and services",
+            ],
+        )
+        self.assertEqual(store["payment_amount"].tolist(), [10.0, 20.0, 15.0, 25.0, 10.0, 20.0])
@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 
-from ..credentials import convert_credentials, Credentials, PaymentCredentials
+from ..credentials import CREDENTIAL_BITS, convert_credentials, credentials_mask, Credentials, PaymentCredentials
 
 
 class TestPaymentCredentials(unittest.TestCase):
@@ -114,4 +114,15 @@ class TestConvertCredentials(unittest.TestCase):
         self.assertIsInstance(df["credentials"].iloc[1], list)
         self.assertEqual(len(df["credentials"].iloc[1]), 2)
         self.assertIn(Credentials.MEDICAL_DOCTOR, df["credentials"].iloc[1])
-        self.assertIn(Credentials.DOCTOR_OF_OSTEOPATHY, df["credentials"].iloc[1])
\ No newline at end of file
+        self.assertIn(Credentials.DOCTOR_OF_OSTEOPATHY, df["credentials"].iloc[1])
+
+    def test__credentials_mask(self):
+        self.assertEqual(
+            credentials_mask([Credentials.MEDICAL_DOCTOR, Credentials.CHIROPRACTOR]),
+            CREDENTIAL_BITS[Credentials.MEDICAL_DOCTOR] | CREDENTIAL_BITS[Credentials.CHIROPRACTOR],
+        )
+        self.assertEqual(
+            credentials_mask("[<Credentials.MEDICAL_DOCTOR: 'Medical Doctor'>]"),
+            CREDENTIAL_BITS[Credentials.MEDICAL_DOCTOR],
+        )
+        self.assertEqual(credentials_mask(None), 0)
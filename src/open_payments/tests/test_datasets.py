@@ -0,0 +1,132 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ..choices import Credentials, PaymentFilters
+from ..citystates import CityState
+from ..datasets import (
+    open_payments_snapshot,
+    read_payments_dataset,
+    read_payments_snapshot,
+    to_arrow_table,
+    write_payments_dataset,
+    write_payments_snapshot,
+)
+from ..specialtys import Specialtys
+
+
+class TestPaymentsDataset(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fake_payments = pd.DataFrame({
+            "profile_id": pd.array([1, 2], dtype="Int32"),
+            "payment_class": ["general", "general"],
+            "first_name": ["John", "Jane"],
+            "middle_name": [None, None],
+            "last_name": ["Doe", "Smith"],
+            "specialtys": [
+                [Specialtys(specialty="Pediatrics", subspecialty="Neonatology")],
+                [Specialtys(specialty="Surgery")],
+            ],
+            "credentials": [
+                [Credentials.MEDICAL_DOCTOR],
+                [Credentials.MEDICAL_DOCTOR, Credentials.DOCTOR_OF_OSTEOPATHY],
+            ],
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [],
+            ],
+            "payment_year": pd.array([2022, 2022], dtype="Int16"),
+        })
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test__to_arrow_table(self):
+        table = to_arrow_table(self.fake_payments)
+
+        self.assertEqual(
+            table.schema.field("specialtys").type,
+            pa.list_(pa.struct([("specialty", pa.string()), ("subspecialty", pa.string())])),
+        )
+        self.assertEqual(table.schema.field("credentials").type, pa.list_(pa.string()))
+        self.assertEqual(table.schema.field("middle_name").type, pa.string())
+        self.assertEqual(
+            table.column("citystates").to_pylist()[0],
+            [{"city": "New York", "state": "NY"}],
+        )
+
+    def test__read_payments_dataset(self):
+        write_payments_dataset(self.fake_payments, self.directory.name, "general", 2022)
+        research = self.fake_payments.iloc[[0]].assign(
+            payment_year=pd.array([2023], dtype="Int64"),
+        )
+        write_payments_dataset(research, self.directory.name, "research", 2023)
+
+        payments = read_payments_dataset(self.directory.name)
+        self.assertEqual(len(payments), 3)
+        self.assertEqual(
+            sorted(payments["payment_class"].unique().tolist()),
+            ["general", "research"],
+        )
+
+        general = read_payments_dataset(
+            self.directory.name,
+            payment_classes="general",
+            years=[2022],
+        )
+        self.assertEqual(len(general), 2)
+        self.assertEqual(general["profile_id"].dtype, "Int32")
+
+        doe = general[general["last_name"] == "Doe"].iloc[0]
+        self.assertEqual(
+            doe["specialtys"],
+            [Specialtys(specialty="Pediatrics", subspecialty="Neonatology")],
+        )
+        self.assertEqual(doe["credentials"], [Credentials.MEDICAL_DOCTOR])
+        self.assertEqual(doe["citystates"], [CityState(city="New York", state="NY")])
+
+        projected = read_payments_dataset(
+            self.directory.name,
+            years=2023,
+            columns=["profile_id", "last_name"],
+        )
+        self.assertEqual(projected.columns.tolist(), ["profile_id", "last_name"])
+        self.assertEqual(projected["profile_id"].tolist(), [1])
+
+    def test__filters_column(self):
+        table = to_arrow_table(
+            pd.DataFrame({"filters": [[PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME]]})
+        )
+        self.assertEqual(table.column("filters").to_pylist(), [["LASTNAME", "FIRSTNAME"]])
+
+
+class TestPaymentsSnapshot(unittest.TestCase):
+    def test__read_payments_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_payments_snapshot(
+                pd.DataFrame({
+                    "profile_id": pd.array([1, None], dtype="Int32"),
+                    "last_name": ["Doe", "Smith"],
+                    "credentials": [[Credentials.MEDICAL_DOCTOR], []],
+                }),
+                f"{directory}/payments.arrow",
+            )
+
+            table = open_payments_snapshot(path)
+            self.assertEqual(table.num_rows, 2)
+
+            payments = read_payments_snapshot(path)
+            self.assertEqual(payments["profile_id"].dtype, "Int32")
+            self.assertTrue(pd.isna(payments["profile_id"].iloc[1]))
+            self.assertEqual(payments["credentials"].iloc[0], [Credentials.MEDICAL_DOCTOR])
+
+            projected = read_payments_snapshot(path, columns=["last_name"])
+            self.assertEqual(projected.columns.tolist(), ["last_name"])
+
+            taken = read_payments_snapshot(path, rows=np.array([1]))
+            self.assertEqual(taken["last_name"].tolist(), ["Smith"])
+            self.assertEqual(taken["credentials"].iloc[0], [])
@@ -0,0 +1,83 @@
+import unittest
+
+import pandas as pd
+
+from ..fuzzy import (
+    FuzzyNameIndex,
+    deletion_neighborhood,
+    partial_name_match,
+    soundex,
+    soundex_names,
+    within_one_edit,
+)
+
+
+class TestWithinOneEdit(unittest.TestCase):
+    def test__within_one_edit(self):
+        self.assertTrue(within_one_edit("john", "john"))
+        self.assertTrue(within_one_edit("john", "jon"))
+        self.assertTrue(within_one_edit("jon", "john"))
+        self.assertTrue(within_one_edit("katherine", "catherine"))
+        self.assertFalse(within_one_edit("jon", "jane"))
+        self.assertFalse(within_one_edit("ethan", "ehtan"))
+        self.assertFalse(within_one_edit("al", "alan"))
+
+    def test__deletion_neighborhood(self):
+        self.assertEqual(deletion_neighborhood("joe"), {"joe", "oe", "je", "jo"})
+
+    def test__partial_name_match(self):
+        self.assertTrue(partial_name_match("jo", "joseph"))
+        self.assertTrue(partial_name_match("joseph", "josph"))
+        self.assertFalse(partial_name_match("joseph", "josef"))
+        self.assertFalse(partial_name_match("jane", "joseph"))
+        # An initial only matches the names within one edit of it
+        self.assertFalse(partial_name_match("s", "joseph"))
+        self.assertTrue(partial_name_match("j", "jo"))
+
+
+class TestSoundex(unittest.TestCase):
+    def test__soundex(self):
+        self.assertEqual(soundex("robert"), "R163")
+        self.assertEqual(soundex("rupert"), "R163")
+        self.assertEqual(soundex("ashcraft"), "A261")
+        self.assertEqual(soundex("tymczak"), "T522")
+        self.assertEqual(soundex("pfister"), "P236")
+        self.assertEqual(soundex("lee"), "L000")
+        self.assertEqual(soundex("de-la cruz"), "D426")
+        self.assertIsNone(soundex("123"))
+        self.assertIsNone(soundex(None))
+
+    def test__soundex_names(self):
+        codes = soundex_names(pd.Series(["smith", None, "smyth"]))
+        self.assertEqual(codes.iloc[0], "S530")
+        self.assertTrue(pd.isna(codes.iloc[1]))
+        self.assertEqual(codes.iloc[2], "S530")
+
+
+class TestFuzzyNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FuzzyNameIndex.from_series(
+            pd.Series(["john", "jon", "joan", "ethan", "jane", None, "john"])
+        )
+
+    def test__neighbors(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.neighbors("john"), {"john", "jon", "joan"})
+        self.assertEqual(self.index.neighbors("jan"), {"jon", "joan", "jane"})
+        # Transpositions share a deletion but are two edits apart
+        self.assertEqual(self.index.neighbors("ehtan"), set())
+
+    def test__within_one_edit(self):
+        self.assertTrue(self.index.within_one_edit("johm", "john"))
+        self.assertTrue(self.index.within_one_edit("dave", "davi"))
+        self.assertFalse(self.index.within_one_edit("jane", "john"))
+
+    def test__partial_matches(self):
+        matches = self.index.partial_matches(
+            ["john", "ethan", "jane", None, "jon"],
+            ["jonathan", "ethen", "joan", "john", "jonathan"],
+        )
+        self.assertEqual(matches.tolist(), [False, True, False, False, True])
+
+        self.assertFalse(self.index.partial_match("e", "ethan"))
+        self.assertTrue(self.index.partial_match("eth", "ethan"))
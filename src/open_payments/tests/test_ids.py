@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 from typing import Union
 
@@ -6,8 +7,11 @@ import pandas as pd
 
 from ..citystates import CityState
 from ..credentials import Credentials
+from ..datasets import decode_lazy_columns
+from ..choices import PaymentFilterFlags
 from ..ids import ConflictedPaymentIDs, PaymentFilters, PaymentIDs, Unmatcheds
 from ..specialtys import Specialtys
+from .test_catalogs import write_fake_payments_csv
 
 
 class TestPaymentIDs(unittest.TestCase):
@@ -29,6 +33,70 @@ class TestPaymentIDs(unittest.TestCase):
         self.assertIn("payment_year", payments.columns)
         self.assertIn("payment_class", payments.columns)
 
+    def test__remove_seen_ids(self):
+        reader = PaymentIDs(nrows=100, payment_classes=["general", "ownership"])
+
+        self.assertEqual(
+            sorted(reader.profile_id_columns),
+            ["Covered_Recipient_Profile_ID", "Physician_Profile_ID"],
+        )
+
+        chunk = pd.DataFrame({
+            "Covered_Recipient_Profile_ID": pd.array([5, None, 5, 2], dtype="Int32"),
+            "payment": [1, 2, 3, 4],
+        })
+        chunk = reader.remove_seen_ids(chunk, "Covered_Recipient_Profile_ID")
+
+        self.assertEqual(chunk["payment"].tolist(), [1, 2, 4])
+
+        # IDs seen in an earlier chunk of the class and year are removed
+        chunk = pd.DataFrame({
+            "Physician_Profile_ID": pd.array([2, 1000, None], dtype="Int32"),
+            "payment": [5, 6, 7],
+        })
+        chunk = reader.remove_seen_ids(chunk, "Physician_Profile_ID")
+
+        self.assertEqual(chunk["payment"].tolist(), [6, 7])
+        self.assertTrue(reader.seen_profile_ids[[2, 5, 1000]].all())
+
+    def test__all_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            reader = PaymentIDs(
+                nrows=None,
+                payment_classes=["general"],
+                years=[2020, 2021],
+                payments_folder=directory,
+            )
+
+            for year, middle_name, city, state in [
+                (2020, "Alpha", "NEW YORK", "NY"),
+                (2021, "Q", "DENVER", "CO"),
+            ]:
+                write_fake_payments_csv(reader, "general", year, {
+                    "Covered_Recipient_Profile_ID": [7, 7],
+                    "Covered_Recipient_First_Name": ["John", "John"],
+                    "Covered_Recipient_Middle_Name": [middle_name, middle_name],
+                    "Covered_Recipient_Last_Name": ["Doe", "Doe"],
+                    "Recipient_City": [city, city],
+                    "Recipient_State": [state, state],
+                    "Covered_Recipient_Primary_Type_1": ["Medical Doctor", "Medical Doctor"],
+                    "Program_Year": [year, year],
+                })
+
+            profiles = reader.all_profiles()
+
+        # Each year keeps a payment, so the profile has the names and
+        # citystates of both
+        self.assertEqual(profiles["profile_id"].tolist(), [7])
+        self.assertEqual(profiles["first_year"].tolist(), [2020])
+        self.assertEqual(profiles["last_year"].tolist(), [2021])
+        self.assertEqual(profiles["middle_name"].tolist(), ["Q"])
+        self.assertEqual(sorted(profiles["middle_names"].iloc[0]), ["alpha", "q"])
+        self.assertEqual(
+            sorted(citystate.city for citystate in profiles["citystates"].iloc[0]),
+            ["DENVER", "NEW YORK"],
+        )
+
 
 def add_conflicted_to_conflicteds_df(
     conflicteds: pd.DataFrame,
@@ -123,6 +191,34 @@ def add_payment_id_to_payments_df(
     return payments
 
 
+class TestPaymentFilterFlags(unittest.TestCase):
+    def test__encode_decode(self):
+        filters = [
+            [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME],
+            [],
+            [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME],
+            [PaymentFilters.LASTNAME_PHONETIC, PaymentFilters.CITYSTATE],
+        ]
+
+        masks = PaymentFilterFlags.encode(filters)
+
+        self.assertEqual(masks.dtype, np.int32)
+        self.assertEqual(
+            masks.tolist(),
+            [
+                PaymentFilterFlags.LASTNAME | PaymentFilterFlags.FIRSTNAME,
+                0,
+                PaymentFilterFlags.LASTNAME | PaymentFilterFlags.FIRSTNAME,
+                PaymentFilterFlags.LASTNAME_PHONETIC | PaymentFilterFlags.CITYSTATE,
+            ],
+        )
+
+        decoded = PaymentFilterFlags.decode(masks, list(PaymentFilters))
+
+        self.assertEqual(decoded, filters)
+        self.assertIsNot(decoded[0], decoded[2])
+
+
 class TestConflictedPaymentIDs(unittest.TestCase):
     def setUp(self):
         self.fake_conflicteds = pd.DataFrame({
@@ -246,6 +342,790 @@ class TestConflictedPaymentIDs(unittest.TestCase):
             Unmatcheds.NOLASTNAME
         )
 
+    def test__search_for_conflicteds_ids_batch(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        iterative = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+        iterative.search_for_conflicteds_ids()
+
+        batch = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+        batch.search_for_conflicteds_ids(batch=True)
+
+        self.assertEqual(
+            batch.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+            iterative.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+        )
+        self.assertEqual(
+            batch.unique_ids["filters"].tolist(),
+            iterative.unique_ids["filters"].tolist(),
+        )
+        self.assertEqual(
+            batch.unmatched[["provider_pk", "unmatched"]].values.tolist(),
+            iterative.unmatched[["provider_pk", "unmatched"]].values.tolist(),
+        )
+
+        # Already searched conflicteds are skipped
+        batch.search_for_conflicteds_ids(batch=True)
+        self.assertEqual(len(batch.unique_ids), len(iterative.unique_ids))
+
+    def test__search_exact_matches(self):
+        conflicteds = add_conflict_prefix(
+            self.reader.prepare_conflicteds(self.fake_conflicteds)
+        )
+
+        self.reader.search_exact_matches(conflicteds)
+
+        # Only John Doe has an exact first and last name match
+        self.assertEqual(
+            self.reader.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+            [[1, 1]],
+        )
+        self.assertIn(PaymentFilters.FIRSTNAME, self.reader.unique_ids["filters"].iloc[0])
+        self.assertIn(PaymentFilters.MIDDLENAME, self.reader.unique_ids["filters"].iloc[0])
+
+        # John Does that are ambiguous are left for the filters
+        for data in [
+            [7, "John", None, "Doe", [], [], []],
+            [pd.NA, "John", None, "Doe", [], [], []],
+            [1, "Johnny", None, "Doe", [], [], [], 2024],
+        ]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=self.fake_conflicteds,
+                payments=add_payment_id_to_payments_df(self.fake_payments, *data),
+            )
+            reader.search_exact_matches(conflicteds)
+
+            self.assertTrue(reader.unique_ids.empty)
+
+    def test__search_npi_matches(self):
+        payments = self.fake_payments.assign(
+            npi=pd.array([1000000001, 1000000002, 1000000003], dtype="Int64"),
+        )
+        payments = add_payment_id_to_payments_df(
+            payments,
+            2,
+            "Jane",
+            None,
+            "Smith-Jones",
+            [],
+            [],
+            [],
+            2021,
+        )
+        conflicteds = self.fake_conflicteds.assign(
+            npi=[None, 1000000002, 1000000003, 1000000004],
+        )
+
+        # Profile 3's NPI is also on another profile's payments
+        payments.loc[len(payments)] = payments.iloc[2]
+        payments.loc[len(payments) - 1, "profile_id"] = 9
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=conflicteds,
+            payments=payments,
+        )
+        reader.search_for_conflicteds_ids()
+
+        # Judd Smith is matched by NPI, to Jane Smith's most recent payment
+        npi_match = reader.unique_ids[reader.unique_ids["provider_pk"] == 2].iloc[0]
+
+        self.assertEqual(npi_match["profile_id"], 2)
+        self.assertEqual(npi_match["last_name"], "Smith")
+        self.assertEqual(npi_match["filters"], [PaymentFilters.NPI])
+        self.assertEqual(npi_match["filters_mask"], PaymentFilterFlags.NPI)
+
+        # The rest are searched for by name
+        self.assertNotIn(3, reader.npi_matches()["profile_id"].tolist())
+        self.assertIn(PaymentFilters.FIRSTNAME, reader.unique_ids.iloc[0]["filters"])
+        self.assertEqual(reader.unmatched["provider_pk"].tolist(), [3, 4])
+
+    def test__candidates_for_conflicted(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+            candidate_cache_size=2,
+        )
+        conflicteds = add_conflict_prefix(reader.prepare_conflicteds(self.fake_conflicteds))
+
+        doe = reader.candidates_for_conflicted(conflicteds.iloc[0])
+
+        # A second conflicted with the same last name gets the cached
+        # payments with its own columns
+        other_doe = conflicteds.iloc[1].copy()
+        other_doe["last_name"] = "Doe"
+        other_doe["conflict_last_name_norm"] = "doe"
+
+        cached = reader.candidates_for_conflicted(other_doe)
+
+        self.assertEqual(list(reader.candidate_cache), ["doe"])
+        self.assertEqual(cached.columns.tolist(), doe.columns.tolist())
+        self.assertEqual(cached["profile_id"].tolist(), doe["profile_id"].tolist())
+        self.assertEqual(cached["conflict_first_name"].unique().tolist(), ["Judd"])
+        self.assertEqual(
+            reader.apply_filters(cached)["filters"].tolist(),
+            reader.apply_filters(
+                reader.merge_by_last_name(payments=reader.prepared_payments, conflicted=other_doe)
+            )["filters"].tolist(),
+        )
+
+        # The least recently used last name is evicted
+        for _, conflicted in conflicteds.iloc[2:].iterrows():
+            reader.candidates_for_conflicted(conflicted)
+
+        self.assertEqual(list(reader.candidate_cache), ["johnson", "ebalt"])
+        self.assertTrue(reader.candidate_cache["ebalt"].empty)
+
+    def test__narrow_candidates(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        # A second John Doe makes the exact name ambiguous
+        self.fake_payments = add_payment_id_to_payments_df(
+            self.fake_payments,
+            7,
+            "John",
+            None,
+            "Doe",
+            [Specialtys(specialty="Pediatrics")],
+            [Credentials.MEDICAL_DOCTOR],
+            [CityState(city="Los Angeles", state="CA")],
+        )
+
+        results = []
+
+        for batch in [False, True]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=self.fake_conflicteds,
+                payments=self.fake_payments,
+                candidate_budget=2,
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            results.append(reader)
+
+            # The five Does are narrowed to the three with a J first
+            # initial and then to the two in New York
+            self.assertEqual(
+                reader.overruns[["provider_pk", "candidates", "narrowed"]].values.tolist(),
+                [[1, 5, 2]],
+            )
+            self.assertEqual(reader.overruns["narrowing_keys"].iloc[0], ["first_initial", "state"])
+            self.assertEqual(
+                reader.unique_ids[reader.unique_ids["provider_pk"] == 1]["profile_id"].tolist(),
+                [1],
+            )
+
+        self.assertEqual(
+            results[0].unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+            results[1].unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+        )
+
+    def test__explain(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds.assign(
+                last_name=["Doe", "Smith", "Johnsen", "Ebalt"],
+                npi=[None, 1000000002, None, None],
+            ),
+            payments=self.fake_payments.assign(
+                npi=pd.array([None, 1000000002, None, None, None, None], dtype="Int64"),
+            ),
+            candidate_budget=2,
+            seconds_per_conflicted=1.0,
+            seconds_per_candidate=0.5,
+        )
+
+        workload = reader.explain()
+
+        self.assertEqual(
+            workload["block_key"].tolist(),
+            ["last_name", "npi", "last_name_soundex", None],
+        )
+        self.assertEqual(workload["candidates"].tolist(), [4, 1, 1, 0])
+        self.assertEqual(workload["over_budget"].tolist(), [True, False, False, False])
+        # Candidates over the budget are filtered as many as the budget
+        self.assertEqual(workload["seconds"].tolist(), [2.0, 1.5, 1.5, 1.0])
+
+        # Nothing is searched
+        self.assertTrue(reader.unique_ids.empty)
+        self.assertTrue(reader.unmatched.empty)
+
+    def test__calibrate(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+
+        seconds_per_conflicted, seconds_per_candidate = reader.calibrate()
+
+        self.assertEqual(
+            (seconds_per_conflicted, seconds_per_candidate),
+            (reader.seconds_per_conflicted, reader.seconds_per_candidate),
+        )
+        self.assertGreater(seconds_per_conflicted + seconds_per_candidate, 0.0)
+        self.assertGreaterEqual(seconds_per_candidate, 0.0)
+
+        # Nothing is searched
+        self.assertTrue(reader.unique_ids.empty)
+        self.assertTrue(reader.unmatched.empty)
+
+    def test__partition_conflicteds(self):
+        self.assertEqual(
+            ConflictedPaymentIDs.balance_partitions(
+                np.array([1.0, 5.0, 2.0, 2.0, 3.0]),
+                2,
+            ).tolist(),
+            [1, 0, 1, 0, 1],
+        )
+
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=pd.concat([self.fake_conflicteds] * 2, ignore_index=True).assign(
+                provider_pk=range(1, 9),
+            ),
+            payments=self.fake_payments,
+        )
+        reader.seconds_per_candidate = 1.0
+
+        partitions = reader.partition_conflicteds(reader.conflicteds, 2)
+
+        # The Does, with the most candidates, are searched by one worker
+        # and the rest by the other
+        self.assertEqual(
+            [partition["last_name"].tolist() for partition in partitions],
+            [["Doe", "Doe"], ["Smith", "Johnson", "Ebalt", "Smith", "Johnson", "Ebalt"]],
+        )
+
+    def test__partition_rows(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        # John Doe's payment under another last name
+        self.fake_payments = add_payment_id_to_payments_df(
+            self.fake_payments,
+            1,
+            "John",
+            None,
+            "Roe",
+            [],
+            [],
+            [],
+            2020,
+        )
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+
+        conflicteds = reader.prefix_conflicteds(reader.prepare_conflicteds(self.fake_conflicteds))
+
+        # The Does and every other payment of their profile_ids
+        self.assertEqual(reader.partition_rows(conflicteds.iloc[[0]]).tolist(), [0, 3, 4, 5, 6])
+        self.assertEqual(reader.partition_rows(conflicteds.iloc[[1, 3]]).tolist(), [1])
+        self.assertEqual(reader.partition_rows(conflicteds.iloc[[3]]).tolist(), [])
+
+    def test__search_for_conflicteds_ids_parallel(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        serial = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+        serial.search_for_conflicteds_ids()
+
+        parallel = ConflictedPaymentIDs(
+            conflicteds=self.fake_conflicteds,
+            payments=self.fake_payments,
+        )
+
+        self.assertGreater(len(parallel.partition_conflicteds(self.fake_conflicteds, 2)), 1)
+
+        parallel.search_for_conflicteds_ids(workers=2)
+
+        self.assertEqual(
+            parallel.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+            serial.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+        )
+        self.assertEqual(
+            parallel.unique_ids["filters"].tolist(),
+            serial.unique_ids["filters"].tolist(),
+        )
+        self.assertEqual(
+            parallel.unmatched[["provider_pk", "unmatched"]].values.tolist(),
+            serial.unmatched[["provider_pk", "unmatched"]].values.tolist(),
+        )
+        self.assertEqual(parallel.filter_evaluations, serial.filter_evaluations)
+
+    def test__merge_all_by_lastname(self):
+        conflicteds = add_conflict_prefix(self.reader.conflicteds)
+
+        merged = self.reader.merge_all_by_last_name(
+            payments=self.reader.payments,
+            conflicteds=conflicteds,
+        )
+
+        self.assertEqual(merged["provider_pk"].tolist(), [1, 2, 3])
+        self.assertEqual(merged["profile_id"].tolist(), [1, 2, 3])
+        self.assertEqual(merged["profile_id"].dtype, self.reader.payments["profile_id"].dtype)
+        self.assertIsNot(merged["filters"].iloc[0], merged["filters"].iloc[1])
+        self.assertIn("conflict_first_name", merged.columns)
+        self.assertNotIn("last_name_key", merged.columns)
+
+    def test__merge_all_by_lastname_compound(self):
+        self.reader.payments = add_payment_id_to_payments_df(
+            self.reader.payments,
+            7, "Jim", None, "Doe-Smith", [Specialtys(specialty="Pediatrics")],
+            [Credentials.MEDICAL_DOCTOR], [CityState(city="New York", state="NY")],
+        )
+        conflicteds = pd.DataFrame({
+            "provider_pk": [11, 12, 13],
+            "conflict_first_name": ["Jim", "Jane", "Ann"],
+            "last_name": ["Doe Smith", "Smith-Jones", "Zed-Quux"],
+        })
+
+        merged = self.reader.merge_all_by_last_name(
+            payments=self.reader.payments,
+            conflicteds=conflicteds,
+        )
+
+        # Payments with all of the tokens are preferred to any of them
+        self.assertEqual(merged[merged["provider_pk"] == 11]["profile_id"].tolist(), [7])
+        self.assertEqual(merged[merged["provider_pk"] == 12]["profile_id"].tolist(), [2, 7])
+        self.assertNotIn(13, merged["provider_pk"].tolist())
+        self.assertTrue(all(f == [PaymentFilters.LASTNAME] for f in merged["filters"]))
+
+    def test__search_for_conflicteds_ids_normalized_names(self):
+        conflicteds = pd.DataFrame({
+            "provider_pk": [21],
+            "first_name": ["Jöhn"],
+            "last_name": ["DOE, Jr."],
+            "middle_initial_1": ["A."],
+            "middle_initial_2": [None],
+            "middle_name_1": [None],
+            "middle_name_2": [None],
+            "credentials": [[Credentials.MEDICAL_DOCTOR]],
+            "specialtys": [[Specialtys(specialty="Pediatrics")]],
+            "citystates": [[CityState(city="New York", state="NY")]],
+        })
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=conflicteds,
+            payments=self.fake_payments,
+        )
+        reader.search_for_conflicteds_ids()
+
+        self.assertEqual(reader.unique_ids["profile_id"].tolist(), [1])
+        self.assertIn(PaymentFilters.FIRSTNAME, reader.unique_ids.iloc[0]["filters"])
+        self.assertIn(PaymentFilters.MIDDLE_INITIAL, reader.unique_ids.iloc[0]["filters"])
+        # The payments DataFrame itself is left as is
+        self.assertNotIn("last_name_norm", reader.payments.columns)
+
+    def test__search_for_conflicteds_ids_misspelled_last_name(self):
+        conflicteds = pd.DataFrame({
+            "provider_pk": [31, 32],
+            "first_name": ["Jane", "Joe"],
+            "last_name": ["Smyth", "Jonson"],
+            "middle_initial_1": [None, None],
+            "middle_initial_2": [None, None],
+            "middle_name_1": [None, None],
+            "middle_name_2": [None, None],
+            "credentials": [[Credentials.DOCTOR_OF_OSTEOPATHY], [Credentials.MEDICAL_DOCTOR]],
+            "specialtys": [[Specialtys(specialty="Surgery")], [Specialtys(specialty="Internal Medicine")]],
+            "citystates": [[CityState(city="Los Angeles", state="CA")], [CityState(city="Chicago", state="IL")]],
+        })
+
+        for batch in [False, True]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=conflicteds,
+                payments=self.fake_payments,
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            self.assertEqual(reader.unique_ids["profile_id"].tolist(), [2, 3])
+            for filters in reader.unique_ids["filters"]:
+                self.assertIn(PaymentFilters.LASTNAME_PHONETIC, filters)
+                self.assertNotIn(PaymentFilters.LASTNAME, filters)
+
+    def test__last_name_phonetic_matches(self):
+        payments = self.reader.prepare_payments(self.fake_payments)
+
+        matches = self.reader.last_name_phonetic_matches(
+            payments=payments,
+            last_names=["smyth", "dough", "johnsen", None],
+            index=self.reader.last_name_soundex_index(payments),
+        )
+
+        self.assertEqual([match.tolist() for match in matches], [[1], [], [2], []])
+
+    def test__candidate_blocks(self):
+        for data in self.extra_mock_data:
+            self.reader.payments = add_payment_id_to_payments_df(
+                self.reader.payments,
+                *data
+            )
+
+        conflicted = self.reader.prepare_conflicteds(self.reader.conflicteds)
+        conflicted = add_conflict_prefix(conflicted).iloc[0]
+
+        blocks = self.reader.candidate_blocks(conflicted)
+
+        # John Doe's first initial block holds John and Johnson Doe, and
+        # his New York and Pediatrics blocks all four of the Does
+        self.assertEqual(
+            [self.reader.payments.iloc[block]["profile_id"].tolist() for block in blocks],
+            [[1, 6]],
+        )
+
+        self.reader.search_for_conflicteds_ids()
+        self.assertEqual(
+            self.reader.unique_ids[self.reader.unique_ids["provider_pk"] == 1]["profile_id"].tolist(),
+            [1],
+        )
+
+    def test__candidate_blocks_confirm_match(self):
+        # John Smith's New York block holds only Mary Smith, while both
+        # of the other John Smiths are in California
+        payments = pd.DataFrame({
+            "profile_id": [1, 2, 3],
+            "first_name": ["Mary", "John", "John"],
+            "middle_name": [None, None, None],
+            "last_name": ["Smith", "Smith", "Smith"],
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 3,
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 3,
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [CityState(city="Fresno", state="CA")],
+                [CityState(city="Sacramento", state="CA")],
+            ],
+            "payment_year": [2023, 2023, 2023],
+        })
+        conflicteds = self.fake_conflicteds.iloc[[1]].assign(
+            first_name=["John"],
+            middle_name_2=[None],
+            citystates=[[CityState(city="New York", state="NY")]],
+            credentials=[[Credentials.MEDICAL_DOCTOR]],
+        )
+
+        for batch in [False, True]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=conflicteds,
+                payments=payments,
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            self.assertTrue(reader.unique_ids.empty)
+            self.assertEqual(reader.unmatched["provider_pk"].tolist(), [2])
+            self.assertEqual(reader.unmatched["unmatched"].tolist(), [Unmatcheds.UNFILTERABLE])
+
+    def test__candidate_blocks_partial_match(self):
+        # Beth Doe's first initial block holds only Bethany Doe, a partial
+        # first name match, while all of the Does resolve to Elizabeth Doe
+        # by her city and state
+        payments = pd.DataFrame({
+            "profile_id": [10, 20],
+            "first_name": ["Elizabeth", "Bethany"],
+            "middle_name": ["Ann", "Ann"],
+            "last_name": ["Doe", "Doe"],
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 2,
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 2,
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [CityState(city="Fresno", state="CA")],
+            ],
+            "payment_year": [2023, 2023],
+        })
+        conflicteds = self.fake_conflicteds.iloc[[0]].assign(
+            first_name=["Beth"],
+            middle_initial_1=["A"],
+            middle_name_1=["Ann"],
+        )
+
+        for batch in [False, True]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=conflicteds,
+                payments=payments,
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            self.assertEqual(reader.unique_ids["profile_id"].tolist(), [10])
+
+    def test__resolve_payments_x_conflicted(self):
+        merged = self.reader.merge_by_last_name(
+            payments=self.reader.prepared_payments,
+            conflicted=add_conflict_prefix(self.reader.prepare_conflicteds(self.reader.conflicteds)).iloc[1],
+        )
+
+        match, options, filters = self.reader.resolve_payments_x_conflicted(
+            self.reader.apply_filters(merged),
+        )
+
+        self.assertEqual(match["profile_id"].tolist(), [2])
+        self.assertTrue(self.reader.unique_ids.empty)
+
+    def test__apply_filters(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+        self.reader.payments = self.fake_payments
+
+        merged = self.reader.merge_all_by_last_name(
+            payments=self.reader.prepared_payments,
+            conflicteds=add_conflict_prefix(self.reader.prepare_conflicteds(self.reader.conflicteds)),
+        )
+
+        rowwise = self.reader.fill_middle_names(
+            self.reader.convert_merged_dtypes(merged.copy())
+        )
+        rowwise["filters"] = rowwise["filters"].apply(list)
+        for payment_filter in self.reader.filters:
+            rowwise = rowwise.apply(
+                lambda x: self.reader.filter_payment(
+                    payments_x_conflicted=x,
+                    payment_filter=payment_filter,
+                ),
+                axis=1,
+            )
+
+        filtered = self.reader.apply_filters(merged)
+
+        self.assertEqual(filtered["filters"].tolist(), rowwise["filters"].tolist())
+        self.assertEqual(filtered["filters_mask"].dtype, np.int32)
+        self.assertEqual(
+            filtered["filters_mask"].tolist(),
+            PaymentFilterFlags.encode(rowwise["filters"]).tolist(),
+        )
+
+    def test__filter_and_resolve_payments_x_conflicteds(self):
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+        self.reader.payments = self.fake_payments
+
+        merged = self.reader.merge_all_by_last_name(
+            payments=self.reader.prepared_payments,
+            conflicteds=add_conflict_prefix(self.reader.prepare_conflicteds(self.reader.conflicteds)),
+        )
+
+        eager = self.reader.resolve_all_payments_x_conflicteds(
+            self.reader.apply_filters(merged.copy()),
+        )
+        lazy = self.reader.filter_and_resolve_payments_x_conflicteds(merged.copy())
+
+        for expected, result in zip(eager, lazy):
+            self.assertEqual(
+                result[["provider_pk", "profile_id"]].values.tolist(),
+                expected[["provider_pk", "profile_id"]].values.tolist(),
+            )
+            self.assertEqual(result["filters"].tolist(), expected["filters"].tolist())
+
+        # John Doe resolves on his first name, so the other Does'
+        # specialtys are never compared
+        self.assertLess(
+            self.reader.filter_evaluations[PaymentFilters.SPECIALTY],
+            len(merged),
+        )
+        self.assertEqual(
+            set(self.reader.filter_hit_rates),
+            set(self.reader.filter_evaluations),
+        )
+
+    def test__search_filters_lazily(self):
+        class LazyFiltersIDs(ConflictedPaymentIDs):
+            def apply_filters(self, payments_x_conflicteds):
+                raise AssertionError("filters evaluated eagerly")
+
+        for data in self.extra_mock_data:
+            self.fake_payments = add_payment_id_to_payments_df(
+                self.fake_payments,
+                *data
+            )
+
+        results = []
+
+        for batch in [False, True]:
+            reader = LazyFiltersIDs(
+                conflicteds=self.fake_conflicteds,
+                payments=self.fake_payments,
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            results.append((
+                reader.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+                reader.unmatched[["provider_pk", "unmatched"]].values.tolist(),
+            ))
+
+        # The unmatched conflicteds are resolved on all of their
+        # candidates, serially as in a batch
+        self.assertTrue(results[0][1])
+        self.assertEqual(results[0], results[1])
+
+    def test__filter_stages(self):
+        stages = self.reader.filter_stages
+
+        self.assertEqual(
+            stages[0],
+            [
+                PaymentFilters.FIRSTNAME,
+                PaymentFilters.FIRST_MIDDLE_NAME,
+                PaymentFilters.FIRSTNAME_PARTIAL,
+            ],
+        )
+        self.assertEqual(
+            set(stages[1]),
+            {PaymentFilters.MIDDLENAME, PaymentFilters.MIDDLE_INITIAL},
+        )
+        self.assertEqual(
+            stages[2],
+            [PaymentFilters.CITY, PaymentFilters.CITYSTATE, PaymentFilters.STATE],
+        )
+        self.assertEqual(stages[3][0], PaymentFilters.CREDENTIAL)
+        self.assertEqual(
+            sorted(sum(stages, []), key=self.reader.filters.index),
+            self.reader.filters,
+        )
+
+    def test__resolve_all_payments_x_conflicteds(self):
+        candidates = pd.DataFrame({
+            "provider_pk": [1, 1, 1, 2, 2, 3],
+            "profile_id": [10, 11, 11, 20, 21, 30],
+            "payment_year": [2022, 2022, 2023, 2023, 2023, 2023],
+            "filters": [
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME],
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME],
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME, PaymentFilters.MIDDLENAME],
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME, PaymentFilters.CREDENTIAL],
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME, PaymentFilters.CREDENTIAL],
+                [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME_PARTIAL],
+            ],
+        })
+
+        matches, options, highest = self.reader.resolve_all_payments_x_conflicteds(candidates)
+
+        # 1 resolves on the middle name of profile_id 11's most recent
+        # payment and 3 on its only candidate, but 2's candidates tie
+        self.assertEqual(matches[["provider_pk", "profile_id"]].values.tolist(), [[1, 11], [3, 30]])
+        self.assertEqual(options["profile_id"].tolist(), [20, 21])
+        self.assertEqual(highest["provider_pk"].tolist(), [2])
+        self.assertEqual(
+            highest["filters"].iloc[0],
+            [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME, PaymentFilters.CREDENTIAL],
+        )
+
+    def test__from_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = PaymentIDs().write_snapshot(
+                f"{directory}/payments.arrow",
+                payments=self.fake_payments,
+            )
+
+            reader = ConflictedPaymentIDs.from_snapshot(
+                conflicteds=self.fake_conflicteds,
+                path=path,
+            )
+
+            self.assertEqual(len(reader.payments), len(self.fake_payments))
+
+            # The nested columns are left in the mapped snapshot
+            self.assertIsInstance(reader.payments["citystates"].dtype, pd.ArrowDtype)
+            self.assertEqual(
+                decode_lazy_columns(reader.payments.iloc[[0]])["citystates"].iloc[0],
+                [CityState(city="New York", state="NY")],
+            )
+
+            reader.search_for_conflicteds_ids()
+            self.assertIn("Doe", reader.unique_ids["last_name"].values.tolist())
+            self.assertIn("Ebalt", reader.unmatched["last_name"].values.tolist())
+            self.assertIsInstance(reader.unique_ids["citystates"].iloc[0][0], CityState)
+            self.assertEqual(reader.snapshot, path)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = PaymentIDs().write_snapshot(
+                f"{directory}/payments.arrow",
+                payments=PaymentIDs().prepare_payments(self.fake_payments),
+            )
+
+            reader = ConflictedPaymentIDs.from_snapshot(
+                conflicteds=self.fake_conflicteds,
+                path=path,
+            )
+
+            # Prepared payments already have the columns derived from the
+            # nested columns, which stay lazy until the candidates are merged
+            self.assertIsInstance(
+                reader.prepared_payments["specialtys"].dtype,
+                pd.ArrowDtype,
+            )
+
+            reader.search_for_conflicteds_ids()
+            self.assertIn("Doe", reader.unique_ids["last_name"].values.tolist())
+            self.assertIsInstance(reader.unique_ids["specialtys"].iloc[0][0], Specialtys)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = PaymentIDs().write_snapshot(
+                f"{directory}/payments.arrow",
+                payments=self.fake_payments,
+            )
+
+            # Only the payments at the rows are read
+            partial = ConflictedPaymentIDs.from_snapshot(
+                conflicteds=self.fake_conflicteds,
+                path=path,
+                rows=np.array([0, 2]),
+            )
+
+        self.assertEqual(
+            partial.payments["last_name"].tolist(),
+            self.fake_payments["last_name"].iloc[[0, 2]].tolist(),
+        )
+        self.assertIsNone(partial.snapshot)
+
     def test__merge_by_lastname(self):
         for data in self.extra_mock_data:
             self.reader.payments = add_payment_id_to_payments_df(
@@ -280,6 +1160,32 @@ class TestConflictedPaymentIDs(unittest.TestCase):
 
         self.assertEqual(len(merged), 4)
 
+    def test__merge_by_lastname_index(self):
+        for data in self.extra_mock_data:
+            self.reader.payments = add_payment_id_to_payments_df(
+                self.reader.payments,
+                *data
+            )
+
+        conflicted = add_conflict_prefix(self.reader.conflicteds).iloc[0]
+
+        merged = self.reader.merge_by_last_name(
+            payments=self.reader.payments,
+            conflicted=conflicted,
+            index=self.reader.merge_index,
+        )
+        scanned = self.reader.merge_by_last_name(
+            payments=self.reader.payments,
+            conflicted=conflicted,
+        )
+
+        pd.testing.assert_frame_equal(merged, scanned)
+        self.assertEqual(merged["profile_id"].tolist(), [1, 4, 5, 6])
+
+        # The index is rebuilt when the payments are replaced
+        self.reader.payments = self.reader.payments[self.reader.payments["profile_id"] != 4]
+        self.assertEqual(self.reader.merge_index.size("doe"), 3)
+
     def test__merge_by_lastname_two_lastnames(self):
         conflicteds = pd.DataFrame({
             "provider_pk": [11],
@@ -347,6 +1253,42 @@ class TestConflictedPaymentIDs(unittest.TestCase):
         self.assertIsInstance(match, bool)
         self.assertFalse(match)
 
+    def test__filter_by_first_name_partial(self):
+        fake_row = pd.Series({
+            "provider_pk": 1,
+            "first_name": "Jon",
+            "conflict_first_name": "John",
+            "filters": [PaymentFilters.LASTNAME],
+        })
+        self.assertTrue(ConflictedPaymentIDs.filter_by_firstname_partial(fake_row))
+        self.assertTrue(
+            ConflictedPaymentIDs.filter_by_firstname_partial(
+                fake_row,
+                index=self.reader.filter_index(PaymentFilters.FIRSTNAME_PARTIAL),
+            )
+        )
+
+        fake_row["conflict_first_name"] = "Joseph"
+        self.assertFalse(ConflictedPaymentIDs.filter_by_firstname_partial(fake_row))
+
+        fake_row["first_name"] = "Jo"
+        self.assertTrue(ConflictedPaymentIDs.filter_by_firstname_partial(fake_row))
+
+        fake_row["filters"] = [PaymentFilters.LASTNAME, PaymentFilters.FIRSTNAME]
+        self.assertFalse(ConflictedPaymentIDs.filter_by_firstname_partial(fake_row))
+
+    def test__firstname_partial_matches(self):
+        candidates = pd.DataFrame({
+            "first_name": ["Jon", "Jane", None],
+            "conflict_first_name": ["JOHN", "Judd", "John"],
+        })
+
+        matches = self.reader.firstname_partial_matches(
+            candidates,
+            index=self.reader.filter_index(PaymentFilters.FIRSTNAME_PARTIAL),
+        )
+        self.assertEqual(matches.tolist(), [True, False, False])
+
     def test__filter_by_specialty(self):
         fake_row = pd.Series({
             "provider_pk": 1,
@@ -0,0 +1,91 @@
+import unittest
+
+import pandas as pd
+
+from ..indexes import AhoCorasick, BlockingIndex, ColumnIndex
+
+
+class TestColumnIndex(unittest.TestCase):
+    def setUp(self):
+        self.fake_payments = pd.DataFrame({
+            "first_name": ["John", "Jane", "Joe", "Nathan"],
+            "last_name": ["Doe", "Smith", None, "DOE"],
+        }, index=[10, 11, 12, 13])
+
+    def test__lookup(self):
+        index = ColumnIndex(self.fake_payments, "last_name", normalize=lambda x: x.str.lower())
+
+        self.assertEqual(index.lookup("doe").tolist(), [0, 3])
+        self.assertEqual(index.lookup("johnson").tolist(), [])
+        self.assertEqual(index.size("smith"), 1)
+        self.assertIn("smith", index)
+        self.assertEqual(len(index), 2)
+
+    def test__take(self):
+        index = ColumnIndex(self.fake_payments, "last_name", normalize=lambda x: x.str.lower())
+
+        taken = index.take(self.fake_payments, "doe")
+        self.assertEqual(taken.index.tolist(), [10, 13])
+        self.assertEqual(taken["first_name"].tolist(), ["John", "Nathan"])
+
+    def test__multiple_columns(self):
+        index = ColumnIndex(self.fake_payments, ["last_name", "first_name"])
+
+        self.assertEqual(index.lookup(("Doe", "John")).tolist(), [0])
+        self.assertEqual(index.lookup(("Doe", "Nathan")).tolist(), [])
+
+    def test__multi_valued(self):
+        payments = self.fake_payments.assign(states=[["NY", "NJ"], ["CA"], [], None])
+        index = ColumnIndex(payments, ["last_name", "states"])
+
+        self.assertEqual(index.lookup(("Doe", "NJ")).tolist(), [0])
+        self.assertEqual(index.lookup(("Smith", "CA")).tolist(), [1])
+        self.assertEqual(len(index), 3)
+
+    def test__empty(self):
+        index = ColumnIndex(self.fake_payments.iloc[0:0], "last_name")
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.lookup("Doe").tolist(), [])
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def setUp(self):
+        self.automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+
+    def test__search(self):
+        self.assertEqual(self.automaton.search("ushers"), {"he", "she", "hers"})
+        self.assertEqual(self.automaton.search("this"), {"his"})
+        self.assertEqual(self.automaton.search("xyz"), set())
+
+    def test__matches(self):
+        self.assertEqual(
+            self.automaton.matches(["ushers", "this", "hello"]),
+            {"he": [0, 2], "she": [0], "hers": [0], "his": [1]},
+        )
+
+
+class TestBlockingIndex(unittest.TestCase):
+    def setUp(self):
+        self.fake_payments = pd.DataFrame({
+            "last_name": ["doe", "doe", "doe", "doe", "smith"],
+            "first_initial": ["j", "j", "n", "h", "j"],
+            "states": [["NY"], ["CA"], ["NY", "CA"], [], ["NY"]],
+        })
+        self.index = BlockingIndex(
+            self.fake_payments,
+            [["last_name", "first_initial"], ["last_name", "states"], ["last_name", "specialtys"]],
+        )
+
+    def test__keys(self):
+        # Keys with columns that aren't in the frame are skipped
+        self.assertEqual(self.index.keys, [["last_name", "first_initial"], ["last_name", "states"]])
+
+    def test__blocks(self):
+        blocks = self.index.blocks({"last_name": "doe", "first_initial": "n", "states": ["NY", "NJ"]})
+        self.assertEqual([block.tolist() for block in blocks], [[2], [0, 2]])
+
+        blocks = self.index.blocks({"last_name": "doe", "first_initial": None, "states": ["CA"]})
+        self.assertEqual([block.tolist() for block in blocks], [[1, 2]])
+
+        self.assertEqual(self.index.blocks({"last_name": "roe", "first_initial": "j"}), [])
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ..choices import PaymentFilters, Unmatcheds
+from ..citystates import CityState
+from ..credentials import Credentials
+from ..ids import ConflictedPaymentIDs
+from ..journal import MatchJournal, ResultCollector
+from ..specialtys import Specialtys
+
+
+class TestResultCollector(unittest.TestCase):
+    def test__append(self):
+        collector = ResultCollector(ignore_index=True)
+
+        self.assertTrue(collector.frame.empty)
+
+        collector.append(pd.DataFrame({"provider_pk": [1, 2]}))
+        collector.append(pd.DataFrame({"provider_pk": [3]}), journal=False)
+        collector.append(pd.DataFrame({"provider_pk": []}))
+
+        self.assertEqual(collector.frame["provider_pk"].tolist(), [1, 2, 3])
+        self.assertEqual(collector.frame.index.tolist(), [0, 1, 2])
+        self.assertEqual(collector.provider_pks, {1, 2, 3})
+        self.assertEqual(collector.pending_rows, 2)
+        self.assertEqual(collector.take_pending()["provider_pk"].tolist(), [1, 2])
+        self.assertEqual(collector.pending_rows, 0)
+
+
+class TestMatchJournal(unittest.TestCase):
+    def setUp(self):
+        self.conflicteds = pd.DataFrame({
+            "provider_pk": [1, 2, 3],
+            "first_name": ["John", "Jane", "Joe"],
+            "last_name": ["Doe", "Smith", "Nobody"],
+            "middle_initial_1": [None, None, None],
+            "middle_initial_2": [None, None, None],
+            "middle_name_1": [None, None, None],
+            "middle_name_2": [None, None, None],
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 3,
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 3,
+            "citystates": [[CityState(city="New York", state="NY")]] * 3,
+        })
+        self.payments = pd.DataFrame({
+            "profile_id": pd.array([10, 20], dtype="Int32"),
+            "first_name": ["John", "Jane"],
+            "middle_name": [None, None],
+            "last_name": ["Doe", "Smith"],
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 2,
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 2,
+            "citystates": [[CityState(city="New York", state="NY")]] * 2,
+            "payment_year": [2023, 2023],
+        })
+
+    def test__flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = MatchJournal(directory=directory, flush_rows=2)
+
+            journal["unique_ids"].append(pd.DataFrame({"provider_pk": [1]}))
+            journal.flush()
+
+            self.assertEqual(os.listdir(directory), [])
+
+            journal["unmatched"].append(pd.DataFrame({"provider_pk": [2]}))
+            journal.flush()
+
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["000000-unique_ids.arrow", "000000-unmatched.arrow"],
+            )
+            self.assertEqual(journal.searched, {1, 2})
+
+    def test__flush_per_conflicted(self):
+        class NoExactMatchIDs(ConflictedPaymentIDs):
+            @property
+            def exact_match_keys(self) -> list[list[str]]:
+                return []
+
+        with tempfile.TemporaryDirectory() as directory:
+            reader = NoExactMatchIDs(
+                conflicteds=self.conflicteds.iloc[:2],
+                payments=self.payments,
+                journal=directory,
+                flush_rows=1,
+            )
+            reader.search_for_conflicteds_ids()
+
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["000000-unique_ids.arrow", "000001-unique_ids.arrow"],
+            )
+
+    def test__resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            reader = ConflictedPaymentIDs(
+                conflicteds=self.conflicteds.iloc[:2],
+                payments=self.payments,
+                journal=directory,
+                flush_rows=1,
+            )
+            reader.search_for_conflicteds_ids()
+
+            # Both conflicteds are resolved at once by the exact name match
+            self.assertEqual(os.listdir(directory), ["000000-unique_ids.arrow"])
+
+            # A run that was stopped after the first two conflicteds
+            # picks up at the third
+            resumed = ConflictedPaymentIDs(
+                conflicteds=self.conflicteds,
+                payments=self.payments,
+                journal=directory,
+                resume=True,
+            )
+
+            self.assertEqual(resumed.journal.searched, {1, 2})
+            self.assertEqual(
+                resumed.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+                [[1, 10], [2, 20]],
+            )
+            self.assertIsInstance(resumed.unique_ids["filters"].iloc[0][0], PaymentFilters)
+            self.assertIsInstance(
+                resumed.unique_ids["conflict_specialtys"].iloc[0][0],
+                Specialtys,
+            )
+
+            resumed.search_for_conflicteds_ids()
+
+            self.assertEqual(len(resumed.unique_ids), 2)
+            self.assertEqual(resumed.unmatched["provider_pk"].tolist(), [3])
+            self.assertEqual(resumed.unmatched["unmatched"].tolist(), [Unmatcheds.NOLASTNAME])
+
+            # Options without the unmatched row they belong to are dropped
+            journal = MatchJournal(directory=directory)
+            MatchJournal.write_segment(
+                pd.DataFrame({"provider_pk": [4]}),
+                journal.segment_path(99, "unmatched_options"),
+            )
+            journal.load()
+
+            self.assertNotIn(4, journal["unmatched_options"].provider_pks)
@@ -0,0 +1,71 @@
+import unittest
+
+import pandas as pd
+
+from ..names import NamesMixin, normalize_name, normalize_names
+
+
+class TestNormalizeName(unittest.TestCase):
+    def test__normalize_name(self):
+        self.assertEqual(normalize_name("José"), "jose")
+        self.assertEqual(normalize_name("O'Brien"), "obrien")
+        self.assertEqual(normalize_name("Smith, Jr."), "smith")
+        self.assertEqual(normalize_name("Smith III"), "smith")
+        self.assertEqual(normalize_name("Garcia – Lopez"), "garcia-lopez")
+        self.assertEqual(normalize_name("  Van   Der Berg "), "van der berg")
+        self.assertEqual(normalize_name("Jr"), "jr")
+        self.assertIsNone(normalize_name("."))
+        self.assertIsNone(normalize_name(None))
+
+    def test__normalize_names(self):
+        names = normalize_names(pd.Series(["ÉMILE", None, "Émile"]))
+        self.assertEqual(names.tolist()[0], "emile")
+        self.assertTrue(pd.isna(names.iloc[1]))
+        self.assertEqual(names.iloc[2], "emile")
+
+
+class TestNamesMixin(unittest.TestCase):
+    def test__prepare_payments(self):
+        payments = pd.DataFrame({
+            "first_name": ["José", None],
+            "middle_name": ["A.", None],
+            "last_name": ["Núñez Jr", "Smith"],
+        })
+
+        prepared = NamesMixin().prepare_payments(payments)
+
+        self.assertNotIn("first_name_norm", payments.columns)
+        self.assertEqual(prepared["first_name_norm"].tolist()[0], "jose")
+        self.assertEqual(prepared["middle_name_norm"].tolist()[0], "a")
+        self.assertEqual(prepared["last_name_norm"].tolist(), ["nunez", "smith"])
+        self.assertEqual(prepared["first_initial"].tolist(), ["j", None])
+
+    def test__prepare_payments_fills_middle_names(self):
+        payments = pd.DataFrame({
+            "profile_id": pd.array([1, 1, 2, None], dtype="Int32"),
+            "first_name": ["John", "John", "Jane", "Joe"],
+            "middle_name": [None, "Alpha", None, None],
+            "last_name": ["Doe", "Doe", "Smith", "Smith"],
+        })
+
+        prepared = NamesMixin().prepare_payments(payments)
+
+        self.assertTrue(pd.isna(payments["middle_name"].iloc[0]))
+        self.assertEqual(prepared["middle_name"].tolist()[:2], ["Alpha", "Alpha"])
+        self.assertEqual(prepared["middle_name_norm"].tolist()[:2], ["alpha", "alpha"])
+        self.assertTrue(prepared["middle_name"].iloc[2:].isna().all())
+
+    def test__prepare_conflicteds(self):
+        conflicteds = pd.DataFrame({
+            "provider_pk": [1],
+            "first_name": ["Zoë"],
+            "last_name": ["D'Angelo"],
+            "middle_initial_1": ["Q."],
+        })
+
+        prepared = NamesMixin().prepare_conflicteds(conflicteds)
+
+        self.assertEqual(prepared["first_name_norm"].tolist(), ["zoe"])
+        self.assertEqual(prepared["last_name_norm"].tolist(), ["dangelo"])
+        self.assertEqual(prepared["middle_initial_1_norm"].tolist(), ["q"])
+        self.assertNotIn("middle_name_1_norm", prepared.columns)
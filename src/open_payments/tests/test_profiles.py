@@ -0,0 +1,148 @@
+import unittest
+
+import pandas as pd
+
+from ..citystates import CityState
+from ..credentials import CREDENTIAL_BITS, Credentials
+from ..ids import ConflictedPaymentIDs
+from ..profiles import build_profiles
+from ..specialtys import Specialtys
+
+
+class TestBuildProfiles(unittest.TestCase):
+    def setUp(self):
+        self.payments = pd.DataFrame({
+            "profile_id": pd.array([1, 1, 2, None], dtype="Int32"),
+            "first_name": ["Jon", "John", "Jane", "Joe"],
+            "middle_name": [None, "Alpha", None, None],
+            "last_name": ["Doe", "Doe", "Smith", "Johnson"],
+            "specialtys": [
+                [Specialtys(specialty="Pediatrics")],
+                [Specialtys(specialty="Pediatrics"), Specialtys(specialty="Surgery")],
+                [Specialtys(specialty="Surgery")],
+                [Specialtys(specialty="Surgery")],
+            ],
+            "credentials": [
+                [Credentials.MEDICAL_DOCTOR],
+                [Credentials.DOCTOR_OF_OSTEOPATHY],
+                [Credentials.MEDICAL_DOCTOR],
+                [Credentials.MEDICAL_DOCTOR],
+            ],
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [CityState(city="New York", state="NY")],
+                [CityState(city="Los Angeles", state="CA")],
+                [CityState(city="Rochester", state="IL")],
+            ],
+            "payment_year": [2023, 2021, 2022, 2022],
+            "npi": pd.array([None, 1000000001, 1000000002, None], dtype="Int64"),
+        })
+
+    def test__build_profiles(self):
+        profiles = build_profiles(self.payments)
+
+        # Payments without a profile_id are dropped
+        self.assertEqual(profiles["profile_id"].tolist(), [1, 2])
+
+        doe = profiles.iloc[0]
+
+        # Names come from the most recent payment with a value
+        self.assertEqual(doe["first_name"], "Jon")
+        self.assertEqual(doe["middle_name"], "Alpha")
+        self.assertEqual(doe["first_names"], ["john", "jon"])
+        self.assertEqual(doe["last_names"], ["doe"])
+        self.assertEqual(
+            [specialty.specialty for specialty in doe["specialtys"]],
+            ["Pediatrics", "Surgery"],
+        )
+        self.assertEqual(len(doe["citystates"]), 1)
+        self.assertEqual(
+            doe["credentials"],
+            [Credentials.MEDICAL_DOCTOR, Credentials.DOCTOR_OF_OSTEOPATHY],
+        )
+        self.assertEqual(
+            doe["credentials_mask"],
+            CREDENTIAL_BITS[Credentials.MEDICAL_DOCTOR]
+            | CREDENTIAL_BITS[Credentials.DOCTOR_OF_OSTEOPATHY],
+        )
+        self.assertEqual((doe["first_year"], doe["last_year"]), (2021, 2023))
+        self.assertEqual(doe["payment_year"], 2023)
+        self.assertEqual(doe["npi"], 1000000001)
+
+    def test__search_profiles(self):
+        conflicteds = pd.DataFrame({
+            "provider_pk": [1, 2],
+            "first_name": ["John", "Jane"],
+            "last_name": ["Doe", "Smith"],
+            "middle_initial_1": ["A", None],
+            "middle_initial_2": [None, None],
+            "middle_name_1": [None, None],
+            "middle_name_2": [None, None],
+            "credentials": [[Credentials.DOCTOR_OF_OSTEOPATHY], [Credentials.MEDICAL_DOCTOR]],
+            "specialtys": [[Specialtys(specialty="Surgery")], [Specialtys(specialty="Surgery")]],
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [CityState(city="Los Angeles", state="CA")],
+            ],
+        })
+
+        reader = ConflictedPaymentIDs(
+            conflicteds=conflicteds,
+            payments=build_profiles(self.payments),
+        )
+        reader.search_for_conflicteds_ids(batch=True)
+
+        self.assertEqual(
+            reader.unique_ids[["provider_pk", "profile_id"]].values.tolist(),
+            [[1, 1], [2, 2]],
+        )
+        # John Doe's osteopathy credential and surgery specialty are from
+        # an earlier payment than his most recent one
+        self.assertIn("CREDENTIAL", reader.unique_ids.iloc[0]["filters"])
+        self.assertIn("SPECIALTY", reader.unique_ids.iloc[0]["filters"])
+
+    def test__search_profiles_by_name_variants(self):
+        # Jane Smith was paid as Jane Ann Smith before she became
+        # Jane Jones, and a Jane Jones in California is another profile
+        payments = pd.DataFrame({
+            "profile_id": pd.array([3, 3, 4], dtype="Int32"),
+            "first_name": ["Jane", "Jane", "Jane"],
+            "middle_name": ["Ann", None, "Beth"],
+            "last_name": ["Smith", "Jones", "Jones"],
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 3,
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 3,
+            "citystates": [
+                [CityState(city="New York", state="NY")],
+                [CityState(city="New York", state="NY")],
+                [CityState(city="Los Angeles", state="CA")],
+            ],
+            "payment_year": [2020, 2023, 2023],
+        })
+        conflicteds = pd.DataFrame({
+            "provider_pk": [1, 2],
+            "first_name": ["Jane", "Jane"],
+            "last_name": ["Smith", "Jones"],
+            "middle_initial_1": ["A", "A"],
+            "middle_initial_2": [None, None],
+            "middle_name_1": ["Ann", "Ann"],
+            "middle_name_2": [None, None],
+            "credentials": [[Credentials.MEDICAL_DOCTOR]] * 2,
+            "specialtys": [[Specialtys(specialty="Surgery")]] * 2,
+            "citystates": [[CityState(city="Boston", state="MA")]] * 2,
+        })
+
+        for batch in [False, True]:
+            reader = ConflictedPaymentIDs(
+                conflicteds=conflicteds,
+                payments=build_profiles(payments),
+            )
+            reader.search_for_conflicteds_ids(batch=batch)
+
+            # Her former last name and middle name are matched as well
+            self.assertEqual(
+                sorted(reader.unique_ids[["provider_pk", "profile_id"]].values.tolist()),
+                [[1, 3], [2, 3]],
+            )
+            self.assertTrue(all(
+                "MIDDLENAME" in filters for filters in reader.unique_ids["filters"]
+            ))
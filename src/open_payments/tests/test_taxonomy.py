@@ -0,0 +1,108 @@
+import unittest
+
+import pandas as pd
+
+from ..specialtys import Specialtys
+from ..taxonomy import SpecialtyTrie
+
+
+class TestSpecialtyTrie(unittest.TestCase):
+    def setUp(self):
+        self.fake_payments = pd.DataFrame({
+            "profile_id": [1, 2, 3, 4, 1],
+            "payment_year": [2022, 2022, 2023, 2022, 2023],
+            "specialty_1": [
+                "Allopathic & Osteopathic Physicians|Internal Medicine|Cardiovascular Disease",
+                "Allopathic & Osteopathic Physicians|Internal Medicine|Cardiovascular Disease",
+                "Allopathic & Osteopathic Physicians|Internal Medicine|Cardiovascular Disease",
+                "Allopathic & Osteopathic Physicians|Pediatrics",
+                "Allopathic & Osteopathic Physicians|Internal Medicine",
+            ],
+            "specialty_2": [
+                None,
+                "Allopathic & Osteopathic Physicians|Internal Medicine|Rheumatology",
+                None,
+                None,
+                None,
+            ],
+            "specialty_3": [None, None, None, None, None],
+            "specialty_4": [None, None, None, None, None],
+            "specialty_5": [None, None, None, None, None],
+            "specialty_6": [None, None, None, None, None],
+        })
+        self.trie = SpecialtyTrie.from_payments(self.fake_payments)
+
+    def test__profile_ids(self):
+        cardiologists = self.trie.profile_ids(
+            "Allopathic & Osteopathic Physicians|Internal Medicine|Cardiovascular Disease"
+        )
+        self.assertEqual(cardiologists.tolist(), [1, 2, 3])
+
+        internists = self.trie.profile_ids(
+            ["Allopathic & Osteopathic Physicians", "Internal Medicine"]
+        )
+        self.assertEqual(internists.tolist(), [1, 2, 3])
+
+        physicians = self.trie.profile_ids("Allopathic & Osteopathic Physicians")
+        self.assertEqual(physicians.tolist(), [1, 2, 3, 4])
+
+        self.assertEqual(
+            self.trie.profile_ids("Allopathic & Osteopathic Physicians|Surgery").tolist(),
+            [],
+        )
+
+    def test__profile_ids_by_year(self):
+        cardiologists_2022 = self.trie.profile_ids(
+            "allopathic & osteopathic physicians|internal medicine|cardiovascular disease",
+            years=2022,
+        )
+        self.assertEqual(cardiologists_2022.tolist(), [1, 2])
+
+        internists_2023 = self.trie.profile_ids(
+            "Allopathic & Osteopathic Physicians|Internal Medicine",
+            years=[2023],
+        )
+        self.assertEqual(internists_2023.tolist(), [1, 3])
+
+    def test__find(self):
+        found = self.trie.find("Rheumatology")
+        self.assertEqual(len(found), 1)
+        self.assertEqual(
+            found[0][0],
+            "Allopathic & Osteopathic Physicians|Internal Medicine|Rheumatology",
+        )
+        self.assertEqual(self.trie.profile_ids_for_label("Rheumatology").tolist(), [2])
+        self.assertIn("Allopathic & Osteopathic Physicians|Pediatrics", self.trie)
+        self.assertNotIn("Allopathic & Osteopathic Physicians|Surgery", self.trie)
+
+    def test__from_processed_payments(self):
+        trie = SpecialtyTrie.from_payments(
+            pd.DataFrame({
+                "profile_id": [1, 2, 3],
+                "payment_year": [2022, 2022, 2023],
+                "specialtys": [
+                    [
+                        Specialtys(
+                            specialty="Internal Medicine",
+                            subspecialty="Cardiovascular Disease",
+                        ),
+                    ],
+                    [
+                        Specialtys(specialty="Internal Medicine", subspecialty="Rheumatology"),
+                        Specialtys(specialty="Pediatrics"),
+                    ],
+                    [],
+                ],
+            })
+        )
+
+        self.assertEqual(trie.profile_ids("Internal Medicine").tolist(), [1, 2])
+        self.assertEqual(
+            trie.profile_ids("Internal Medicine|Cardiovascular Disease", years=2022).tolist(),
+            [1],
+        )
+        self.assertEqual(trie.profile_ids_for_label("Pediatrics").tolist(), [2])
+
+    def test__from_payments_without_specialtys(self):
+        with self.assertRaises(ValueError):
+            SpecialtyTrie.from_payments(pd.DataFrame({"profile_id": [1]}))